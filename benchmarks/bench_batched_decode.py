@@ -0,0 +1,90 @@
+"""Benchmark decoding a window of wrapped bodies one by one or as one batch.
+
+For every vendored sema sample (``src/gjk/sema/samples``) that takes the
+bytes path, times ``--batch`` copies of its wrapped body (as the importer's
+prefetch window would hold them), per body:
+
+- ``each``: ``JournalCodec.from_bytes(..., wrapped=True)`` per body;
+- ``batch``: what a batched ``from_bytes`` could do at best: each body's
+  header still read on its own (to group by type and version), then the
+  whole group validated as one JSON array by a cached
+  ``TypeAdapter(list[...])``, then each result's PascalCase check.
+
+This is the measurement behind not batching decodes: entering pydantic-core
+costs about a microsecond, and the rest scales per body either way.
+
+Run from the repo root:
+    uv run python benchmarks/bench_batched_decode.py [--filter layout]
+"""
+
+import argparse
+import json
+import timeit
+from pathlib import Path
+
+from pydantic import TypeAdapter
+
+from gjk.journal_codec import (
+    _WRAPPED_HEADER,
+    JournalCodec,
+    _validated_pascal,
+    _wrapped_adapter,
+    json_decodable,
+)
+
+SAMPLES = Path(__file__).resolve().parent.parent / "src" / "gjk" / "sema" / "samples"
+
+
+def best_us(fn, number: int, repeat: int) -> float:
+    return min(timeit.repeat(fn, number=number, repeat=repeat)) / number * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--filter", default="", help="only samples containing this")
+    parser.add_argument("--batch", type=int, default=100)
+    parser.add_argument("--number", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    journal = JournalCodec()
+    print(f"{'sample':42s} {'size':>6s} {'each':>8s} {'batch':>8s}  (us per body)")
+    totals = [0.0, 0.0]
+    for path in sorted(SAMPLES.glob("*.json")):
+        if args.filter not in path.stem:
+            continue
+        data = json.loads(path.read_text())
+        body = json.dumps({"Header": {"Src": "bench"}, "Payload": data}).encode()
+        decoded = journal.from_bytes(body, auto_upgrade=False, wrapped=True)
+        if not json_decodable(type(decoded)):
+            continue
+        bodies = [body] * args.batch
+        as_list = TypeAdapter(list[_wrapped_adapter(type(decoded))._type])
+        array = b"[" + b",".join(bodies) + b"]"
+
+        def each():
+            return [
+                journal.from_bytes(b, auto_upgrade=False, wrapped=True) for b in bodies
+            ]
+
+        def batch():
+            for b in bodies:
+                _WRAPPED_HEADER.validate_json(b)
+            out = [
+                w.payload
+                for w in as_list.validate_json(array, by_alias=True, by_name=False)
+            ]
+            assert all(_validated_pascal(obj) for obj in out)
+            return out
+
+        assert batch() == each()
+        row = [
+            best_us(fn, args.number, args.repeat) / args.batch for fn in (each, batch)
+        ]
+        totals = [t + r for t, r in zip(totals, row)]
+        print(f"{path.stem:42s} {len(body):6d} {row[0]:8.1f} {row[1]:8.1f}")
+    print(f"{'total':42s} {'':6s} {totals[0]:8.1f} {totals[1]:8.1f}")
+
+
+if __name__ == "__main__":
+    main()
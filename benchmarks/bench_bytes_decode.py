@@ -0,0 +1,91 @@
+"""Benchmark decoding a wrapped message body, per sample type.
+
+For every vendored sema sample (``src/gjk/sema/samples``), wrapped in an
+envelope as on the bus and in the eventstore (``{"Header": ..., "Payload":
+...}``), times bytes to SemaType without upgrading:
+
+- ``sema``: ``json.loads`` then ``SemaCodec.from_dict`` of the payload;
+- ``dict``: ``json.loads`` then ``JournalCodec.from_dict``;
+- ``bytes``: ``JournalCodec.from_bytes(..., wrapped=True)``, which validates
+  the bytes with pydantic-core and builds no dict;
+- ``trusted``: the same with ``trusted=True``, which runs no model
+  validator (the ``check_axiom_*`` cross-checks).
+
+``fast`` is whether the sample's class takes the bytes path at all
+(:func:`gjk.journal_codec.json_decodable`).
+
+Run from the repo root:
+    uv run python benchmarks/bench_bytes_decode.py [--filter layout]
+"""
+
+import argparse
+import json
+import timeit
+from pathlib import Path
+
+from gjk.journal_codec import JournalCodec, json_decodable
+from gjk.sema import SemaCodec
+
+SAMPLES = Path(__file__).resolve().parent.parent / "src" / "gjk" / "sema" / "samples"
+
+
+def best_us(fn, number: int, repeat: int) -> float:
+    return min(timeit.repeat(fn, number=number, repeat=repeat)) / number * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--filter", default="", help="only samples containing this")
+    parser.add_argument("--number", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    sema, journal = SemaCodec(), JournalCodec()
+    print(
+        f"{'sample':42s} {'size':>6s} {'fast':>5s}"
+        f" {'sema':>8s} {'dict':>8s} {'bytes':>8s} {'trusted':>8s}  (us)"
+    )
+    totals = [0.0, 0.0, 0.0, 0.0]
+    for path in sorted(SAMPLES.glob("*.json")):
+        if args.filter not in path.stem:
+            continue
+        data = json.loads(path.read_text())
+        body = json.dumps({"Header": {"Src": "bench"}, "Payload": data}).encode()
+        decoded = journal.from_bytes(body, auto_upgrade=False, wrapped=True)
+        assert decoded == journal.from_dict(data, auto_upgrade=False)
+        assert decoded == journal.from_bytes(
+            body, auto_upgrade=False, wrapped=True, trusted=True
+        )
+
+        def via_sema():
+            return sema.from_dict(json.loads(body)["Payload"], auto_upgrade=False)
+
+        def via_dict():
+            return journal.from_dict(json.loads(body)["Payload"], auto_upgrade=False)
+
+        def via_bytes():
+            return journal.from_bytes(body, auto_upgrade=False, wrapped=True)
+
+        def via_trusted():
+            return journal.from_bytes(
+                body, auto_upgrade=False, wrapped=True, trusted=True
+            )
+
+        row = [
+            best_us(fn, args.number, args.repeat)
+            for fn in (via_sema, via_dict, via_bytes, via_trusted)
+        ]
+        totals = [t + r for t, r in zip(totals, row)]
+        fast = "yes" if json_decodable(type(decoded)) else "no"
+        print(
+            f"{path.stem:42s} {len(body):6d} {fast:>5s}"
+            f" {row[0]:8.1f} {row[1]:8.1f} {row[2]:8.1f} {row[3]:8.1f}"
+        )
+    print(
+        f"{'total':42s} {'':6s} {'':5s}"
+        f" {totals[0]:8.1f} {totals[1]:8.1f} {totals[2]:8.1f} {totals[3]:8.1f}"
+    )
+
+
+if __name__ == "__main__":
+    main()
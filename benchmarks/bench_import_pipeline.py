@@ -0,0 +1,66 @@
+"""Offline throughput benchmark for the whole S3 import loop.
+
+Builds a local eventstore mirror under a temp directory: ``--messages``
+objects for one day, cycling through the vendored sema samples
+(``src/gjk/sema/samples``), each wrapped the way the eventstore stores it.
+Types the importer does not persist are filtered out at listing, as they
+are against the real bucket. Then runs ``s3_message_importer.main``
+against it with ``--source`` and ``--dry-run``: listing, download, decode,
+and the run summary, with no S3 and no database. The summary's throughput
+line is the result; ``--tar`` packs the mirror into a tar archive first.
+
+Run from the repo root:
+    uv run python benchmarks/bench_import_pipeline.py [--messages 20000]
+"""
+
+import argparse
+import json
+import tarfile
+import tempfile
+import time
+from pathlib import Path
+
+from gjk import s3_message_importer
+
+SAMPLES = Path(__file__).resolve().parent.parent / "src" / "gjk" / "sema" / "samples"
+DAY_MS = 1779494400000  # 2026-05-23T00:00:00Z
+
+
+def build_mirror(root: Path, n_messages: int) -> None:
+    bodies = []
+    for path in sorted(SAMPLES.glob("*.json")):
+        payload = json.loads(path.read_text())
+        bodies.append((payload["TypeName"], json.dumps({"Payload": payload})))
+    day = root / "hw1__1" / "eventstore" / "20260523"
+    day.mkdir(parents=True)
+    for i in range(n_messages):
+        type_name, body = bodies[i % len(bodies)]
+        (day / f"src{i % 50}-{type_name}-{DAY_MS + i}-ear.json").write_text(body)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--messages", type=int, default=20000)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--tar", action="store_true", help="read from a tar archive")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        mirror = Path(tmp) / "mirror"
+        build_mirror(mirror, args.messages)
+        source = mirror
+        if args.tar:
+            source = Path(tmp) / "eventstore.tar"
+            with tarfile.open(source, "w") as tar:
+                tar.add(mirror / "hw1__1", arcname="hw1__1")
+        started = time.perf_counter()
+        s3_message_importer.main(
+            ["--start", "2026-05-23", "--end", "2026-05-23", "--dry-run"]
+            + ["--source", str(source), "--concurrency", str(args.concurrency)]
+        )
+        elapsed = time.perf_counter() - started
+    print(f"{args.messages} objects listed, whole run {elapsed:.2f} s")
+
+
+if __name__ == "__main__":
+    main()
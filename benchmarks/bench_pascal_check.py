@@ -0,0 +1,65 @@
+"""Benchmark the PascalCase check on the decode path, per sample type.
+
+For every vendored sema sample (``src/gjk/sema/samples``), times:
+
+- ``walk``: the PascalCase tree walk alone — sema's ``recursively_pascal``
+  against JournalCodec's cached-key version;
+- ``decode``: a full ``from_dict`` — ``SemaCodec`` (two walks) against
+  ``JournalCodec`` (one).
+
+Run from the repo root:
+    uv run python benchmarks/bench_pascal_check.py [--filter report]
+"""
+
+import argparse
+import json
+import timeit
+from pathlib import Path
+
+from gjk.journal_codec import JournalCodec
+from gjk.journal_codec import recursively_pascal as cached_pascal
+from gjk.sema import SemaCodec
+from gjk.sema.base import recursively_pascal as sema_pascal
+
+SAMPLES = Path(__file__).resolve().parent.parent / "src" / "gjk" / "sema" / "samples"
+
+
+def best_us(fn, number: int, repeat: int) -> float:
+    return min(timeit.repeat(fn, number=number, repeat=repeat)) / number * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--filter", default="", help="only samples containing this")
+    parser.add_argument("--number", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    sema, journal = SemaCodec(), JournalCodec()
+    print(
+        f"{'sample':42s} {'walk sema':>10s} {'cached':>8s}"
+        f" {'decode sema':>12s} {'journal':>8s}  (us)"
+    )
+    totals = [0.0, 0.0, 0.0, 0.0]
+    for path in sorted(SAMPLES.glob("*.json")):
+        if args.filter not in path.stem:
+            continue
+        data = json.loads(path.read_text())
+        row = [
+            best_us(lambda: sema_pascal(data), args.number, args.repeat),
+            best_us(lambda: cached_pascal(data), args.number, args.repeat),
+            best_us(lambda: sema.from_dict(data), args.number, args.repeat),
+            best_us(lambda: journal.from_dict(data), args.number, args.repeat),
+        ]
+        totals = [t + r for t, r in zip(totals, row)]
+        print(
+            f"{path.stem:42s} {row[0]:10.1f} {row[1]:8.1f} {row[2]:12.1f} {row[3]:8.1f}"
+        )
+    print(
+        f"{'total':42s} {totals[0]:10.1f} {totals[1]:8.1f}"
+        f" {totals[2]:12.1f} {totals[3]:8.1f}"
+    )
+
+
+if __name__ == "__main__":
+    main()
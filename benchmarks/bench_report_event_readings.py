@@ -0,0 +1,132 @@
+"""Benchmark report.event reading extraction.
+
+Compares three ways of turning a report's channel readings into rows:
+
+- ``orm``: the original loop — a ``ReadingSql`` and a ``datetime`` per
+  sample, de-duplicated through a dict, then ``__dict__``-ed into a row.
+- ``dict``: the same dict de-duplication feeding a ReadingBatch.
+- ``batch``: ``first_occurrences`` + ``ReadingBatch.extend_channel``, the
+  path ``ReportEventPersistor.persist_readings`` takes.
+
+The report is built from the real channel readings in
+``tests/data/sample_messages/batched_reading.json``, tiled forward in time
+until it carries ``--readings`` samples (a busy 5-minute report is a few
+thousand); ``--dup-every`` repeats one sample in N to exercise the
+duplicate path.
+
+Run from the repo root:
+    uv run python benchmarks/bench_report_event_readings.py
+"""
+
+import argparse
+import json
+import timeit
+import uuid
+from datetime import datetime, timezone
+from pathlib import Path
+
+from gw_data.db.models import ReadingSql
+
+from gjk.reading_batch import ReadingBatch, first_occurrences
+
+SAMPLE = (
+    Path(__file__).resolve().parent.parent
+    / "tests"
+    / "data"
+    / "sample_messages"
+    / "batched_reading.json"
+)
+
+
+def build_report(
+    n_readings: int, dup_every: int
+) -> list[tuple[uuid.UUID, list[int], list[int]]]:
+    sample = json.loads(SAMPLE.read_text())
+    base = [
+        (ch["ScadaReadTimeUnixMsList"], ch["ValueList"])
+        for ch in sample["ChannelReadingList"]
+        if ch["ValueList"]
+    ]
+    span_ms = sample["BatchedTransmissionPeriodS"] * 1000
+    channels = [(uuid.uuid4(), [], []) for _ in base]
+    total, shift = 0, 0
+    while total < n_readings:
+        for (_, ts_out, v_out), (ts_in, v_in) in zip(channels, base):
+            ts_out.extend(t + shift for t in ts_in)
+            v_out.extend(v_in)
+            total += len(ts_in)
+        shift += span_ms
+    if dup_every:
+        for _, ts, v in channels:
+            for i in range(dup_every, len(ts), dup_every):
+                ts.insert(i, ts[i - 1])
+                v.insert(i, v[i - 1])
+    return channels
+
+
+def orm_rows(channels, message_id):
+    readings = []
+    for channel_id, timestamps, values in channels:
+        readings_by_ts = {}
+        for ts, value in zip(timestamps, values, strict=True):
+            if ts not in readings_by_ts:
+                readings_by_ts[ts] = ReadingSql(
+                    channel_id=channel_id,
+                    message_id=message_id,
+                    timestamp=datetime.fromtimestamp(ts / 1000, timezone.utc),
+                    value=value,
+                )
+        readings.extend(readings_by_ts.values())
+    return [r.__dict__ for r in readings]
+
+
+def dict_batch(channels, message_id):
+    batch = ReadingBatch()
+    for channel_id, timestamps, values in channels:
+        values_by_ts = {}
+        for ts, value in zip(timestamps, values, strict=True):
+            values_by_ts.setdefault(ts, value)
+        batch.extend_channel(
+            channel_id, message_id, values_by_ts.keys(), values_by_ts.values()
+        )
+    return batch
+
+
+def batch(channels, message_id):
+    batch = ReadingBatch()
+    for channel_id, timestamps, values in channels:
+        ts, vals = first_occurrences(timestamps, values)
+        batch.extend_channel(channel_id, message_id, ts, vals)
+    return batch
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--readings", type=int, default=5000)
+    parser.add_argument("--dup-every", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--number", type=int, default=20)
+    args = parser.parse_args()
+
+    channels = build_report(args.readings, args.dup_every)
+    message_id = uuid.uuid4()
+    n = sum(len(ts) for _, ts, _ in channels)
+
+    expected = list(dict_batch(channels, message_id))
+    assert list(batch(channels, message_id)) == expected
+    assert len(orm_rows(channels, message_id)) == len(expected)
+
+    print(f"{n} samples across {len(channels)} channels, {len(expected)} unique")
+    for name, fn in (("orm", orm_rows), ("dict", dict_batch), ("batch", batch)):
+        best = min(
+            timeit.repeat(
+                lambda fn=fn: fn(channels, message_id),
+                repeat=args.repeat,
+                number=args.number,
+            )
+        )
+        print(f"  {name:6s} {best / args.number * 1e3:8.3f} ms/report")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""Benchmark old-version upgrades, per old-version sample.
+
+For every vendored sema sample (``src/gjk/sema/samples``) at a superseded
+version, times the upgrade of the decoded old model to the latest version:
+
+- ``to_latest``: sema's hop-by-hop ``SemaType.to_latest``;
+- ``plan``: the cached ``gjk.upgrade_plan.upgrade_plan``, as
+  ``JournalCodec`` runs it;
+
+and ``models`` is how many models both build after the old-version decode.
+
+Run from the repo root:
+    uv run python benchmarks/bench_upgrade_plans.py [--filter layout]
+"""
+
+import argparse
+import json
+import timeit
+from pathlib import Path
+
+from gjk.journal_codec import JournalCodec
+from gjk.upgrade_plan import upgrade_plan
+
+SAMPLES = Path(__file__).resolve().parent.parent / "src" / "gjk" / "sema" / "samples"
+
+
+def best_us(fn, number: int, repeat: int) -> float:
+    return min(timeit.repeat(fn, number=number, repeat=repeat)) / number * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--filter", default="", help="only samples containing this")
+    parser.add_argument("--number", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    codec = JournalCodec()
+    print(f"{'sample':42s} {'models':>9s} {'to_latest':>10s} {'plan':>8s}  (us)")
+    for path in sorted(SAMPLES.glob("*.json")):
+        if args.filter not in path.stem:
+            continue
+        data = json.loads(path.read_text())
+        type_name, version = data["TypeName"], data.get("Version")
+        if version not in codec.old_versions.get(type_name, {}):
+            continue
+        old = codec.from_dict(data, auto_upgrade=False)
+        latest = codec.registry[type_name]
+        plan = upgrade_plan(type(old), latest)
+        assert plan.run(old) == old.to_latest(codec.registry)
+        row = (
+            best_us(lambda: old.to_latest(codec.registry), args.number, args.repeat),
+            best_us(lambda: plan.run(old), args.number, args.repeat),
+        )
+        print(f"{path.stem:42s} {plan.validations:>9d} {row[0]:10.1f} {row[1]:8.1f}")
+
+
+if __name__ == "__main__":
+    main()
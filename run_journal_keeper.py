@@ -2,12 +2,12 @@
 import dotenv
 
 from gjk.config import Settings
+from gjk.journal_codec import JournalCodec
 from gjk.journal_keeper import JournalKeeper
-from gjk.sema import SemaCodec
 
 dotenv.load_dotenv(dotenv.find_dotenv())
 
-jk = JournalKeeper(settings=Settings(), codec=SemaCodec())
+jk = JournalKeeper(settings=Settings(), codec=JournalCodec())
 jk.start()
 # start() is non-blocking (daemon consumer thread); hold the process open.
 jk.consuming_thread.join()
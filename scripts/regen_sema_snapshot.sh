@@ -15,6 +15,12 @@
 #      gjk.sema; do NOT pass "gjk.sema")
 #   3. the built tree is mirrored from <sema>/output/sema into src/gjk/sema
 #
+# One post-build patch: the generated codec.py builds `default_codec =
+# SemaCodec()` at import time, which imports every type module on any import
+# of gjk.sema. The patch defers that to the first use of default_codec (a
+# module-level __getattr__), so gjk.journal_codec's lazy loading pays off.
+# It fails loudly if the generated line changes.
+#
 # The snapshot reflects the sema repo's CURRENT checkout — check out the sema
 # ref you intend to ship from before running.
 #
@@ -50,4 +56,27 @@ echo "==> mirror ${SEMA_REPO}/output/sema -> ${GJK_ROOT}/src/gjk/sema"
 rsync -a --delete --exclude='__pycache__' \
   "${SEMA_REPO}/output/sema/" "${GJK_ROOT}/src/gjk/sema/"
 
+echo "==> make gjk.sema.codec's default_codec lazy"
+python3 - "${GJK_ROOT}/src/gjk/sema/codec.py" <<'PY'
+import sys
+
+path = sys.argv[1]
+eager = "default_codec = SemaCodec()\n"
+lazy = """def __getattr__(name: str):
+    # Building default_codec imports every type module; do it on first use,
+    # not on every import of gjk.sema.
+    if name == "default_codec":
+        global default_codec
+        default_codec = SemaCodec()
+        return default_codec
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+"""
+with open(path) as f:
+    source = f.read()
+if not source.endswith(eager):
+    sys.exit(f"error: {path} no longer ends with {eager!r}; update this patch")
+with open(path, "w") as f:
+    f.write(source[: -len(eager)] + lazy)
+PY
+
 echo "==> done. review the diff (git status) and run: uv run pytest -q"
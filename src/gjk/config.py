@@ -34,6 +34,26 @@ class Settings(ServiceSettings):
     visualizer_api_password: SecretStr = SecretStr("ThermostatAPIKey")
     email_sender: SecretStr = SecretStr("email_sender")
     email_password: SecretStr = SecretStr("email_password")
+    # Live-path micro-batching: persist in one transaction once this many
+    # messages are pending, or once the oldest has waited this long.
+    persist_batch_max_messages: int = 500
+    persist_batch_max_age_ms: int = 200
+    # Deliveries are acked only after their batch commits, so the broker's
+    # unacked window must exceed the batch size or batches never fill.
+    prefetch_count: int = 1000
+    # Live ingest stages: decode threads and persist threads (each with its
+    # own batcher, persistor and DB pool); a source always lands on the same
+    # one of each, so its messages persist in order. ingest_queue_size bounds
+    # each decode queue and each batcher; keep it >= prefetch_count so the
+    # consumer never has to pause in steady state.
+    decode_workers: int = 2
+    persist_workers: int = 1
+    ingest_queue_size: int = 1000
+    # Each terminal asset's cached reading channels are re-read at least this
+    # often. Channels another process (the S3 importer, another keeper)
+    # deactivates keep receiving this process's readings for up to this long;
+    # channels it adds are picked up sooner, on the first lookup that misses.
+    channel_cache_ttl_s: float = 60.0
 
     model_config = ConfigDict(
         env_prefix="GJK_",
@@ -1,8 +1,6 @@
 import uuid
 from datetime import UTC, datetime
 
-from gw_data.db.models import ReadingChannelSql, ReadingSql
-from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.orm import Session
 
 from gjk.message_persistence_info import MessagePersistenceInfo, default_message_id
@@ -11,6 +9,9 @@ from gjk.pseudo_channels import (
     PseudoChannel,
     register_pseudo_channel_factory,
 )
+from gjk.reading_batch import ReadingBatch
+from gjk.reading_channel_registry import ReadingChannelRegistry
+from gjk.readings_writer import insert_readings
 from gjk.sema.enums import Gw1Unit
 from gjk.sema.types.flo_params_house0 import FloParamsHouse0
 from gjk.sema.types.old_versions.flo_params_house0_003 import FloParamsHouse0003
@@ -53,8 +54,9 @@ class FloParamsHouse0Persistor:
     def get_pseudo_channels(cls, layout: ModernLayout) -> list[PseudoChannel]:
         return cls.PSEUDO_CHANNELS
 
-    def __init__(self, logger):
+    def __init__(self, logger, channel_registry: ReadingChannelRegistry | None = None):
         self.logger = logger
+        self.channel_registry = channel_registry or ReadingChannelRegistry()
         self.target_message_type = "flo.params.house0"
 
     def add_readings(
@@ -66,20 +68,11 @@ class FloParamsHouse0Persistor:
     ):
         terminal_asset_alias = from_alias.split(".scada")[0] + ".ta"
 
-        db_channels = (
-            db
-            .query(ReadingChannelSql)
-            .filter(
-                ReadingChannelSql.deactivated_date.is_(None),
-                ReadingChannelSql.terminal_asset_alias == terminal_asset_alias,
-                ReadingChannelSql.name.in_([x.name for x in self.PSEUDO_CHANNELS]),
-            )
-            .all()
+        db_channel_ids_by_name = self.channel_registry.channel_ids(
+            db, terminal_asset_alias, names=[x.name for x in self.PSEUDO_CHANNELS]
         )
 
-        db_channel_ids_by_name = {x.name: x.id for x in db_channels}
-
-        timestamp = datetime.fromtimestamp(flo_params.start_unix_s, tz=UTC)
+        timestamp_ms = flo_params.start_unix_s * 1000
 
         reading_values = {
             "buffer-available-kwh": round(flo_params.buffer_available_kwh * 1000)
@@ -94,25 +87,13 @@ class FloParamsHouse0Persistor:
                 )
                 reading_values["total-usd-per-mwh"] = round(total_price * 1000)
 
-        readings = []
+        readings = ReadingBatch()
         for name, value in reading_values.items():
             db_channel_id = db_channel_ids_by_name.get(name)
             if db_channel_id:
-                readings.append(
-                    ReadingSql(
-                        channel_id=db_channel_id,
-                        message_id=message_id,
-                        timestamp=timestamp,
-                        value=value,
-                    )
-                )
+                readings.append(db_channel_id, message_id, timestamp_ms, value)
 
-        dicts = [r.__dict__ for r in readings]
-        if len(dicts) > 0:
-            stmt = pg_insert(ReadingSql).on_conflict_do_nothing(
-                index_elements=["timestamp", "channel_id"]
-            )
-            db.execute(stmt, dicts)
+        insert_readings(db, readings)
 
     def persist(
         self, from_alias: str, time_received: datetime, floParams: FloParamsType
@@ -0,0 +1,57 @@
+"""Durable progress for long S3 imports.
+
+After each committed batch the importer records the last message it has
+fully processed: everything up to it in listing order is either persisted
+or was skipped. ``--resume`` restarts the same run just after that message,
+instead of from ``--start``.
+
+The file is small JSON, replaced atomically, so a crash mid-write leaves
+the previous checkpoint intact.
+"""
+
+import json
+import os
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+
+@dataclass(frozen=True)
+class ImportCheckpoint:
+    # The run it belongs to: resuming a different run from it would skip the
+    # wrong messages.
+    start: str
+    end: str
+    message_types: list[str]
+    # The last message fully processed.
+    day: str  # YYYYMMDD, the eventstore folder it was listed under
+    persist_ms: int
+    key: str
+    # The --workers of the run; each shard has its own file, so resuming with
+    # another count would find none of them or the wrong ones.
+    workers: int = 1
+
+    def same_run(self, start: str, end: str, message_types: set[str]) -> bool:
+        return (self.start, self.end, self.message_types) == (
+            start,
+            end,
+            sorted(message_types),
+        )
+
+
+def load_checkpoint(path: Path) -> ImportCheckpoint | None:
+    """The checkpoint at ``path``; None if there is none."""
+    try:
+        with open(path) as f:
+            return ImportCheckpoint(**json.load(f))
+    except FileNotFoundError:
+        return None
+
+
+def save_checkpoint(path: Path, checkpoint: ImportCheckpoint) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "w") as f:
+        json.dump(asdict(checkpoint), f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
@@ -0,0 +1,224 @@
+"""The live ingest path as three stages: consume → decode → persist.
+
+The AMQP consumer thread only enqueues raw bodies (:meth:`IngestPipeline.submit`).
+Decode workers turn them into :class:`PendingMessage` objects (JSON parse, codec
+decode, capture gate), and persist workers commit them in micro-batches through
+a :class:`MessageBatcher` each. A slow decode or a slow commit therefore no
+longer holds up the ioloop, which keeps serving heartbeats and deliveries.
+
+Ordering: every from_alias is pinned to one decode worker and one persist
+worker (a stable hash of the alias), and each stage is FIFO, so one source's
+messages persist in arrival order. Different sources proceed independently.
+
+Backpressure: each decode worker reads from a bounded queue, and every
+batcher holds at most ``max_pending`` messages. A full batcher blocks its
+decode worker, but nothing blocks the consumer: a full decode queue refuses
+the delivery (:meth:`IngestPipeline.submit` returns False), and every one
+after it, until the queues have drained to half. The caller hands refused
+deliveries back to the broker and pauses consuming until ``on_resume``.
+In steady state the broker's prefetch window (deliveries are acked after
+commit) is the real bound, so queues sized at or above it never fill.
+
+The thread that calls :meth:`IngestPipeline.run` (JournalKeeper's main
+thread) supervises: it starts the workers and restarts any that die. On
+:meth:`IngestPipeline.stop` it lets decode finish, then persist, then drains
+what is left.
+"""
+
+import queue
+import threading
+import zlib
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any
+
+from gjk.message_batcher import MessageBatcher
+from gjk.message_persistence_info import PendingMessage
+
+DEFAULT_DECODE_WORKERS = 2
+DEFAULT_QUEUE_SIZE = 1000
+
+
+@dataclass
+class RawDelivery:
+    """A received body waiting for the decode stage."""
+
+    from_alias: str
+    body: bytes
+    time_received: datetime
+    # Opaque; handed back through on_dropped if decode drops the message, or
+    # carried on the PendingMessage otherwise.
+    ack_handle: Any = None
+
+
+def shard_for(from_alias: str, n: int) -> int:
+    """Stable worker index for a source (``hash()`` is salted per process)."""
+    return zlib.crc32(from_alias.encode()) % n
+
+
+class IngestPipeline:
+    def __init__(
+        self,
+        decode: Callable[[RawDelivery], PendingMessage | None],
+        batchers: list[MessageBatcher],
+        logger,
+        decode_workers: int = DEFAULT_DECODE_WORKERS,
+        queue_size: int = DEFAULT_QUEUE_SIZE,
+        on_dropped: Callable[[RawDelivery], None] | None = None,
+        on_resume: Callable[[], None] | None = None,
+    ):
+        if not batchers or decode_workers < 1:
+            raise ValueError("need at least one decode worker and one batcher")
+        if any(
+            b.max_pending is not None and b.max_pending < b.max_messages
+            for b in batchers
+        ):
+            raise ValueError("a batcher's max_pending must be >= its max_messages")
+        # Returns None for anything it drops (undecodable, degraded,
+        # uncaptured); an exception is logged and counts as a drop.
+        self.decode = decode
+        self.batchers = batchers
+        self.logger = logger
+        # Called with each delivery decode dropped — the point where a live
+        # consumer acks it.
+        self.on_dropped = on_dropped
+        # Called (on a decode worker) once the queues have room again after
+        # submit refused a delivery.
+        self.on_resume = on_resume
+        self._queues: list[queue.Queue[RawDelivery]] = [
+            queue.Queue(maxsize=queue_size) for _ in range(decode_workers)
+        ]
+        self._refusing = threading.Event()
+        self._resume_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._stop_persist = threading.Event()
+        self._decode_threads: list[threading.Thread | None] = [None] * decode_workers
+        self._persist_threads: list[threading.Thread | None] = [None] * len(batchers)
+
+    def submit(self, delivery: RawDelivery) -> bool:
+        """Enqueue a received body without blocking. Returns False if its
+        decode queue is full, and for every delivery after that until the
+        queues have drained (so a source's refused deliveries are not
+        overtaken by its later ones); the caller still owns those."""
+        if self._refusing.is_set():
+            return False
+        shard = shard_for(delivery.from_alias, len(self._queues))
+        try:
+            self._queues[shard].put_nowait(delivery)
+        except queue.Full:
+            self._refusing.set()
+            return False
+        return True
+
+    # ------------------------------------------------------------------
+    # Supervisor
+    # ------------------------------------------------------------------
+
+    def run(self, check_interval_s: float = 1.0) -> None:
+        """Run the stages until :meth:`stop`, restarting any worker that
+        dies, then shut them down in stage order and drain the remainder."""
+        self._ensure_workers()
+        while not self._stop.wait(check_interval_s):
+            self._ensure_workers()
+        self._join(self._decode_threads)
+        self._stop_persist.set()
+        for batcher in self.batchers:
+            batcher.wake()
+        self._join(self._persist_threads)
+        self.drain()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def drain(self) -> int:
+        """Decode everything queued and flush every batcher on the calling
+        thread. Only safe once the workers are stopped (or never started).
+        Returns the number of messages flushed."""
+        for q in self._queues:
+            while True:
+                try:
+                    delivery = q.get_nowait()
+                except queue.Empty:
+                    break
+                batcher = self._handle(delivery)
+                if batcher is not None and batcher.full:
+                    batcher.flush()
+        return sum(batcher.flush() for batcher in self.batchers)
+
+    def _ensure_workers(self) -> None:
+        for i, t in enumerate(self._decode_threads):
+            if t is None or not t.is_alive():
+                if t is not None:
+                    self.logger.error(f"Decode worker {i} died; restarting it")
+                self._decode_threads[i] = self._start(
+                    f"gjk-decode-{i}", self._decode_loop, i
+                )
+        for i, t in enumerate(self._persist_threads):
+            if t is None or not t.is_alive():
+                if t is not None:
+                    self.logger.error(f"Persist worker {i} died; restarting it")
+                self._persist_threads[i] = self._start(
+                    f"gjk-persist-{i}", self._persist_loop, i
+                )
+
+    @staticmethod
+    def _start(name: str, target: Callable[[int], None], i: int) -> threading.Thread:
+        t = threading.Thread(target=target, args=(i,), name=name, daemon=True)
+        t.start()
+        return t
+
+    @staticmethod
+    def _join(threads: list[threading.Thread | None]) -> None:
+        for t in threads:
+            if t is not None:
+                t.join()
+
+    # ------------------------------------------------------------------
+    # Workers
+    # ------------------------------------------------------------------
+
+    def _decode_loop(self, i: int) -> None:
+        q = self._queues[i]
+        while not self._stop.is_set():
+            try:
+                delivery = q.get(timeout=0.5)
+            except queue.Empty:
+                delivery = None
+            if delivery is not None:
+                self._handle(delivery)
+            if self._refusing.is_set():
+                self._maybe_resume()
+
+    def _maybe_resume(self) -> None:
+        """Accept deliveries again once every decode queue is at most half
+        full."""
+        if any(q.qsize() > q.maxsize // 2 for q in self._queues):
+            return
+        with self._resume_lock:
+            if not self._refusing.is_set():
+                return
+            self._refusing.clear()
+        if self.on_resume is not None:
+            self.on_resume()
+
+    def _persist_loop(self, i: int) -> None:
+        batcher = self.batchers[i]
+        while not self._stop_persist.is_set():
+            batcher.flush_when_due(timeout=1.0)
+
+    def _handle(self, delivery: RawDelivery) -> MessageBatcher | None:
+        """Decode one delivery into its batcher; returns that batcher, or
+        None if decode dropped it."""
+        try:
+            msg = self.decode(delivery)
+        except Exception as e:
+            self.logger.error(f"Decode failed from {delivery.from_alias}: {e!r}")
+            msg = None
+        if msg is None:
+            if self.on_dropped is not None:
+                self.on_dropped(delivery)
+            return None
+        batcher = self.batchers[shard_for(delivery.from_alias, len(self.batchers))]
+        batcher.add(msg)
+        return batcher
@@ -0,0 +1,609 @@
+"""SemaCodec with gjk's decode-path speedups.
+
+``gjk.sema`` is a generated snapshot (regenerated by
+``scripts/regen_sema_snapshot.sh``), so changes to how gjk decodes live here
+as a subclass instead of edits to the snapshot. Use :class:`JournalCodec`
+wherever a ``SemaCodec`` is expected.
+
+PascalCase: ``SemaCodec._decode`` walks the whole payload with
+``recursively_pascal`` and then ``SemaType.from_dict`` walks it again, and
+both run a regex per key. For a large report.event or layout.lite that is two
+full tree walks before pydantic starts. :class:`JournalCodec` checks once,
+remembering every key it has accepted (sema key vocabularies are small and
+repeat constantly), and then validates without the second walk.
+
+Type loading: ``SemaCodec()`` imports every type module, old versions
+included, to build its registry. :class:`JournalCodec` resolves types
+lazily from the snapshot's ``indexes/lookup.yaml``. A type's module is
+imported on the first decode of that type, and a capture set
+(:meth:`JournalCodec.limit_to`) restricts which types resolve at all. Each
+generated module imports its own nested types, so resolving a type needs no
+separate walk of ``indexes/dependency_closure.yaml``. The snapshot's
+``default_codec`` is built on first use (``scripts/regen_sema_snapshot.sh``
+patches it so), so importing this module imports no type module at all.
+
+Degraded decode: for a known type at an unknown version, ``SemaCodec``
+rebuilds the type's field set and regex-converts every key, per message. A
+backfill across a version gap does that millions of times, so
+:class:`JournalCodec` builds each type's field index once
+(:func:`degraded_field_index`) and classifies keys against it. It also warns
+once per (type, version) rather than per message, and counts these decodes
+in :attr:`JournalCodec.indexed_degraded`.
+
+Upgrades: an old version upgrades through its cached
+:func:`gjk.upgrade_plan.upgrade_plan` instead of ``to_latest``.
+
+Bytes: ``SemaCodec.from_bytes`` is ``json.loads`` then ``from_dict``, so a
+message becomes a Python dict, is walked for PascalCase, and is validated.
+:meth:`JournalCodec.from_bytes` reads TypeName and Version from the bytes,
+picks the class, and validates the bytes with pydantic-core's own parser,
+with no intermediate dict. The PascalCase contract holds because
+validation accepts field aliases only (``by_name=False``). That covers
+every key only for classes whose aliases are all PascalCase and whose
+fields, nested models included, hold no free-form dicts
+(:func:`json_decodable`). Other classes, unknown versions, and anything
+that fails validation go through ``from_dict``, so degraded decodes and
+error messages are unchanged.
+
+Trusted decode: a large layout.lite or report.event spends much of its
+decode in the ``check_axiom_*`` model validators, some of which cross-check
+every item of one list against another. ``from_bytes(..., trusted=True)``
+validates with a copy of the class's core schema that has the model
+validators removed (:func:`trusted_validator`): the JSON is still parsed,
+typed and field-checked into the same nested models, but no axiom runs.
+It is for re-importing objects that were validated once already; callers
+should fully validate a sample.
+"""
+
+import functools
+import json
+import logging
+import threading
+import typing
+from collections import Counter
+from collections.abc import Iterable, Iterator, Mapping
+from importlib import import_module
+from pathlib import Path
+from typing import Any, Literal
+
+import yaml
+from pydantic import (
+    BaseModel,
+    ConfigDict,
+    Field,
+    TypeAdapter,
+    ValidationError,
+    create_model,
+)
+from pydantic.types import Strict
+from pydantic_core import SchemaValidator
+
+from gjk.sema import SemaCodec, SemaError, SemaType
+from gjk.sema.base import (
+    DegradedSemaType,
+    is_pascal_case,
+    pascal_to_snake,
+    snake_to_pascal,
+)
+from gjk.upgrade_plan import upgrade_plan
+
+logger = logging.getLogger(__name__)
+
+
+class MissingPayloadError(SemaError, ValueError):
+    """A wrapped message body (``from_bytes(..., wrapped=True)``) with no
+    ``Payload``."""
+
+
+_LOOKUP = Path(__file__).resolve().parent / "sema" / "indexes" / "lookup.yaml"
+
+# Keys already accepted as PascalCase. Bounded in case a payload carries
+# free-form keys; once full, new keys are checked but not remembered.
+_PASCAL_KEYS: set[str] = set()
+_PASCAL_KEYS_MAX = 4096
+
+
+def _pascal_key(key: Any) -> bool:
+    if key in _PASCAL_KEYS:
+        return True
+    # The same rule as gjk.sema.base.recursively_pascal: keys that do not
+    # start with a letter are not checked.
+    if not (key and key[0].isalpha()):
+        return True
+    if not is_pascal_case(key):
+        return False
+    if len(_PASCAL_KEYS) < _PASCAL_KEYS_MAX:
+        _PASCAL_KEYS.add(key)
+    return True
+
+
+def recursively_pascal(d: Any) -> bool:
+    """``gjk.sema.base.recursively_pascal`` with accepted keys cached."""
+    if isinstance(d, dict):
+        for key, value in d.items():
+            if not _pascal_key(key):
+                return False
+            if isinstance(value, (dict, list)) and not recursively_pascal(value):
+                return False
+    elif isinstance(d, list):
+        for item in d:
+            if isinstance(item, (dict, list)) and not recursively_pascal(item):
+                return False
+    return True
+
+
+def _validate(cls: type[SemaType], data: dict) -> SemaType:
+    """``cls.from_dict(data)`` for data already checked PascalCase."""
+    try:
+        return cls.model_validate(data)
+    except ValidationError as e:
+        raise SemaError(f"Validation failed: {e}") from e
+
+
+class FieldIndex:
+    """Which top-level payload keys a type knows, for degraded decodes.
+
+    The same rule as ``SemaCodec``'s degraded mode: a key is known if it is
+    a field name, its PascalCase form or its alias, or if its snake_case
+    form is one of those. Each key's answer is remembered, so a repeat key
+    costs one dict lookup.
+    """
+
+    def __init__(self, cls: type[SemaType]):
+        valid = set()
+        for field_name, field_info in cls.model_fields.items():
+            valid.add(snake_to_pascal(field_name))
+            valid.add(field_name)
+            if field_info.alias:
+                valid.add(field_info.alias)
+        self._valid = frozenset(valid)
+        self._known: dict[str, bool] = dict.fromkeys(valid, True)
+
+    def is_known(self, key: str) -> bool:
+        known = self._known.get(key)
+        if known is None:
+            known = key in self._valid or pascal_to_snake(key) in self._valid
+            # Bounded like _PASCAL_KEYS.
+            if len(self._known) < _PASCAL_KEYS_MAX:
+                self._known[key] = known
+        return known
+
+    def split(self, data: dict) -> tuple[dict, dict]:
+        """``data`` as (known, unknown) fields, in one pass."""
+        known: dict[str, Any] = {}
+        unknown: dict[str, Any] = {}
+        for key, value in data.items():
+            (known if self.is_known(key) else unknown)[key] = value
+        return known, unknown
+
+
+@functools.cache
+def degraded_field_index(cls: type[SemaType]) -> FieldIndex:
+    return FieldIndex(cls)
+
+
+class _Header(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+    type_name: Any = Field(alias="TypeName")
+    version: Any = Field(None, alias="Version")
+
+
+class _WrappedHeader(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+    payload: _Header = Field(alias="Payload")
+
+
+_HEADER = TypeAdapter(_Header)
+_WRAPPED_HEADER = TypeAdapter(_WrappedHeader)
+
+
+# Strict validation of these reads JSON and Python input alike; for other
+# types (enums, UUIDs, datetimes, tuples) JSON input is laxer.
+_STRICT_SAME_IN_JSON = (int, float, str, bool)
+
+
+def _strict_differs(annotation: Any, metadata: Iterable[Any]) -> bool:
+    return annotation not in _STRICT_SAME_IN_JSON and any(
+        isinstance(m, Strict) for m in metadata
+    )
+
+
+def _json_safe(annotation: Any, seen: set[type]) -> bool:
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return _model_json_safe(annotation, seen)
+    origin = typing.get_origin(annotation)
+    if origin is typing.Literal:
+        return True
+    if origin is typing.Annotated:
+        base, *metadata = typing.get_args(annotation)
+        return not _strict_differs(base, metadata) and _json_safe(base, seen)
+    return all(_json_safe(arg, seen) for arg in typing.get_args(annotation))
+
+
+def _model_json_safe(cls: type[BaseModel], seen: set[type]) -> bool:
+    if cls in seen:
+        return True
+    seen.add(cls)
+    # "ignore" would drop a bad key unseen; "allow" keeps it for
+    # _validated_pascal.
+    if cls.model_config.get("extra") not in ("forbid", "allow"):
+        return False
+    if cls.model_config.get("strict"):
+        return False
+    for field_name, field_info in cls.model_fields.items():
+        alias = field_info.validation_alias or field_info.alias or field_name
+        if not (isinstance(alias, str) and is_pascal_case(alias)):
+            return False
+        if _strict_differs(field_info.annotation, field_info.metadata):
+            return False
+        if not _json_safe(field_info.annotation, seen):
+            return False
+    return True
+
+
+@functools.cache
+def json_decodable(cls: type[SemaType]) -> bool:
+    """True if JSON validation of ``cls`` by alias, followed by
+    :func:`_validated_pascal`, rejects whatever ``recursively_pascal`` and
+    ``model_validate`` would: every model key is a PascalCase alias, and no
+    strict check is laxer on JSON input."""
+    return _model_json_safe(cls, set())
+
+
+def _unchecked(annotation: Any, seen: set[type]) -> bool:
+    """True if a value of ``annotation`` can hold keys that alias-only
+    validation does not check: free-form dicts, or models with extras."""
+    if annotation is Any or annotation is object:
+        return True
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return annotation.model_config.get("extra") == "allow" or bool(
+            _unchecked_fields(annotation, seen)
+        )
+    origin = typing.get_origin(annotation)
+    if origin is typing.Literal:
+        return False
+    mapping = origin if origin is not None else annotation
+    if isinstance(mapping, type) and issubclass(mapping, Mapping):
+        return True
+    return any(_unchecked(arg, seen) for arg in typing.get_args(annotation))
+
+
+_UNCHECKED_FIELDS: dict[type[BaseModel], tuple[str, ...]] = {}
+
+
+def _unchecked_fields(
+    cls: type[BaseModel], seen: set[type] | None = None
+) -> tuple[str, ...]:
+    """The fields of ``cls`` whose values :func:`_validated_pascal` walks."""
+    fields = _UNCHECKED_FIELDS.get(cls)
+    if fields is None:
+        seen = set() if seen is None else seen
+        if cls in seen:
+            return ()
+        seen.add(cls)
+        fields = _UNCHECKED_FIELDS[cls] = tuple(
+            name
+            for name, field_info in cls.model_fields.items()
+            if _unchecked(field_info.annotation, seen)
+        )
+    return fields
+
+
+def _validated_pascal(obj: Any) -> bool:
+    """``recursively_pascal`` over the keys in a validated model that
+    alias-only validation let through: extras and free-form dicts."""
+    if isinstance(obj, BaseModel):
+        if obj.__pydantic_extra__ and not _validated_pascal(obj.__pydantic_extra__):
+            return False
+        return all(
+            _validated_pascal(getattr(obj, f)) for f in _unchecked_fields(type(obj))
+        )
+    if isinstance(obj, dict):
+        return all(_pascal_key(k) and _validated_pascal(v) for k, v in obj.items())
+    if isinstance(obj, (list, tuple)):
+        return all(_validated_pascal(item) for item in obj)
+    return True
+
+
+@functools.cache
+def _wrapped_adapter(cls: type[SemaType]) -> TypeAdapter:
+    """Validates ``{"Payload": <cls>, ...}``, ignoring the envelope's other
+    keys as the dict path does."""
+    wrapper = create_model(
+        f"Wrapped{cls.__name__}",
+        __config__=ConfigDict(extra="ignore"),
+        payload=(cls, Field(alias="Payload")),
+    )
+    return TypeAdapter(wrapper)
+
+
+def _is_model(schema: dict) -> bool:
+    while schema["type"].startswith("function-"):
+        schema = schema["schema"]
+    return schema["type"] == "model"
+
+
+def _without_axioms(schema: Any) -> Any:
+    """``schema`` (a core schema, or part of one) with every model validator
+    replaced by the model schema it wraps. Field validators stay."""
+    if isinstance(schema, dict):
+        kind = schema.get("type")
+        if not (
+            kind in ("function-before", "function-after", "function-wrap")
+            and _is_model(schema["schema"])
+        ):
+            return {k: _without_axioms(v) for k, v in schema.items()}
+        inner = _without_axioms(schema["schema"])
+        # The outermost validator holds the model's definition ref.
+        if "ref" in schema:
+            inner = {**inner, "ref": schema["ref"]}
+        return inner
+    if isinstance(schema, list):
+        return [_without_axioms(v) for v in schema]
+    return schema
+
+
+@functools.cache
+def trusted_validator(cls: type[SemaType], wrapped: bool) -> SchemaValidator:
+    """Validates JSON into ``cls`` (in an envelope if ``wrapped``) without
+    running any model validator, in ``cls`` or in the models it nests.
+
+    pydantic-core reuses a nested model's own validator wherever that
+    validator is the bare model, i.e. for models with no model validators,
+    which then run their field validators as usual. The envelope is a
+    typed dict rather than a model so that it is never reused whole."""
+    schema = _without_axioms(cls.__pydantic_core_schema__)
+    if wrapped:
+        schema = {
+            "type": "typed-dict",
+            "fields": {
+                "payload": {
+                    "type": "typed-dict-field",
+                    "schema": schema,
+                    "required": True,
+                    "validation_alias": "Payload",
+                }
+            },
+            "extra_behavior": "ignore",
+        }
+    return SchemaValidator(schema)
+
+
+@functools.cache
+def sema_lookup() -> dict[str, dict[str, Any]]:
+    """The snapshot's type index: type name -> latest_version, versions."""
+    with open(_LOOKUP) as f:
+        return yaml.safe_load(f)["types"]
+
+
+def _load_type(type_name: str, version: str, latest: bool) -> type[SemaType]:
+    stem = type_name.replace(".", "_")
+    module = import_module(
+        f"gjk.sema.types.{stem}"
+        if latest
+        else f"gjk.sema.types.old_versions.{stem}_{version}"
+    )
+    for obj in vars(module).values():
+        if (
+            isinstance(obj, type)
+            and issubclass(obj, SemaType)
+            and obj is not SemaType
+            and obj.type_name_value() == type_name
+            and obj.version_value() == version
+        ):
+            return obj
+    raise SemaError(f"{module.__name__} defines no {type_name} v{version}")
+
+
+class _LazyTypes(Mapping[str, type[SemaType]]):
+    """Latest class per type name, imported on first lookup."""
+
+    def __init__(self, type_names: Iterable[str]):
+        self._names = frozenset(type_names)
+        self._loaded: dict[str, type[SemaType]] = {}
+
+    def __getitem__(self, type_name: str) -> type[SemaType]:
+        cls = self._loaded.get(type_name)
+        if cls is None:
+            if type_name not in self._names:
+                raise KeyError(type_name)
+            entry = sema_lookup()[type_name]
+            cls = self._loaded[type_name] = _load_type(
+                type_name, entry["latest_version"], latest=True
+            )
+        return cls
+
+    def __contains__(self, type_name: object) -> bool:
+        return type_name in self._names
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._names)
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+
+class _LazyOldVersions(Mapping[str | None, type[SemaType]]):
+    """A type's superseded versions, each imported on first lookup."""
+
+    def __init__(self, type_name: str):
+        entry = sema_lookup()[type_name]
+        self._type_name = type_name
+        self._versions = frozenset(
+            v for v in entry["versions"] if v != entry["latest_version"]
+        )
+        self._loaded: dict[str | None, type[SemaType]] = {}
+
+    def __getitem__(self, version: str | None) -> type[SemaType]:
+        cls = self._loaded.get(version)
+        if cls is None:
+            if version not in self._versions:
+                raise KeyError(version)
+            cls = self._loaded[version] = _load_type(
+                self._type_name, version, latest=False
+            )
+        return cls
+
+    def __contains__(self, version: object) -> bool:
+        return version in self._versions
+
+    def __iter__(self) -> Iterator[str | None]:
+        return iter(self._versions)
+
+    def __len__(self) -> int:
+        return len(self._versions)
+
+
+class JournalCodec(SemaCodec):
+    def __init__(self, capture: Iterable[str] | None = None) -> None:
+        # Deliberately not SemaCodec.__init__, which imports every type.
+        self.limit_to(capture)
+        # Degraded decodes of a known type at an unknown version, by
+        # (type_name, version).
+        self.indexed_degraded: Counter[tuple[str, str | None]] = Counter()
+        self._counts_lock = threading.Lock()
+
+    def limit_to(self, capture: Iterable[str] | None) -> None:
+        """Resolve only the ``capture`` type names (every type when None);
+        any other type decodes as an unknown type."""
+        names = set(sema_lookup())
+        if capture is not None:
+            names &= set(capture)
+        self.registry = _LazyTypes(names)
+        self.old_versions = {name: _LazyOldVersions(name) for name in names}
+
+    def _decode(
+        self,
+        data: dict,
+        mode: Literal["strict", "degraded"] = "strict",
+        auto_upgrade: bool = True,
+    ) -> SemaType | DegradedSemaType:
+        if not isinstance(data, dict) or "TypeName" not in data:
+            return super()._decode(data, mode, auto_upgrade)
+
+        if not recursively_pascal(data := dict(data)):
+            raise ValueError("Input must be PascalCase")
+
+        type_name = data["TypeName"]
+        version = data.get("Version")
+        current_cls = self.registry.get(type_name)
+        if current_cls is not None:
+            if version == current_cls.version_value():
+                return _validate(current_cls, data)
+            old_cls = self.old_versions.get(type_name, {}).get(version)
+            if old_cls is not None:
+                old_instance = _validate(old_cls, data)
+                return self._upgrade(old_instance, current_cls, auto_upgrade)
+            if mode == "degraded":
+                return self._degrade(current_cls, data)
+        # Unknown type, or strict mode: the base class's handling as-is.
+        return super()._decode(data, mode, auto_upgrade)
+
+    def _upgrade(
+        self, instance: SemaType, current_cls: type[SemaType], auto_upgrade: bool
+    ) -> SemaType:
+        if not auto_upgrade:
+            return instance
+        plan = upgrade_plan(type(instance), current_cls)
+        if plan is None:
+            return instance.to_latest(self.registry)
+        return plan.run(instance)
+
+    def from_bytes(
+        self,
+        data: bytes,
+        mode: Literal["strict", "degraded"] = "strict",
+        auto_upgrade: bool = True,
+        *,
+        wrapped: bool = False,
+        trusted: bool = False,
+    ) -> SemaType | DegradedSemaType:
+        """Decode JSON bytes, validating them directly where the class
+        allows it; the result (or error) is what ``from_dict`` gives for the
+        parsed bytes. ``wrapped`` bytes are an envelope whose ``Payload`` is
+        the message; an envelope without one raises
+        :class:`MissingPayloadError`. ``trusted`` skips the model validators
+        wherever the bytes path applies."""
+        decoded = self._from_json(data, auto_upgrade, wrapped, trusted)
+        if decoded is not None:
+            return decoded
+        try:
+            d = json.loads(data.decode("utf-8"))
+        except Exception as e:
+            raise ValueError(f"Invalid JSON: {e}") from e
+        if wrapped:
+            if not (isinstance(d, dict) and "Payload" in d):
+                raise MissingPayloadError("Wrapped message has no Payload")
+            d = d["Payload"]
+        return self.from_dict(d, mode=mode, auto_upgrade=auto_upgrade)
+
+    def _from_json(
+        self, data: bytes, auto_upgrade: bool, wrapped: bool, trusted: bool = False
+    ) -> SemaType | None:
+        """The bytes path; None wherever ``from_dict`` must decide."""
+        try:
+            header = (
+                _WRAPPED_HEADER.validate_json(data).payload
+                if wrapped
+                else _HEADER.validate_json(data)
+            )
+        except ValidationError:
+            return None
+        type_name, version = header.type_name, header.version
+        if not isinstance(type_name, str):
+            return None
+        current_cls = self.registry.get(type_name)
+        if current_cls is None:
+            return None
+        if version == current_cls.version_value():
+            cls = current_cls
+        else:
+            cls = self.old_versions.get(type_name, {}).get(version)
+            if cls is None:
+                return None
+        if not json_decodable(cls):
+            return None
+        try:
+            if trusted:
+                instance = trusted_validator(cls, wrapped).validate_json(
+                    data, by_alias=True, by_name=False
+                )
+                if wrapped:
+                    instance = instance["payload"]
+            elif wrapped:
+                instance = (
+                    _wrapped_adapter(cls)
+                    .validate_json(data, by_alias=True, by_name=False)
+                    .payload
+                )
+            else:
+                instance = cls.model_validate_json(data, by_alias=True, by_name=False)
+        except ValidationError:
+            return None
+        if not _validated_pascal(instance):
+            return None
+        if cls is current_cls:
+            return instance
+        return self._upgrade(instance, current_cls, auto_upgrade)
+
+    def _degrade(self, current_cls: type[SemaType], data: dict) -> DegradedSemaType:
+        type_name = data["TypeName"]
+        version = data.get("Version")
+        with self._counts_lock:
+            self.indexed_degraded[(type_name, version)] += 1
+            first = self.indexed_degraded[(type_name, version)] == 1
+        if first:
+            logger.warning(
+                "Degraded decode for %s v%s (current v%s)",
+                type_name,
+                version,
+                current_cls.version_value(),
+            )
+        known, unknown = degraded_field_index(current_cls).split(data)
+        return DegradedSemaType(
+            type_name=type_name,
+            version=version,
+            raw=data,
+            known_fields=known,
+            unknown_fields=unknown,
+        )
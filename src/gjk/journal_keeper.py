@@ -10,14 +10,19 @@ from __future__ import annotations
 import json
 import logging
 import threading
-import time
 from datetime import UTC, datetime
+from typing import no_type_check
 
-from gwbase.actor_base import ActorBase
-from gwbase.transport_encoding import RoutingEnvelope
+from gwbase.actor_base import ActorBase, OnReceiveMessageDiagnostic
+from gwbase.transport_encoding import RoutingEnvelope, parse_routing_key
 
 from gjk.config import Settings
+from gjk.ingest_pipeline import IngestPipeline, RawDelivery
+from gjk.journal_codec import JournalCodec, MissingPayloadError
+from gjk.message_batcher import MessageBatcher
+from gjk.message_persistence_info import PendingMessage
 from gjk.sema import SemaCodec, SemaType
+from gjk.sema.base import DegradedSemaType
 from gjk.sema_message_persistor import SemaMessagePersistor
 
 
@@ -44,6 +49,43 @@ class JournalKeeper(ActorBase):
         self._known_types: frozenset[str] = frozenset(
             self.persistor.all_known_message_types()
         )
+        if isinstance(codec, JournalCodec):
+            # Load only the captured types' modules.
+            codec.limit_to(self._known_types)
+        # Received bodies are decoded and persisted off the consumer thread;
+        # each persist worker commits its batches in one transaction, then
+        # acks them. The main thread supervises the stages.
+        # Each persist worker gets its own persistor, and so its own channel
+        # registry: a shared one could hand a worker the channel ids another
+        # worker's still-open transaction created, and keep them after that
+        # transaction rolls back.
+        persistors = [self.persistor] + [
+            SemaMessagePersistor(settings, codec, self.logger)
+            for _ in range(settings.persist_workers - 1)
+        ]
+        self.pipeline: IngestPipeline = IngestPipeline(
+            decode=self._decode_delivery,
+            batchers=[
+                MessageBatcher(
+                    persistor,
+                    self.logger,
+                    max_messages=settings.persist_batch_max_messages,
+                    max_age_s=settings.persist_batch_max_age_ms / 1000,
+                    on_flushed=self._ack_flushed,
+                    max_pending=settings.ingest_queue_size,
+                )
+                for persistor in persistors
+            ],
+            logger=self.logger,
+            decode_workers=settings.decode_workers,
+            queue_size=settings.ingest_queue_size,
+            on_dropped=self._ack_dropped,
+            on_resume=self._schedule_resume,
+        )
+        # Set by on_message for the delivery being dispatched; _persist_body
+        # takes it when it hands the body to the pipeline (which then owns
+        # the ack). Consumer-thread only.
+        self._inflight_ack: tuple[object, int] | None = None
         self._consume_exchange = "ear_tx"
         self.main_thread = threading.Thread(target=self.main, daemon=True)
 
@@ -73,19 +115,137 @@ class JournalKeeper(ActorBase):
         )
 
     def local_start(self) -> None:
-        self._main_loop_running = True
         self.main_thread.start()
 
     def local_stop(self) -> None:
-        self._main_loop_running = False
+        self.pipeline.stop()
         self.main_thread.join()
 
+    # ------------------------------------------------------------------
+    # Receive + ack-after-commit
+    # ------------------------------------------------------------------
+
+    @no_type_check
+    def on_message(self, _unused_channel, basic_deliver, properties, body) -> None:
+        """ActorBase's receive path, minus the up-front ack.
+
+        A delivery handed to the pipeline is acked only after its batch
+        commits (:meth:`_ack_flushed`), or once decode drops it
+        (:meth:`_ack_dropped`: undecodable, degraded, uncaptured), so a crash
+        before then leaves it unacked and the broker redelivers it. Anything
+        dispatch drops up front (outside the capture set) is acked here, as
+        before.
+        """
+        self.latest_routing_key = basic_deliver.routing_key
+        self._inflight_ack = (self._single_channel, basic_deliver.delivery_tag)
+        try:
+            try:
+                envelope = parse_routing_key(basic_deliver.routing_key)
+            except ValueError as e:
+                self._latest_on_message_diagnostic = (
+                    OnReceiveMessageDiagnostic.ROUTING_KEY_PARSE_ERROR
+                )
+                self.on_routing_key_parse_error(
+                    routing_key=basic_deliver.routing_key, body=body, error=e
+                )
+                return
+            self._latest_on_message_diagnostic = (
+                OnReceiveMessageDiagnostic.MESSAGE_DELIVERED
+            )
+            self.dispatch_message(envelope=envelope, body=body)
+        finally:
+            if self._inflight_ack is not None:
+                self.acknowledge_message(basic_deliver.delivery_tag)
+                self._inflight_ack = None
+
+    def _ack_flushed(self, batch: list[PendingMessage]) -> None:
+        """Ack a committed batch (runs on a persist worker)."""
+        self._ack_handles([m.ack_handle for m in batch])
+
+    def _ack_dropped(self, delivery: RawDelivery) -> None:
+        """Ack a delivery decode dropped (runs on a decode worker)."""
+        self._ack_handles([delivery.ack_handle])
+
+    def _ack_handles(self, handles: list[tuple[object, int] | None]) -> None:
+        """Ack deliveries from a pipeline worker thread. pika is not
+        thread-safe, so the acks are marshaled onto the consumer ioloop.
+
+        Delivery tags are channel-scoped: a tag from a channel that has since
+        closed must not be acked on its replacement. The broker requeued
+        those deliveries when the channel closed, and re-persisting them is a
+        no-op (deterministic ids + on_conflict_do_nothing).
+        """
+        acks = [h for h in handles if h is not None]
+        connection = self._consume_connection
+        if not acks or connection is None:
+            return
+
+        def _ack_on_ioloop() -> None:
+            live = self._single_channel
+            for channel, delivery_tag in acks:
+                if channel is live and live is not None and live.is_open:
+                    live.basic_ack(delivery_tag)
+
+        try:
+            connection.ioloop.add_callback_threadsafe(_ack_on_ioloop)
+        except Exception as e:
+            self.logger.warning(
+                f"Could not schedule acks for {len(acks)} persisted messages "
+                f"({e!r}); the broker will redeliver them"
+            )
+
+    def _refuse(self, delivery: RawDelivery) -> None:
+        """Hand back a delivery the pipeline has no room for, and stop
+        consuming until it has (:meth:`_resume_consuming`). Consumer-thread
+        only, so it never blocks the ioloop's heartbeats.
+
+        The nack requeues the delivery in its original place; anything the
+        broker had already sent on the cancelled consumer is rejected by pika
+        and requeued the same way.
+        """
+        channel = self._single_channel
+        if delivery.ack_handle is not None:
+            ack_channel, delivery_tag = delivery.ack_handle
+            if ack_channel is channel and channel is not None and channel.is_open:
+                channel.basic_nack(delivery_tag, requeue=True)
+        if self._consuming and channel is not None and channel.is_open:
+            self.logger.warning("Ingest queues are full; pausing consumption")
+            channel.basic_cancel(self._consumer_tag)
+            # Not consuming: a shutdown now stops the ioloop directly instead
+            # of waiting on a second cancel.
+            self._consuming = False
+
+    def _schedule_resume(self) -> None:
+        """The pipeline has room again (runs on a decode worker)."""
+        connection = self._consume_connection
+        if connection is None:
+            return
+        try:
+            connection.ioloop.add_callback_threadsafe(self._resume_consuming)
+        except Exception as e:
+            self.logger.warning(f"Could not schedule resuming consumption: {e!r}")
+
+    def _resume_consuming(self) -> None:
+        """Consume again after :meth:`_refuse` paused it (ioloop only). A
+        reconnect in between has already started a new consumer."""
+        channel = self._single_channel
+        if (
+            self._consuming
+            or self._closing_consumer
+            or channel is None
+            or not channel.is_open
+        ):
+            return
+        self.logger.info("Ingest queues have room; resuming consumption")
+        self._consumer_tag = channel.basic_consume(self.queue_name, self.on_message)
+        self._consuming = True
+
     # ------------------------------------------------------------------
     # Message dispatch
     # ------------------------------------------------------------------
 
     def dispatch_message(self, *, envelope: RoutingEnvelope, body: bytes) -> None:
-        """Parse with SemaCodec, hand the SemaType to the persistor.
+        """Hand the body to the decode → persist pipeline.
 
         The capture gate: the queue receives the whole bus, so this is
         where the capture set applies — on the parsed envelope's
@@ -149,53 +309,100 @@ class JournalKeeper(ActorBase):
         return "unknown.broadcast.src"
 
     def _persist_body(self, *, from_alias: str, body: bytes) -> None:
-        """Decode a wrapped message body and hand the SemaType to the persistor.
-        Shared by the normal dispatch path and the broadcast ``legacy_hack``.
-        Errors are logged and swallowed — the live path keeps running."""
-        try:
-            msg_dict = json.loads(body.decode("utf-8"))
-        except Exception as e:
-            self.logger.error(f"Failed to decode body as JSON from {from_alias}: {e!r}")
-            return
+        """Queue a wrapped message body for decode and persist. Shared by the
+        normal dispatch path and the broadcast ``legacy_hack``."""
+        delivery = RawDelivery(
+            from_alias=from_alias,
+            body=body,
+            time_received=datetime.now(UTC),
+            ack_handle=self._inflight_ack,
+        )
+        self._inflight_ack = None
+        if not self.pipeline.submit(delivery):
+            self._refuse(delivery)
 
-        # Messages on ear_tx come wrapped: { "Payload": {...}, ... }.
-        # Tolerate the rare unwrapped case (incoming dict already a SemaType).
-        payload_dict = msg_dict.get("Payload", msg_dict)
+    def _decode_delivery(self, delivery: RawDelivery) -> PendingMessage | None:
+        """Decode a wrapped message body into a PendingMessage (decode worker).
+        Errors are logged and swallowed (None) — the live path keeps running."""
+        from_alias = delivery.from_alias
+        if isinstance(self.codec, JournalCodec):
+            # Bytes straight to the model, with no intermediate dict. The
+            # codec only resolves captured types, so an uncaptured one comes
+            # back degraded and is dropped by the capture gate below.
+            try:
+                sema_obj = self.codec.from_bytes(
+                    delivery.body, auto_upgrade=False, mode="degraded", wrapped=True
+                )
+            except MissingPayloadError:
+                # The rare unwrapped body, which the dict path tolerates.
+                sema_obj = self._decode_as_dict(delivery)
+                if sema_obj is None:
+                    return None
+            except Exception as e:
+                self.logger.error(f"Codec decode failed from {from_alias}: {e!r}")
+                return None
+        else:
+            sema_obj = self._decode_as_dict(delivery)
+            if sema_obj is None:
+                return None
 
-        try:
-            sema_obj = self.codec.from_dict(
-                payload_dict, auto_upgrade=False, mode="degraded"
-            )
-        except Exception as e:
-            self.logger.error(f"Codec decode failed from {from_alias}: {e!r}")
-            return
+        # And post-decode: decodable ≠ captured (the snapshot deliberately
+        # holds vocabulary gjk does not persist).
+        if sema_obj.type_name not in self._known_types:
+            return None
 
         if not isinstance(sema_obj, SemaType):
             self.logger.warning(
                 f"Got degraded SEMA type {sema_obj.type_name} "
                 f"(v{sema_obj.version}) from {from_alias} — not persisting"
             )
-            return
+            return None
 
-        # The capture gate again, post-decode: the legacy_hack path has no
-        # parsed envelope to pre-gate on, and decodable ≠ captured (the
-        # snapshot deliberately holds vocabulary gjk does not persist).
-        if sema_obj.type_name not in self._known_types:
-            return
+        return PendingMessage(
+            from_alias=from_alias,
+            time_received=delivery.time_received,
+            payload=sema_obj,
+            ack_handle=delivery.ack_handle,
+        )
 
+    def _decode_as_dict(
+        self, delivery: RawDelivery
+    ) -> SemaType | DegradedSemaType | None:
+        """The decode for any other ``SemaCodec``: bytes to dict, then
+        ``from_dict``. None (logged) if it fails or is not captured."""
+        from_alias = delivery.from_alias
         try:
-            self.persistor.persist_message(from_alias, datetime.now(UTC), sema_obj)
+            msg_dict = json.loads(delivery.body.decode("utf-8"))
         except Exception as e:
-            self.logger.error(
-                f"Persist failed for {sema_obj.type_name} from {from_alias}: {e!r}"
+            self.logger.error(f"Failed to decode body as JSON from {from_alias}: {e!r}")
+            return None
+
+        # Messages on ear_tx come wrapped: { "Payload": {...}, ... }.
+        # Tolerate the rare unwrapped case (incoming dict already a SemaType).
+        payload_dict = msg_dict.get("Payload", msg_dict)
+        # The capture gate again, pre-decode: the legacy_hack path has no
+        # parsed envelope to pre-gate on.
+        if (
+            isinstance(payload_dict, dict)
+            and payload_dict.get("TypeName") not in self._known_types
+        ):
+            return None
+
+        try:
+            return self.codec.from_dict(
+                payload_dict, auto_upgrade=False, mode="degraded"
             )
+        except Exception as e:
+            self.logger.error(f"Codec decode failed from {from_alias}: {e!r}")
+            return None
 
     # ------------------------------------------------------------------
-    # Background loop (placeholder)
+    # Background loop: stage supervisor
     # ------------------------------------------------------------------
 
     def main(self) -> None:
-        # Reserved for periodic S3 catch-up of missed messages
-        # (see s3_message_importer for the import shape).
-        while self._main_loop_running:
-            time.sleep(3600)
+        # Runs the decode and persist workers until local_stop, restarting
+        # any that die; on stop, everything already received is persisted.
+        # (Periodic S3 catch-up of missed messages would also live here —
+        # see s3_message_importer for the import shape.)
+        self.pipeline.run()
@@ -6,6 +6,7 @@ from sqlalchemy.orm import Session
 
 from gjk.message_persistence_info import MessagePersistenceInfo
 from gjk.pseudo_channels import ModernLayout, PseudoChannel, get_pseudo_channels
+from gjk.reading_channel_registry import ReadingChannelRegistry
 from gjk.sema.enums import Gw1Unit, SpaceheatTelemetryName
 from gjk.sema.types import DataChannelGt, DerivedChannelGt, LayoutLite
 from gjk.sema.types.old_versions.data_channel_gt_001 import DataChannelGt001
@@ -18,15 +19,22 @@ from gjk.sema.types.old_versions.layout_lite_011 import LayoutLite011
 
 
 class LayoutLitePersistor:
-    def __init__(self, logger):
+    def __init__(self, logger, channel_registry: ReadingChannelRegistry | None = None):
         self.logger = logger
+        self.channel_registry = channel_registry or ReadingChannelRegistry()
         self.target_message_type = "layout.lite"
 
     class ReadingChannelSyncProcess:
         def __init__(
-            self, logger, db: Session, layout: ModernLayout, terminal_asset_alias: str
+            self,
+            logger,
+            db: Session,
+            layout: ModernLayout,
+            terminal_asset_alias: str,
+            channel_registry: ReadingChannelRegistry | None = None,
         ):
             self.logger = logger
+            self.channel_registry = channel_registry
             self.db = db
             self.layout = layout
             self.msg_timestamp = datetime.fromtimestamp(
@@ -71,6 +79,10 @@ class LayoutLitePersistor:
                 channel_type=PseudoChannel.CHANNEL_TYPE,
             )
 
+        def deactivate(self, db_channel: ReadingChannelSql):
+            db_channel.deactivated_date = self.msg_timestamp
+            self.deactivated_count += 1
+
         def sync_data_channels(self):
             for dc in self.layout.data_channels:
                 db_channel = self.existing_db_channels_by_name.get(dc.name)
@@ -86,7 +98,7 @@ class LayoutLitePersistor:
                             f"Found data channel {dc.name} for {dc.terminal_asset_alias} with mismatched unit/type in DB: {db_channel.channel_type}:{db_channel.unit_type}:{db_channel.unit}/{dc.telemetry_name}"
                         )
                         self.new_db_channels.append(self.data_channel_to_db(dc))
-                        db_channel.deactivated_date = self.msg_timestamp
+                        self.deactivate(db_channel)
 
                     del self.existing_db_channels_by_name[dc.name]
 
@@ -105,7 +117,7 @@ class LayoutLitePersistor:
                             f"Found derived channel {dc.name} for {dc.terminal_asset_alias} with mismatched unit/type in DB: {db_channel.channel_type}:{db_channel.unit_type}:{db_channel.unit}/{dc.output_unit}"
                         )
                         self.new_db_channels.append(self.derived_channel_to_db(dc))
-                        db_channel.deactivated_date = self.msg_timestamp
+                        self.deactivate(db_channel)
 
                     del self.existing_db_channels_by_name[dc.name]
 
@@ -124,7 +136,7 @@ class LayoutLitePersistor:
                             f"Found pseudo channel {pc.name} for {pc} with mismatched unit/type in DB: {db_channel.channel_type}:{db_channel.unit_type}:{db_channel.unit}/{pc.unit_type}:{pc.unit}"
                         )
                         self.new_db_channels.append(self.pseudo_channel_to_db(pc))
-                        db_channel.deactivated_date = self.msg_timestamp
+                        self.deactivate(db_channel)
 
                     del self.existing_db_channels_by_name[pc.name]
 
@@ -141,6 +153,7 @@ class LayoutLitePersistor:
             self.existing_db_channels_by_name = {c.name: c for c in db_channels}
 
             self.new_db_channels = []
+            self.deactivated_count = 0
 
             # Look at every channel (data, derived, and pseudo)
             #   If it does not exist as active in the database, add it
@@ -154,11 +167,17 @@ class LayoutLitePersistor:
                 self.logger.info(
                     f"Data channel {db_only_channel.name} for {db_only_channel.terminal_asset_alias} exists only in the database"
                 )
-                db_only_channel.deactivated_date = self.msg_timestamp
+                self.deactivate(db_only_channel)
 
             for ch in self.new_db_channels:
                 self.db.add(ch)
 
+            # An unchanged layout (the common case) keeps the cached entry.
+            if self.channel_registry is not None and (
+                self.new_db_channels or self.deactivated_count
+            ):
+                self.channel_registry.invalidate(self.terminal_asset_alias)
+
     def sync_reading_channels(
         self,
         db: Session,
@@ -166,7 +185,11 @@ class LayoutLitePersistor:
         layout: ModernLayout,
     ):
         self.ReadingChannelSyncProcess(
-            self.logger, db, layout, from_alias.split(".scada")[0] + ".ta"
+            self.logger,
+            db,
+            layout,
+            from_alias.split(".scada")[0] + ".ta",
+            self.channel_registry,
         ).execute()
 
     def persist(self, from_alias: str, layout: ModernLayout):
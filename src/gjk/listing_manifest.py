@@ -0,0 +1,85 @@
+"""On-disk manifests of the S3 eventstore listing, one file per day.
+
+Listing ``hw1__1/eventstore/YYYYMMDD`` costs one ``list_objects_v2`` call per
+1000 keys, and every key is then parsed into an ``S3MessageInfo``. A past day
+never changes, so the importer keeps each day's parsed listing in a manifest:
+
+    <dir>/<world>/<YYYYMMDD>.manifest.gz
+
+A gzipped text file: a header line, then one tab-separated row per key
+(key, from_alias, type_name, persist_ms, source). A manifest is marked
+complete once the day is over with a settling margin for late uploads. A
+complete manifest is used as-is, with no listing. An incomplete one (today,
+or written before the day settled) still saves parsing: the day is listed
+again, and keys already in the manifest reuse their row.
+
+Eventstore keys sort by from_alias before time, so a new object can land
+anywhere in the listing and ``StartAfter`` on the last key would miss it;
+that is why an incomplete day is listed in full.
+"""
+
+import gzip
+import os
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+from typing import NamedTuple
+
+MANIFEST_VERSION = "1"
+# How long after midnight UTC a day's listing is treated as final.
+SETTLE = timedelta(hours=1)
+
+
+class ManifestRow(NamedTuple):
+    key: str
+    from_alias: str
+    type_name: str
+    persist_ms: int
+    source: str
+
+
+class DayManifest(NamedTuple):
+    complete: bool
+    rows: list[ManifestRow]
+
+
+def manifest_path(root: Path, world: str, day: datetime) -> Path:
+    return root / world / f"{day.strftime('%Y%m%d')}.manifest.gz"
+
+
+def day_is_settled(day: datetime, now: datetime | None = None) -> bool:
+    """True once ``day`` (a UTC date) is over by at least SETTLE."""
+    day_end = datetime(day.year, day.month, day.day, tzinfo=UTC) + timedelta(days=1)
+    return (now or datetime.now(UTC)) >= day_end + SETTLE
+
+
+def load_manifest(path: Path) -> DayManifest | None:
+    """The manifest at ``path``; None if missing or unreadable."""
+    try:
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            header = f.readline().split()
+            if header[:2] != ["gjk-manifest", MANIFEST_VERSION]:
+                return None
+            rows = []
+            for line in f:
+                key, from_alias, type_name, persist_ms, source = line.rstrip(
+                    "\n"
+                ).split("\t")
+                rows.append(
+                    ManifestRow(key, from_alias, type_name, int(persist_ms), source)
+                )
+    except (OSError, EOFError, ValueError, IndexError):
+        return None
+    return DayManifest(complete=header[2:] == ["complete"], rows=rows)
+
+
+def save_manifest(path: Path, manifest: DayManifest) -> None:
+    """Write ``manifest`` atomically (a crash leaves the old file or none)."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # Per-process temp name: sharded workers may write the same day at once.
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    with gzip.open(tmp, "wt", encoding="utf-8") as f:
+        status = "complete" if manifest.complete else "partial"
+        f.write(f"gjk-manifest {MANIFEST_VERSION} {status}\n")
+        for row in manifest.rows:
+            f.write("\t".join(map(str, row)) + "\n")
+    os.replace(tmp, path)
@@ -0,0 +1,155 @@
+"""Micro-batching between message dispatch and the persistor.
+
+Committing one transaction per message makes the commit round trip (and its
+fsync) the ceiling on ingest throughput. A MessageBatcher collects decoded
+messages and writes them in ONE transaction once either limit is hit:
+``max_messages`` pending, or the oldest pending message has waited
+``max_age_s``.
+
+Producers call :meth:`MessageBatcher.add` from any thread. A single flushing
+thread calls :meth:`MessageBatcher.flush_when_due` in a loop (a persist
+worker of :class:`gjk.ingest_pipeline.IngestPipeline`); synchronous callers
+(the S3 importer, shutdown) call :meth:`MessageBatcher.flush` directly. With
+``max_pending`` set, :meth:`MessageBatcher.add` blocks while that many
+messages are waiting, which is the backpressure from persist to decode.
+
+Every persist is idempotent (deterministic ids + ``on_conflict_do_nothing``),
+so a batch that fails to commit is retried one message per transaction: a
+single bad message costs its own row, not its 499 neighbours'.
+"""
+
+import threading
+import time
+from collections.abc import Callable
+
+from gjk.message_persistence_info import PendingMessage
+from gjk.sema_message_persistor import SemaMessagePersistor
+
+DEFAULT_MAX_MESSAGES = 500
+DEFAULT_MAX_AGE_S = 0.2
+
+
+class MessageBatcher:
+    def __init__(
+        self,
+        persistor: SemaMessagePersistor,
+        logger,
+        max_messages: int = DEFAULT_MAX_MESSAGES,
+        max_age_s: float = DEFAULT_MAX_AGE_S,
+        on_flushed: Callable[[list[PendingMessage]], None] | None = None,
+        on_failed: Callable[[PendingMessage, Exception], None] | None = None,
+        max_pending: int | None = None,
+    ):
+        self.persistor = persistor
+        self.logger = logger
+        self.max_messages = max_messages
+        self.max_age_s = max_age_s
+        # Called with every flushed batch once it is durable (committed, or
+        # given up on after the per-message retry) — the point where a live
+        # consumer may ack.
+        self.on_flushed = on_flushed
+        # Called for each message that still failed on its own transaction.
+        # May raise to abort the flush (the importer's --abort-on-error).
+        self.on_failed = on_failed
+        # Only for batchers flushed by another thread: a producer that also
+        # flushes (the importer) would block on itself.
+        self.max_pending = max_pending
+        self._pending: list[PendingMessage] = []
+        self._oldest_monotonic: float | None = None
+        self._cond = threading.Condition()
+        self._woken = False
+        # Serializes flushes so a shutdown flush can't interleave with the
+        # flushing thread's.
+        self._flush_lock = threading.Lock()
+
+    def __len__(self) -> int:
+        with self._cond:
+            return len(self._pending)
+
+    @property
+    def full(self) -> bool:
+        return len(self) >= self.max_messages
+
+    def add(self, msg: PendingMessage) -> None:
+        with self._cond:
+            while (
+                self.max_pending is not None and len(self._pending) >= self.max_pending
+            ):
+                self._cond.wait()
+            if not self._pending:
+                self._oldest_monotonic = time.monotonic()
+            self._pending.append(msg)
+            if len(self._pending) >= self.max_messages:
+                self._cond.notify_all()
+
+    def wake(self) -> None:
+        """Release a thread blocked in :meth:`flush_when_due` (used on stop)."""
+        with self._cond:
+            self._woken = True
+            self._cond.notify_all()
+
+    def flush_when_due(self, timeout: float) -> int:
+        """Block until the pending batch is full or old enough, then flush it.
+
+        Returns the number of messages flushed — 0 when ``timeout`` elapsed
+        (or :meth:`wake` was called) before a batch came due.
+        """
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            while not self._due_locked():
+                now = time.monotonic()
+                if self._woken or now >= deadline:
+                    self._woken = False
+                    return 0
+                wait_until = deadline
+                if self._pending:
+                    wait_until = min(deadline, self._oldest_monotonic + self.max_age_s)
+                self._cond.wait(wait_until - now)
+        return self.flush()
+
+    def _due_locked(self) -> bool:
+        return bool(self._pending) and (
+            len(self._pending) >= self.max_messages
+            or time.monotonic() >= self._oldest_monotonic + self.max_age_s
+        )
+
+    def _take(self) -> list[PendingMessage]:
+        with self._cond:
+            batch = self._pending[: self.max_messages]
+            self._pending = self._pending[self.max_messages :]
+            self._oldest_monotonic = time.monotonic() if self._pending else None
+            if batch:
+                self._cond.notify_all()
+            return batch
+
+    def flush(self) -> int:
+        """Persist everything pending now, in batches of ``max_messages``."""
+        flushed = 0
+        with self._flush_lock:
+            while batch := self._take():
+                self._persist(batch)
+                flushed += len(batch)
+        return flushed
+
+    def _persist(self, batch: list[PendingMessage]) -> None:
+        try:
+            self.persistor.persist_messages(batch)
+        except Exception as e:
+            self.logger.warning(
+                f"Batch of {len(batch)} messages failed to commit ({e!r}); "
+                "retrying one message per transaction"
+            )
+            for msg in batch:
+                try:
+                    self.persistor.persist_message(
+                        msg.from_alias, msg.time_received, msg.payload
+                    )
+                except Exception as e:
+                    self.logger.error(
+                        f"Persist failed for {msg.payload.type_name} "
+                        f"from {msg.from_alias}: {e!r}"
+                    )
+                    if self.on_failed is not None:
+                        self.on_failed(msg, e)
+        if self.on_flushed is not None:
+            self.on_flushed(batch)
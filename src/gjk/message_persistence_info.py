@@ -2,9 +2,11 @@ import uuid
 from collections.abc import Callable
 from dataclasses import dataclass
 from datetime import datetime
+from typing import Any
 
 from sqlalchemy.orm import Session
 
+from gjk.sema import SemaType
 from gjk.sema.property_format import UUID4Str
 
 # Fixed namespace so the persist path can mint deterministic (uuid5) message
@@ -28,3 +30,17 @@ class MessagePersistenceInfo:
     id: UUID4Str
     created_at: datetime | None
     additional_db_operations: Callable[[Session], None] | None = None
+
+
+@dataclass
+class PendingMessage:
+    """A decoded message waiting to be persisted as part of a batch.
+
+    ``ack_handle`` is opaque to the persist path: whoever enqueued the message
+    (JournalKeeper stores its channel + delivery tag here) gets it back once
+    the batch holding the message has committed."""
+
+    from_alias: str
+    time_received: datetime
+    payload: SemaType
+    ack_handle: Any = None
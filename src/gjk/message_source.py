@@ -0,0 +1,139 @@
+"""Where the S3 importer lists and reads eventstore objects.
+
+The importer only needs two operations: list the keys under a prefix, and
+read one object. :class:`MessageSource` is that interface, with three
+implementations sharing the eventstore key grammar
+(``<world>/eventstore/YYYYMMDD/<alias>-<type>-<persisted_ms>-<source>``)
+that ``S3MessageInfo`` parses:
+
+- :class:`S3Source`: the ``gwdev`` bucket through boto3;
+- :class:`DirectorySource`: a mirrored eventstore on disk, one file per key
+  (``aws s3 sync s3://gwdev/hw1__1/eventstore <dir>/hw1__1/eventstore``);
+- :class:`TarSource`: the same tree packed in a tar archive, optionally
+  compressed with anything ``tarfile`` reads.
+
+All of them are safe to read from the importer's download threads.
+"""
+
+import bisect
+import os
+import tarfile
+import threading
+from abc import ABC, abstractmethod
+from collections.abc import Iterator
+from pathlib import Path
+
+import boto3
+
+
+class MessageSource(ABC):
+    @abstractmethod
+    def list_keys(self, prefix: str) -> Iterator[str]:
+        """Every key starting with ``prefix``, in key order."""
+
+    @abstractmethod
+    def read(self, key: str) -> tuple[bytes, int]:
+        """The object's body and its length in bytes."""
+
+    def pop_etag(self, key: str) -> str | None:
+        """The object's ETag, if known without a request. Each is handed
+        out once, so the source does not keep one per object of a run."""
+        return None
+
+
+class S3Source(MessageSource):
+    def __init__(self, bucket: str, client=None, etags: bool = False):
+        self.bucket = bucket
+        # boto3 clients are thread-safe; one is shared by every download.
+        self.client = client if client is not None else boto3.client("s3")
+        # With ``etags`` (for an ObjectCache, which checks its entries
+        # against them), the ETags that come free with the listing and with
+        # each get_object are kept until popped. Only the latest two
+        # listings' are kept: keys listed but never read (other types,
+        # already imported) are dropped with the listing after next, while
+        # downloads still in flight from the previous one find theirs.
+        self.etags = etags
+        self._etags: dict[str, str] = {}
+        self._older_etags: dict[str, str] = {}
+
+    def list_keys(self, prefix: str) -> Iterator[str]:
+        if self.etags:
+            self._older_etags, self._etags = self._etags, {}
+        paginator = self.client.get_paginator("list_objects_v2")
+        for page in paginator.paginate(Bucket=self.bucket, Prefix=prefix):
+            # list_objects_v2 omits "Contents" for an empty prefix.
+            for s3_object in page.get("Contents", []):
+                if self.etags and "ETag" in s3_object:
+                    self._etags[s3_object["Key"]] = s3_object["ETag"]
+                yield s3_object["Key"]
+
+    def read(self, key: str) -> tuple[bytes, int]:
+        s3_object = self.client.get_object(Bucket=self.bucket, Key=key)
+        if self.etags and "ETag" in s3_object:
+            self._etags[key] = s3_object["ETag"]
+        return (s3_object["Body"].read(), s3_object["ContentLength"])
+
+    def pop_etag(self, key: str) -> str | None:
+        etag = self._etags.pop(key, None)
+        return etag if etag is not None else self._older_etags.pop(key, None)
+
+
+class DirectorySource(MessageSource):
+    """Keys are paths relative to ``root``, with ``/`` separators."""
+
+    def __init__(self, root: Path):
+        self.root = Path(root)
+
+    def list_keys(self, prefix: str) -> Iterator[str]:
+        head, _, tail = prefix.rpartition("/")
+        yield from self._walk(self.root / head, head, tail)
+
+    def _walk(self, directory: Path, key_dir: str, name_prefix: str) -> Iterator[str]:
+        try:
+            entries = sorted(os.scandir(directory), key=lambda e: e.name)
+        except (FileNotFoundError, NotADirectoryError):
+            return
+        for entry in entries:
+            if not entry.name.startswith(name_prefix):
+                continue
+            key = f"{key_dir}/{entry.name}" if key_dir else entry.name
+            if entry.is_dir():
+                yield from self._walk(Path(entry.path), key, "")
+            else:
+                yield key
+
+    def read(self, key: str) -> tuple[bytes, int]:
+        body = (self.root / key).read_bytes()
+        return (body, len(body))
+
+
+class TarSource(MessageSource):
+    """Keys are member names. Members are read under a lock (a TarFile is
+    not thread-safe), and a compressed archive is decompressed up to each
+    member on every seek backwards, so an uncompressed tar (or a
+    DirectorySource) is the fast choice for big archives."""
+
+    def __init__(self, path: Path):
+        self.tar = tarfile.open(path, "r:*")
+        self._members = {m.name: m for m in self.tar.getmembers() if m.isfile()}
+        self._keys = sorted(self._members)
+        self._lock = threading.Lock()
+
+    def list_keys(self, prefix: str) -> Iterator[str]:
+        i = bisect.bisect_left(self._keys, prefix)
+        while i < len(self._keys) and self._keys[i].startswith(prefix):
+            yield self._keys[i]
+            i += 1
+
+    def read(self, key: str) -> tuple[bytes, int]:
+        member = self._members.get(key)
+        if member is None:
+            raise KeyError(key)
+        with self._lock:
+            body = self.tar.extractfile(member).read()
+        return (body, len(body))
+
+
+def source_for(path: Path) -> MessageSource:
+    """A local source: a directory mirror or a tar archive."""
+    return DirectorySource(path) if Path(path).is_dir() else TarSource(path)
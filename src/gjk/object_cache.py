@@ -0,0 +1,137 @@
+"""A local, size-capped cache of eventstore objects for repeated imports.
+
+Repeated ``--dry-run`` passes over the same dates download the same objects
+again. :class:`CachedSource` wraps a :class:`MessageSource` and keeps every
+object it reads in an :class:`ObjectCache`:
+
+    <dir>/<sha256(key)[:2]>/<sha256(key)>
+
+Each file holds the object's ETag on its first line, then the body
+compressed with zlib (the stdlib codec; eventstore JSON compresses well at
+level 1 and decompresses far faster than S3 can serve it). An entry is used
+if the source's ETag for the key matches the stored one, or if the source
+knows no ETag for the key. Eventstore keys embed the persist time and the
+source, so an object is never rewritten under the same key; the ETag check
+guards against that assumption, not a routine case.
+
+Eviction is least-recently-used by file mtime, which a hit refreshes, so
+the order carries across runs. Each process keeps its own size tally, so
+sharded workers sharing a directory may briefly exceed the cap between
+them; an entry evicted by another process is just a miss.
+"""
+
+import hashlib
+import os
+import threading
+import zlib
+from collections import OrderedDict
+from collections.abc import Iterator
+from pathlib import Path
+
+from gjk.message_source import MessageSource
+
+DEFAULT_MAX_BYTES = 2 * 1024**3
+
+
+class ObjectCache:
+    def __init__(self, root: Path, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        # Entry path -> size on disk, least recently used first.
+        self._entries: OrderedDict[Path, int] = OrderedDict()
+        self._total = 0
+        self._scan()
+
+    def _scan(self) -> None:
+        found = []
+        for path in self.root.glob("*/*"):
+            if path.name.endswith(".tmp"):
+                continue
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            found.append((stat.st_mtime_ns, path, stat.st_size))
+        for _, path, size in sorted(found):
+            self._entries[path] = size
+            self._total += size
+
+    def _path(self, key: str) -> Path:
+        digest = hashlib.sha256(key.encode()).hexdigest()
+        return self.root / digest[:2] / digest
+
+    def get(self, key: str, etag: str | None = None) -> bytes | None:
+        """The cached body of ``key``; None on a miss or an ETag mismatch."""
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                stored_etag = f.readline().rstrip(b"\n").decode()
+                if etag is not None and stored_etag != etag:
+                    body = None
+                else:
+                    body = zlib.decompress(f.read())
+        except (FileNotFoundError, zlib.error):
+            body = None
+        with self._lock:
+            if body is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            if path in self._entries:
+                self._entries.move_to_end(path)
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            pass
+        return body
+
+    def put(self, key: str, etag: str | None, body: bytes) -> None:
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        data = (etag or "").encode() + b"\n" + zlib.compress(body, 1)
+        # Per-thread temp name: two downloads of one key may finish at once.
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp.write_bytes(data)
+        os.replace(tmp, path)
+        with self._lock:
+            self._total += len(data) - self._entries.pop(path, 0)
+            self._entries[path] = len(data)
+            self._evict()
+
+    def _evict(self) -> None:
+        while self._total > self.max_bytes and self._entries:
+            path, size = self._entries.popitem(last=False)
+            self._total -= size
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+
+    @property
+    def total_bytes(self) -> int:
+        return self._total
+
+
+class CachedSource(MessageSource):
+    """``source`` with reads served from ``cache`` when possible."""
+
+    def __init__(self, source: MessageSource, cache: ObjectCache):
+        self.source = source
+        self.cache = cache
+
+    def list_keys(self, prefix: str) -> Iterator[str]:
+        return self.source.list_keys(prefix)
+
+    def pop_etag(self, key: str) -> str | None:
+        return self.source.pop_etag(key)
+
+    def read(self, key: str) -> tuple[bytes, int]:
+        body = self.cache.get(key, self.source.pop_etag(key))
+        if body is not None:
+            return (body, len(body))
+        body, length = self.source.read(key)
+        self.cache.put(key, self.source.pop_etag(key), body)
+        return (body, length)
@@ -0,0 +1,55 @@
+"""Ordered prefetch: run a blocking fetch over items on a thread pool, but
+hand results back in input order.
+
+The S3 importer uses it to keep several ``get_object`` calls in flight while
+decode and persist still see messages in listing (``persist_time``) order. A
+window bounds how far fetching runs ahead of the consumer, so at most
+``window`` fetched-but-unconsumed results are held in memory.
+"""
+
+from collections import deque
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import TypeVar
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+def prefetch(
+    fetch: Callable[[T], R],
+    items: Iterable[T],
+    workers: int,
+    window: int | None = None,
+) -> Iterator[tuple[T, Future[R]]]:
+    """Yield ``(item, future)`` pairs in the order of ``items``, with
+    ``fetch(item)`` submitted up to ``window`` items ahead (default
+    ``2 * workers``). Each future is already done when yielded; its
+    ``result()`` re-raises the fetch's exception, so one failed item does
+    not stop the rest."""
+    if workers < 1:
+        raise ValueError("workers must be at least 1")
+    window = window if window is not None else 2 * workers
+    if window < workers:
+        raise ValueError("window must be at least workers")
+    pending: deque[tuple[T, Future[R]]] = deque()
+    with ThreadPoolExecutor(
+        max_workers=workers, thread_name_prefix="gjk-fetch"
+    ) as pool:
+        try:
+            for item in items:
+                pending.append((item, pool.submit(fetch, item)))
+                if len(pending) >= window:
+                    yield _wait(pending.popleft())
+            while pending:
+                yield _wait(pending.popleft())
+        finally:
+            # The consumer stopped early (or raised): drop what has not
+            # started rather than fetch it for nobody.
+            for _, future in pending:
+                future.cancel()
+
+
+def _wait(entry: tuple[T, Future[R]]) -> tuple[T, Future[R]]:
+    entry[1].exception()  # blocks until done, without raising
+    return entry
@@ -6,7 +6,8 @@
 # This includes things like price, weather, ShNode states, etc.
 #
 # LayoutLitePersistor syncs the registered pseudo-channels with the database.
-# Other persistors query the pseudo-channels from the database and store readings for them.
+# Other persistors look the pseudo-channels up through the shared ReadingChannelRegistry
+# (gjk.reading_channel_registry) and store readings for them.
 
 from collections.abc import Callable
 
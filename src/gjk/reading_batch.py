@@ -0,0 +1,162 @@
+"""Columnar batch of readings rows, built by the custom persistors and
+consumed by :mod:`gjk.readings_writer`.
+
+A report.event carries thousands of readings; building a ``ReadingSql`` per
+value (and then ``__dict__``-ing it back into a row) allocated an ORM object,
+its instance state and a row dict per reading. ``ReadingBatch`` instead keeps
+four parallel typed arrays. Channel and message ids repeat heavily within a
+batch, so they are interned once into ``ids`` and the arrays hold indexes.
+Rows only materialise at export time: :meth:`params` for an executemany
+insert, :meth:`copy_buffer` for COPY.
+"""
+
+import io
+import uuid
+from array import array
+from collections.abc import Iterable, Iterator, Sequence
+from datetime import UTC, datetime
+from typing import NamedTuple
+
+
+class Reading(NamedTuple):
+    channel_id: uuid.UUID
+    message_id: uuid.UUID
+    timestamp_ms: int
+    value: int
+
+
+def _utc(timestamp_ms: int) -> datetime:
+    return datetime.fromtimestamp(timestamp_ms / 1000, UTC)
+
+
+def first_occurrences(
+    timestamps_ms: Sequence[int], values: Sequence[int]
+) -> tuple[Sequence[int], Sequence[int]]:
+    """``timestamps_ms``/``values`` with repeated timestamps dropped, the
+    first occurrence winning and first-occurrence order kept.
+
+    Reports repeat a timestamp rarely, so the common case is one C-level
+    ``set`` build that hands the inputs back untouched; only a report that
+    does repeat pays for the dict pass."""
+    if len(timestamps_ms) != len(values):
+        raise ValueError(f"{len(timestamps_ms)} timestamps but {len(values)} values")
+    if len(set(timestamps_ms)) == len(timestamps_ms):
+        return timestamps_ms, values
+    first_value: dict[int, int] = {}
+    for ts, value in zip(timestamps_ms, values):
+        first_value.setdefault(ts, value)
+    return list(first_value), list(first_value.values())
+
+
+class ReadingBatch:
+    def __init__(self) -> None:
+        self.ids: list[uuid.UUID] = []
+        self._id_index: dict[uuid.UUID, int] = {}
+        self.channel_idx = array("I")
+        self.message_idx = array("I")
+        self.timestamp_ms = array("q")
+        self.value = array("q")
+
+    def __len__(self) -> int:
+        return len(self.timestamp_ms)
+
+    def __iter__(self) -> Iterator[Reading]:
+        ids = self.ids
+        for c, m, ts, v in zip(
+            self.channel_idx, self.message_idx, self.timestamp_ms, self.value
+        ):
+            yield Reading(ids[c], ids[m], ts, v)
+
+    def intern(self, key: uuid.UUID) -> int:
+        """Index of ``key`` in :attr:`ids`, adding it on first sight."""
+        i = self._id_index.get(key)
+        if i is None:
+            i = self._id_index[key] = len(self.ids)
+            self.ids.append(key)
+        return i
+
+    def append(
+        self,
+        channel_id: uuid.UUID,
+        message_id: uuid.UUID,
+        timestamp_ms: int,
+        value: int,
+    ) -> None:
+        self.channel_idx.append(self.intern(channel_id))
+        self.message_idx.append(self.intern(message_id))
+        self.timestamp_ms.append(timestamp_ms)
+        self.value.append(value)
+
+    def extend_channel(
+        self,
+        channel_id: uuid.UUID,
+        message_id: uuid.UUID,
+        timestamps_ms: Iterable[int],
+        values: Iterable[int],
+    ) -> None:
+        """Append one channel's readings from parallel sequences."""
+        ts = array("q", timestamps_ms)
+        vals = array("q", values)
+        if len(ts) != len(vals):
+            raise ValueError(
+                f"{len(ts)} timestamps but {len(vals)} values for {channel_id}"
+            )
+        self.channel_idx.extend(array("I", [self.intern(channel_id)]) * len(ts))
+        self.message_idx.extend(array("I", [self.intern(message_id)]) * len(ts))
+        self.timestamp_ms.extend(ts)
+        self.value.extend(vals)
+
+    def extend(self, other: "ReadingBatch") -> None:
+        if other is self:
+            raise ValueError("cannot extend a ReadingBatch with itself")
+        remap = [self.intern(key) for key in other.ids]
+        self.channel_idx.extend([remap[i] for i in other.channel_idx])
+        self.message_idx.extend([remap[i] for i in other.message_idx])
+        self.timestamp_ms.extend(other.timestamp_ms)
+        self.value.extend(other.value)
+
+    def dedupe(self) -> int:
+        """Drop every row whose ``(channel_id, timestamp_ms)`` already
+        appeared earlier in the batch — the first occurrence wins, as it does
+        under ``ON CONFLICT DO NOTHING``. Returns the number dropped."""
+        seen: set[tuple[int, int]] = set()
+        keep: list[int] = []
+        for i, key in enumerate(zip(self.channel_idx, self.timestamp_ms)):
+            if key not in seen:
+                seen.add(key)
+                keep.append(i)
+        dropped = len(self) - len(keep)
+        if dropped:
+            for name in ("channel_idx", "message_idx", "timestamp_ms", "value"):
+                col = getattr(self, name)
+                setattr(self, name, array(col.typecode, [col[i] for i in keep]))
+        return dropped
+
+    def params(self) -> list[dict]:
+        """Rows as executemany parameters keyed by ReadingSql column."""
+        ids = self.ids
+        return [
+            {
+                "channel_id": ids[c],
+                "message_id": ids[m],
+                "timestamp": _utc(ts),
+                "value": v,
+            }
+            for c, m, ts, v in zip(
+                self.channel_idx, self.message_idx, self.timestamp_ms, self.value
+            )
+        ]
+
+    def copy_buffer(self) -> io.StringIO:
+        """Rows in COPY text format, columns in ReadingSql order
+        (channel_id, message_id, timestamp, value)."""
+        ids = [str(key) for key in self.ids]
+        buf = io.StringIO()
+        buf.writelines(
+            f"{ids[c]}\t{ids[m]}\t{_utc(ts).isoformat()}\t{v}\n"
+            for c, m, ts, v in zip(
+                self.channel_idx, self.message_idx, self.timestamp_ms, self.value
+            )
+        )
+        buf.seek(0)
+        return buf
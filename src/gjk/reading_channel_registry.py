@@ -0,0 +1,128 @@
+"""In-process cache of each terminal asset's active reading channels.
+
+Every persistor that writes readings needs the asset's channel-name → id map,
+and querying ``reading_channels`` for it on every message made that SELECT the
+hottest redundant statement on the report.event path. One registry is shared
+by all of SemaMessagePersistor's custom persistors.
+
+Freshness:
+
+- Within this process, whatever changes an asset's channels (the layout.lite
+  sync, weather-bundle channel creation) invalidates that asset's entry.
+- A rolled-back transaction may have cached channels that were never
+  committed, so SemaMessagePersistor clears the registry on rollback.
+- Another process (the S3 importer next to the live keeper), or another of
+  the keeper's persist workers (each has its own registry, so none caches
+  another's uncommitted channels), can add channels behind this one's
+  back. A lookup naming a channel the cached map lacks reloads the entry
+  once it is ``miss_refresh_s`` old, and every entry expires after
+  ``ttl_s`` regardless. A channel another process deactivates is only
+  noticed on expiry, so ``ttl_s`` (``Settings.channel_cache_ttl_s``)
+  bounds how long readings can still land on it.
+"""
+
+import threading
+import time
+import uuid
+from collections.abc import Iterable
+from dataclasses import dataclass
+from typing import NamedTuple
+
+from gw_data.db.models import ReadingChannelSql
+from sqlalchemy.orm import Session
+
+DEFAULT_TTL_S = 60.0
+DEFAULT_MISS_REFRESH_S = 60.0
+
+
+class RegisteredChannel(NamedTuple):
+    id: uuid.UUID
+    unit: str
+    unit_type: str
+    channel_type: str
+
+
+@dataclass(frozen=True)
+class _Entry:
+    loaded_at: float
+    channels: dict[str, RegisteredChannel]
+    ids_by_name: dict[str, uuid.UUID]
+
+
+class ReadingChannelRegistry:
+    def __init__(
+        self,
+        ttl_s: float = DEFAULT_TTL_S,
+        miss_refresh_s: float = DEFAULT_MISS_REFRESH_S,
+    ):
+        self.ttl_s = ttl_s
+        self.miss_refresh_s = miss_refresh_s
+        self._entries: dict[str, _Entry] = {}
+        self._lock = threading.Lock()
+
+    def channels(
+        self,
+        db: Session,
+        terminal_asset_alias: str,
+        names: Iterable[str] | None = None,
+    ) -> dict[str, RegisteredChannel]:
+        """Active channels for the asset, by name. Treat as read-only."""
+        return self._entry(db, terminal_asset_alias, names).channels
+
+    def channel_ids(
+        self,
+        db: Session,
+        terminal_asset_alias: str,
+        names: Iterable[str] | None = None,
+    ) -> dict[str, uuid.UUID]:
+        """Active channel ids for the asset, by name. Treat as read-only.
+
+        ``names`` are the channels the caller is about to look up; one the
+        cached map lacks may have been created by another process, so it
+        triggers a (rate-limited) reload."""
+        return self._entry(db, terminal_asset_alias, names).ids_by_name
+
+    def invalidate(self, terminal_asset_alias: str) -> None:
+        with self._lock:
+            self._entries.pop(terminal_asset_alias, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def _entry(
+        self, db: Session, terminal_asset_alias: str, names: Iterable[str] | None
+    ) -> _Entry:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(terminal_asset_alias)
+        if entry is not None:
+            age = now - entry.loaded_at
+            if age < self.ttl_s and (
+                names is None
+                or age < self.miss_refresh_s
+                or all(n in entry.ids_by_name for n in names)
+            ):
+                return entry
+
+        db_channels = (
+            db
+            .query(ReadingChannelSql)
+            .filter(
+                ReadingChannelSql.deactivated_date.is_(None),
+                ReadingChannelSql.terminal_asset_alias == terminal_asset_alias,
+            )
+            .all()
+        )
+        channels = {
+            c.name: RegisteredChannel(c.id, c.unit, c.unit_type, c.channel_type)
+            for c in db_channels
+        }
+        entry = _Entry(
+            loaded_at=now,
+            channels=channels,
+            ids_by_name={name: c.id for name, c in channels.items()},
+        )
+        with self._lock:
+            self._entries[terminal_asset_alias] = entry
+        return entry
@@ -0,0 +1,103 @@
+"""The one place readings rows are written.
+
+Every custom persistor that projects a message into the ``readings`` table
+calls :func:`insert_readings` from its ``additional_db_operations``. On its
+own that is one ``INSERT ... ON CONFLICT DO NOTHING`` per message; inside
+:func:`deferred_readings` (which ``SemaMessagePersistor.persist_messages``
+wraps around a batch) the rows are buffered on the session instead and
+written by a single statement when the batch's operations are done.
+
+First write wins on ``(timestamp, channel_id)`` either way: ``DO NOTHING``
+skips a duplicate key whether it is already in the table or earlier in the
+same statement.
+
+Large writes (a report.event burst, a merged backfill batch) skip the
+executemany path: on psycopg2 they are streamed into a session-local
+temp staging table with COPY and merged with a single
+``INSERT ... SELECT ... ON CONFLICT DO NOTHING``. Smaller writes, and any
+other driver, keep the ORM executemany insert.
+"""
+
+from collections.abc import Iterator
+from contextlib import contextmanager
+
+from gw_data.db.models import ReadingSql
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+from gjk.reading_batch import ReadingBatch
+
+# Session.info key under which a batch buffers its readings rows.
+_DEFERRED_READINGS = "gjk.deferred_readings"
+
+# Below this many rows the COPY round trips (truncate, copy, merge) cost more
+# than executemany's multi-row VALUES.
+COPY_MIN_ROWS = 500
+
+_COLUMNS = ("channel_id", "message_id", "timestamp", "value")
+# Temp tables live per connection; ON COMMIT DELETE ROWS empties it at every
+# commit, and each COPY truncates it first in case one transaction stages
+# more than once.
+_STAGE_TABLE = "gjk_readings_stage"
+
+
+def _execute_insert(db: Session, batch: ReadingBatch) -> None:
+    if len(batch) >= COPY_MIN_ROWS and db.get_bind().dialect.driver == "psycopg2":
+        _copy_insert(db, batch)
+        return
+    stmt = pg_insert(ReadingSql).on_conflict_do_nothing(
+        index_elements=["timestamp", "channel_id"]
+    )
+    db.execute(stmt, batch.params())
+
+
+def _copy_insert(db: Session, batch: ReadingBatch) -> None:
+    # The staging merge is one statement, so its row order must not decide
+    # which duplicate wins: drop them here, keeping the first.
+    batch.dedupe()
+    connection = db.connection()
+    target = connection.dialect.identifier_preparer.format_table(ReadingSql.__table__)
+    columns = ", ".join(_COLUMNS)
+    with connection.connection.driver_connection.cursor() as cur:
+        cur.execute(
+            f"CREATE TEMP TABLE IF NOT EXISTS {_STAGE_TABLE} "
+            f"(LIKE {target} INCLUDING DEFAULTS) ON COMMIT DELETE ROWS"
+        )
+        cur.execute(f"TRUNCATE {_STAGE_TABLE}")
+        cur.copy_expert(
+            f"COPY {_STAGE_TABLE} ({columns}) FROM STDIN", batch.copy_buffer()
+        )
+        cur.execute(
+            f"INSERT INTO {target} ({columns}) "
+            f"SELECT {columns} FROM {_STAGE_TABLE} "
+            "ON CONFLICT (timestamp, channel_id) DO NOTHING"
+        )
+
+
+def insert_readings(db: Session, batch: ReadingBatch) -> None:
+    """Insert a batch of readings, or buffer it when the session is inside
+    :func:`deferred_readings`."""
+    if len(batch) == 0:
+        return
+    deferred = db.info.get(_DEFERRED_READINGS)
+    if deferred is not None:
+        deferred.extend(batch)
+    else:
+        _execute_insert(db, batch)
+
+
+@contextmanager
+def deferred_readings(db: Session) -> Iterator[None]:
+    """Merge every :func:`insert_readings` call made inside the block into
+    one insert, executed on a clean exit."""
+    rows = ReadingBatch()
+    db.info[_DEFERRED_READINGS] = rows
+    try:
+        yield
+    finally:
+        db.info.pop(_DEFERRED_READINGS, None)
+    if rows:
+        # Channels created earlier in the batch (layout.lite sync, weather
+        # bundles) must be in the table before readings reference them.
+        db.flush()
+        _execute_insert(db, rows)
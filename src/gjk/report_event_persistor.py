@@ -1,9 +1,9 @@
+import functools
 import hashlib
 import uuid
-from datetime import UTC, datetime, timezone
+from collections.abc import Sequence
+from datetime import UTC, datetime
 
-from gw_data.db.models import ReadingChannelSql, ReadingSql
-from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.orm import Session
 
 from gjk.message_persistence_info import MessagePersistenceInfo
@@ -12,6 +12,9 @@ from gjk.pseudo_channels import (
     PseudoChannel,
     register_pseudo_channel_factory,
 )
+from gjk.reading_batch import ReadingBatch, first_occurrences
+from gjk.reading_channel_registry import ReadingChannelRegistry
+from gjk.readings_writer import insert_readings
 from gjk.sema.enums import (
     Gw1LcTopState,
     Gw1LeafAllyAllTanksState,
@@ -26,6 +29,17 @@ from gjk.sema.types import ReportEvent
 from gjk.sema.types.old_versions.report_event_002 import ReportEvent002
 from gjk.zone_heat_call_pseudo_channel import ZoneHeatCallPseudoChannel
 
+# Unknown enum values remembered (with their hash) so each is hashed and
+# logged once rather than once per sample; oldest forgotten first.
+UNKNOWN_ENUM_MEMO_SIZE = 1024
+
+
+@functools.cache
+def enum_ordinals(enum_type: type[SemaEnum]) -> dict[str, int]:
+    """Value -> position in ``enum_type.values()``, the number a state
+    channel stores. Built once per enum class."""
+    return {value: i for i, value in enumerate(enum_type.values())}
+
 
 class SemaEnumPseudoChannel(PseudoChannel):
     def __init__(self, name: str, display_name: str, enum_type: type[SemaEnum]):
@@ -95,25 +109,39 @@ class ReportEventPersistor:
 
         return result
 
-    def __init__(self, logger):
+    def __init__(self, logger, channel_registry: ReadingChannelRegistry | None = None):
         self.logger = logger
+        self.channel_registry = channel_registry or ReadingChannelRegistry()
         self.target_message_type = "report.event"
         self.enum_type_cache = {}
+        self._unknown_enum_values: dict[tuple[type[SemaEnum], str], int] = {}
+        self._heat_call_ids: dict[
+            str, tuple[dict[str, uuid.UUID], dict[uuid.UUID, uuid.UUID]]
+        ] = {}
 
     def get_sema_enum_value(self, enum_type: type[SemaEnum], value_str: str) -> int:
-        if value_str in enum_type.values():
-            return enum_type.values().index(value_str)
-        else:
+        ordinal = enum_ordinals(enum_type).get(value_str)
+        if ordinal is not None:
+            return ordinal
+        return self.unknown_enum_value(enum_type, value_str)
+
+    def unknown_enum_value(self, enum_type: type[SemaEnum], value_str: str) -> int:
+        key = (enum_type, value_str)
+        hash_result = self._unknown_enum_values.get(key)
+        if hash_result is None:
             hash_object = hashlib.sha256(value_str.encode())
             hash_result = int(hash_object.hexdigest(), 16)
             self.logger.warn(
                 f"Unrecognized enum value {value_str} in {enum_type.enum_name()} -- using hash value {hash_result} as default."
             )
-            return hash_result
+            if len(self._unknown_enum_values) >= UNKNOWN_ENUM_MEMO_SIZE:
+                del self._unknown_enum_values[next(iter(self._unknown_enum_values))]
+            self._unknown_enum_values[key] = hash_result
+        return hash_result
 
     def collect_channel_state_readings(
         self,
-        readings: list[ReadingSql],
+        readings: ReadingBatch,
         reportEvent: ReportEvent | ReportEvent002,
         message_id: uuid.UUID,
         db_channel_ids_by_name: dict[str, uuid.UUID],
@@ -142,21 +170,22 @@ class ReportEventPersistor:
                         found_channel = True
                         db_channel_id = db_channel_ids_by_name.get(channel.name)
                         if db_channel_id is not None:
-                            readings.extend(
+                            values = list(
                                 map(
-                                    lambda t_s: ReadingSql(
-                                        channel_id=db_channel_id,
-                                        message_id=message_id,
-                                        timestamp=datetime.fromtimestamp(
-                                            t_s[0] / 1000, timezone.utc
-                                        ),
-                                        value=self.get_sema_enum_value(
-                                            channel.enum_type, t_s[1]
-                                        ),
-                                    ),
-                                    zip(states.unix_ms_list, states.state_list),
+                                    enum_ordinals(channel.enum_type).get,
+                                    states.state_list,
                                 )
                             )
+                            if None in values:
+                                values = [
+                                    self.unknown_enum_value(channel.enum_type, s)
+                                    if v is None
+                                    else v
+                                    for v, s in zip(values, states.state_list)
+                                ]
+                            readings.extend_channel(
+                                db_channel_id, message_id, states.unix_ms_list, values
+                            )
                         break
 
                 if not found_channel:
@@ -170,94 +199,97 @@ class ReportEventPersistor:
         "hw1.isone.me.versant.keene.elm.scada": 1,
     }
 
+    def heat_call_channel_ids(
+        self,
+        terminal_asset_alias: str,
+        db_channel_ids_by_name: dict[str, uuid.UUID],
+    ) -> dict[uuid.UUID, uuid.UUID]:
+        """whitewire-pwr channel id -> its zone's heat-call channel id.
+
+        Derived once per asset and kept for as long as the registry hands
+        back the same channel map (it builds a new one on every reload)."""
+        cached = self._heat_call_ids.get(terminal_asset_alias)
+        if cached is not None and cached[0] is db_channel_ids_by_name:
+            return cached[1]
+        heat_call_ids = {}
+        for name, whitewire_id in db_channel_ids_by_name.items():
+            if "whitewire-pwr" in name:
+                heat_call_id = db_channel_ids_by_name.get(
+                    name.replace("whitewire-pwr", "heat-call")
+                )
+                if heat_call_id:
+                    heat_call_ids[whitewire_id] = heat_call_id
+        self._heat_call_ids[terminal_asset_alias] = (
+            db_channel_ids_by_name,
+            heat_call_ids,
+        )
+        return heat_call_ids
+
     def collect_zone_heat_call_readings(
         self,
-        readings: list[ReadingSql],
+        readings: ReadingBatch,
         reportEvent: ReportEvent | ReportEvent002,
         message_id: uuid.UUID,
-        db_channel_ids_by_name: dict[str, uuid.UUID],
+        whitewire_readings: list[tuple[uuid.UUID, Sequence[int], Sequence[int]]],
     ):
+        """Append a heat-call reading for every whitewire-pwr reading, given
+        as ``(heat_call_channel_id, timestamps_ms, values)`` per channel."""
         threshold = self.whitewire_pwr_threshold_overrides.get(
             reportEvent.report.from_g_node_alias, self.whitewire_pwr_threshold_default
         )
-
-        whitewire_pwr_channel_names_by_id = {
-            id: name
-            for name, id in db_channel_ids_by_name.items()
-            if "whitewire-pwr" in name
-        }
-        # # Find all the whitewire-pwr readings, and add corresponding readings to heat-call
-        for r in readings:
-            whitewire_pwr_channel_name = whitewire_pwr_channel_names_by_id.get(
-                r.channel_id
+        for heat_call_channel_id, timestamps_ms, values in whitewire_readings:
+            readings.extend_channel(
+                heat_call_channel_id,
+                message_id,
+                timestamps_ms,
+                [1 if v > threshold else 0 for v in values],
             )
-            if whitewire_pwr_channel_name:
-                heat_call_channel_id = db_channel_ids_by_name.get(
-                    whitewire_pwr_channel_name.replace("whitewire-pwr", "heat-call")
-                )
-                if heat_call_channel_id:
-                    readings.append(
-                        ReadingSql(
-                            channel_id=heat_call_channel_id,
-                            message_id=message_id,
-                            timestamp=r.timestamp,
-                            value=1 if r.value > threshold else 0,
-                        )
-                    )
 
     def persist_readings(
         self, db: Session, from_alias: str, reportEvent: ReportEvent | ReportEvent002
     ):
         from_terminal_asset_alias = from_alias.split(".scada")[0] + ".ta"
-        db_channels = (
-            db
-            .query(ReadingChannelSql)
-            .filter(
-                ReadingChannelSql.deactivated_date.is_(None),
-                ReadingChannelSql.terminal_asset_alias == from_terminal_asset_alias,
-            )
-            .all()
+        db_channel_ids_by_name = self.channel_registry.channel_ids(
+            db,
+            from_terminal_asset_alias,
+            names=[ch.channel_name for ch in reportEvent.report.channel_reading_list],
         )
 
+        heat_call_ids = self.heat_call_channel_ids(
+            from_terminal_asset_alias, db_channel_ids_by_name
+        )
         message_id = uuid.UUID(reportEvent.message_id)
 
-        db_channel_ids_by_name = {c.name: c.id for c in db_channels}
-        readings: list[ReadingSql] = []
+        readings = ReadingBatch()
+        whitewire_readings = []
         for ch_readings in reportEvent.report.channel_reading_list:
             db_channel_id = db_channel_ids_by_name.get(ch_readings.channel_name)
             if db_channel_id is None:
                 continue
             else:
                 # Reports can duplicate the same timestamp and value, so we need to de-duplicate it.
-                readings_by_ts = {}
-                for ts, value in zip(
-                    ch_readings.scada_read_time_unix_ms_list,
-                    ch_readings.value_list,
-                    strict=True,
-                ):
-                    if ts not in readings_by_ts:
-                        readings_by_ts[ts] = ReadingSql(
-                            channel_id=db_channel_id,
-                            message_id=message_id,
-                            timestamp=datetime.fromtimestamp(ts / 1000, timezone.utc),
-                            value=value,
-                        )
-
-                readings.extend(readings_by_ts.values())
+                timestamps_ms, values = first_occurrences(
+                    ch_readings.scada_read_time_unix_ms_list, ch_readings.value_list
+                )
+                readings.extend_channel(
+                    db_channel_id, message_id, timestamps_ms, values
+                )
+                heat_call_channel_id = heat_call_ids.get(db_channel_id)
+                if heat_call_channel_id:
+                    whitewire_readings.append((
+                        heat_call_channel_id,
+                        timestamps_ms,
+                        values,
+                    ))
 
         self.collect_channel_state_readings(
             readings, reportEvent, message_id, db_channel_ids_by_name
         )
         self.collect_zone_heat_call_readings(
-            readings, reportEvent, message_id, db_channel_ids_by_name
+            readings, reportEvent, message_id, whitewire_readings
         )
 
-        dicts = [r.__dict__ for r in readings]
-        if len(dicts) > 0:
-            stmt = insert(ReadingSql).on_conflict_do_nothing(
-                index_elements=["timestamp", "channel_id"]
-            )
-            db.execute(stmt, dicts)
+        insert_readings(db, readings)
 
     def persist_v002(
         self, from_alias: str, time_received: datetime, report: ReportEvent002
@@ -1,19 +1,43 @@
 import argparse
-import json
+import bisect
+import itertools
 import logging
+import multiprocessing
+import random
+import re
 import sys
-from collections import defaultdict
+import tempfile
+import time
+from collections import Counter, defaultdict
 from collections.abc import Iterable
-from dataclasses import dataclass
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
 from datetime import UTC, datetime, timedelta
+from pathlib import Path
 from typing import Literal
 
-import boto3
 import dotenv
 
 from gjk.config import Settings
-from gjk.sema import SemaCodec, SemaType
+from gjk.import_checkpoint import ImportCheckpoint, load_checkpoint, save_checkpoint
+from gjk.ingest_pipeline import shard_for
+from gjk.journal_codec import JournalCodec
+from gjk.listing_manifest import (
+    DayManifest,
+    ManifestRow,
+    day_is_settled,
+    load_manifest,
+    manifest_path,
+    save_manifest,
+)
+from gjk.message_batcher import DEFAULT_MAX_MESSAGES, MessageBatcher
+from gjk.message_persistence_info import PendingMessage, default_message_id
+from gjk.message_source import MessageSource, S3Source, source_for
+from gjk.object_cache import DEFAULT_MAX_BYTES, CachedSource, ObjectCache
+from gjk.prefetch import prefetch
+from gjk.sema import SemaType
 from gjk.sema_message_persistor import SemaMessagePersistor
+from gjk.stage_timing import STAGES, StageTimes
 
 ALL_MSG_TYPES = [
     "",
@@ -57,6 +81,14 @@ ALL_MSG_TYPES = [
     "gw.weather.cmd.nack",
 ]
 
+# Parallel get_object calls; results are still consumed in listing order.
+DEFAULT_DOWNLOAD_CONCURRENCY = 8
+
+DEFAULT_MANIFEST_DIR = Path.home() / ".cache" / "gjk" / "s3-manifests"
+
+# Share of --trusted-decode messages that are fully validated as well.
+DEFAULT_VERIFY_FRACTION = 0.01
+
 # Sentinel "version" for a message that raised before its version was known.
 PARSE_FAIL = "<parse-fail>"
 
@@ -65,9 +97,10 @@ PARSE_FAIL = "<parse-fail>"
 class VersionCounts:
     """Per-(type_name, version) tallies accumulated over one import run."""
 
-    ok: int = 0  # decoded into a known SemaType
+    ok: int = 0  # decoded into a known SemaType and committed (or, dry, decoded)
     degraded: int = 0  # codec returned a degraded type (version not known)
     failed: int = 0  # decode raised (keyed under version=PARSE_FAIL)
+    db_failed: int = 0  # decoded, but its row could not be committed
 
 
 class S3MessageInfo:
@@ -76,19 +109,84 @@ class S3MessageInfo:
         [self.from_alias, self.msg_type_name, message_persisted_ms_str, self.source] = (
             key_str.split("/")[-1].split("-")
         )
-        self.persist_time = datetime.fromtimestamp(
-            int(message_persisted_ms_str) / 1000, tz=UTC
+        self.persist_ms = int(message_persisted_ms_str)
+        self.persist_time = datetime.fromtimestamp(self.persist_ms / 1000, tz=UTC)
+
+    @property
+    def day(self) -> str:
+        """The eventstore date folder (YYYYMMDD) the key is listed under."""
+        return self.key_str.split("/")[-2]
+
+    @property
+    def listing_order(self) -> tuple[int, str]:
+        """Sort key for a day's messages: persist time, ties broken by key,
+        so the order (and a resume point in it) is the same on every run."""
+        return (self.persist_ms, self.key_str)
+
+    @classmethod
+    def from_row(cls, row: ManifestRow) -> "S3MessageInfo":
+        info = cls.__new__(cls)
+        info.key_str = row.key
+        info.from_alias = row.from_alias
+        info.msg_type_name = row.type_name
+        info.source = row.source
+        info.persist_ms = row.persist_ms
+        info.persist_time = datetime.fromtimestamp(row.persist_ms / 1000, tz=UTC)
+        return info
+
+    def to_row(self) -> ManifestRow:
+        return ManifestRow(
+            self.key_str,
+            self.from_alias,
+            self.msg_type_name,
+            self.persist_ms,
+            self.source,
         )
 
 
+def _days(start: datetime, end: datetime) -> Iterable[datetime]:
+    """Each day from ``start`` to ``end`` inclusive, in either direction."""
+    step = timedelta(days=-1 if end < start else 1)
+    dt = start
+    while (dt >= end) if end < start else (dt <= end):
+        yield dt
+        dt = dt + step
+
+
 class S3MessageImporter:
-    def __init__(self, settings: Settings, msg_types: set[str], logger):
+    # Set by import_messages to time the list stage.
+    stage_times: StageTimes | None = None
+    # Set in a worker of a sharded run: its parent has just listed every day
+    # of the run into manifest_dir, so even an unsettled day is not relisted.
+    prelisted: bool = False
+
+    def __init__(
+        self,
+        settings: Settings,
+        msg_types: set[str],
+        logger,
+        manifest_dir: Path | None = None,
+        source: MessageSource | None = None,
+        object_cache: ObjectCache | None = None,
+    ):
         self.settings = settings
-        self.s3 = boto3.client("s3")
         self.aws_bucket_name = "gwdev"
+        # Where objects are listed and read from: the bucket unless a local
+        # mirror is given.
+        self.source = (
+            source
+            if source is not None
+            else S3Source(self.aws_bucket_name, etags=object_cache is not None)
+        )
+        # Downloads read through the object cache (gjk.object_cache) if given.
+        if object_cache is not None:
+            self.source = CachedSource(self.source, object_cache)
         self.world_instance_name = "hw1__1"
         self.msg_types = msg_types
         self.logger = logger
+        # Per-day listing manifests (gjk.listing_manifest); None lists S3
+        # every time.
+        self.manifest_dir = manifest_dir
 
     def find_messages_on_dates(
         self, dts: list[datetime], sort: Literal["none", "asc", "desc"] = "none"
@@ -97,17 +195,26 @@ class S3MessageImporter:
             yield from self.find_messages_on_date(dt, sort=sort)
 
     def find_messages_in_date_range(
-        self, start: datetime, end: datetime
+        self, start: datetime, end: datetime, skip_past: str | None = None
     ) -> Iterable[S3MessageInfo]:
-        dt = start
-        if end < start:
-            while dt >= end:
-                yield from self.find_messages_on_date(dt, sort="desc")
-                dt = dt - timedelta(days=1)
-        else:
-            while dt <= end:
-                yield from self.find_messages_on_date(dt, sort="asc")
-                dt = dt + timedelta(days=1)
+        """Messages from ``start`` to ``end`` (either direction), resuming
+        just after the key ``skip_past`` if given: earlier days are not
+        listed at all."""
+        resume_day = S3MessageInfo(skip_past).day if skip_past else None
+        sort: Literal["asc", "desc"] = "desc" if end < start else "asc"
+        for dt in _days(start, end):
+            day = dt.strftime("%Y%m%d")
+            if resume_day is None:
+                yield from self.find_messages_on_date(dt, sort=sort)
+            elif day == resume_day:
+                yield from self.find_messages_on_date(dt, skip_past, sort=sort)
+            elif (day > resume_day) == (sort == "asc"):
+                yield from self.find_messages_on_date(dt, sort=sort)
+
+    def list_date_range(self, start: datetime, end: datetime) -> int:
+        """List every day from ``start`` to ``end`` into its manifest; the
+        number of keys listed."""
+        return sum(len(self.list_date(dt)) for dt in _days(start, end))
 
     def find_messages_on_date(
         self,
@@ -115,30 +222,36 @@ class S3MessageImporter:
         skip_past: str | None = None,
         sort: Literal["none", "asc", "desc"] = "none",
     ) -> Iterable[S3MessageInfo]:
-        prefix = f"{self.world_instance_name}/eventstore/{dt.strftime('%Y%m%d')}"
-        paginator = self.s3.get_paginator("list_objects_v2")
-        pages = paginator.paginate(Bucket=self.aws_bucket_name, Prefix=prefix)
-
         date_results: list[S3MessageInfo] = []
-        for page in pages:
-            for s3_object in page.get("Contents", []):
-                key_str = s3_object["Key"]
-                try:
-                    msg_info = S3MessageInfo(key_str)
-                    if msg_info.msg_type_name in self.msg_types:
-                        date_results.append(msg_info)
-                    elif msg_info.msg_type_name not in ALL_MSG_TYPES:
-                        self.logger.warning(
-                            f'Unknown message type "{msg_info.msg_type_name}" in {key_str}'
-                        )
-                except Exception as e:
-                    self.logger.warning(f"Failed file name parsing for {key_str}")
-                    self.logger.exception(e)
+        started = time.perf_counter()
+        listing = self.list_date(dt)
+        if self.stage_times is not None:
+            self.stage_times.record("list", "", "", time.perf_counter() - started)
+        for msg_info in listing:
+            if msg_info.msg_type_name in self.msg_types:
+                date_results.append(msg_info)
+            elif msg_info.msg_type_name not in ALL_MSG_TYPES:
+                self.logger.warning(
+                    f'Unknown message type "{msg_info.msg_type_name}" in {msg_info.key_str}'
+                )
 
         if sort != "none":
-            date_results.sort(key=lambda x: x.persist_time, reverse=(sort == "desc"))
-
-        if skip_past is not None:
+            date_results.sort(key=lambda x: x.listing_order, reverse=(sort == "desc"))
+
+        if skip_past is not None and sort != "none":
+            # Everything at or before skip_past in listing order, found by
+            # bisection; skip_past need not itself be selected.
+            past = S3MessageInfo(skip_past).listing_order
+            if sort == "asc":
+                i = bisect.bisect_right(
+                    date_results, past, key=lambda x: x.listing_order
+                )
+                date_results = date_results[i:]
+            else:
+                ascending = date_results[::-1]
+                i = bisect.bisect_left(ascending, past, key=lambda x: x.listing_order)
+                date_results = ascending[:i][::-1]
+        elif skip_past is not None:
             skip_index = -1
             for i in range(0, len(date_results)):
                 if skip_past == date_results[i].key_str:
@@ -155,11 +268,42 @@ class S3MessageImporter:
 
         # blist = self.get_single_asset_filenames(start_s, duration_hrs, short_alias)
 
-    def download_message(self, msg_info: S3MessageInfo):
-        s3_object = self.s3.get_object(
-            Bucket=self.aws_bucket_name, Key=msg_info.key_str
-        )
-        return (s3_object["Body"].read(), s3_object["ContentLength"])
+    def list_date(self, dt: datetime) -> list[S3MessageInfo]:
+        """Every parseable key of the date, of any type, via its manifest
+        when one is cached."""
+        if self.manifest_dir is None:
+            return self._list_date_from_s3(dt, {})
+        path = manifest_path(self.manifest_dir, self.world_instance_name, dt)
+        manifest = load_manifest(path)
+        if manifest is not None and (manifest.complete or self.prelisted):
+            return [S3MessageInfo.from_row(row) for row in manifest.rows]
+        # Decide completeness before listing, so an object uploaded during
+        # the listing cannot be missed by a manifest marked complete.
+        complete = day_is_settled(dt)
+        known = {row.key: row for row in manifest.rows} if manifest else {}
+        msg_infos = self._list_date_from_s3(dt, known)
+        save_manifest(path, DayManifest(complete, [m.to_row() for m in msg_infos]))
+        return msg_infos
+
+    def _list_date_from_s3(
+        self, dt: datetime, known: dict[str, ManifestRow]
+    ) -> list[S3MessageInfo]:
+        prefix = f"{self.world_instance_name}/eventstore/{dt.strftime('%Y%m%d')}"
+        msg_infos: list[S3MessageInfo] = []
+        for key_str in self.source.list_keys(prefix):
+            row = known.get(key_str)
+            if row is not None:
+                msg_infos.append(S3MessageInfo.from_row(row))
+                continue
+            try:
+                msg_infos.append(S3MessageInfo(key_str))
+            except Exception as e:
+                self.logger.warning(f"Failed file name parsing for {key_str}")
+                self.logger.exception(e)
+        return msg_infos
+
+    def download_message(self, msg_info: S3MessageInfo) -> tuple[bytes, int]:
+        return self.source.read(msg_info.key_str)
 
 
 def _parse_date(value: str) -> datetime:
@@ -167,26 +311,57 @@ def _parse_date(value: str) -> datetime:
 
 
 def log_run_summary(
-    logger, summary: dict[tuple[str, str], VersionCounts], msg_counter: int
+    logger,
+    summary: dict[tuple[str, str], VersionCounts],
+    msg_counter: int,
+    indexed_degraded: int = 0,
+    total_bytes: int = 0,
+    elapsed_s: float = 0.0,
+    already_imported: int = 0,
+    stage_times: StageTimes | None = None,
+    trusted_decode: bool = False,
+    trusted_verified: int = 0,
+    trusted_disagreements: Counter[tuple[str, str]] | None = None,
 ) -> None:
     """Log a sorted (type_name, version) tally and call out degraded versions.
 
     Degraded versions are the actionable output of a backfill: the codec could
     not decode them, so each needs a sema word version authored before it can
-    load.
+    load. ``indexed_degraded`` is how many of the degraded decodes were of a
+    known type at an unknown version (split against the type's field index);
+    the rest were of types the codec does not know at all. ``db_failed``
+    counts messages that decoded but whose row could not be committed.
+    ``already_imported`` messages were skipped without a download.
+    ``stage_times`` adds each stage's total and its per-message p50/p95/p99
+    by (type_name, version) (see :mod:`gjk.stage_timing`).
+    With ``trusted_decode``, ``trusted_verified`` is how many trusted decodes
+    were checked against a full decode and ``trusted_disagreements`` the
+    (type_name, version)s where the two differed or the full decode raised.
     """
     lines = [
         "",
         "=" * 78,
         f"RUN SUMMARY (messages processed: {msg_counter})",
+    ]
+    if already_imported:
+        lines.append(f"Skipped (already imported): {already_imported}")
+    if elapsed_s > 0:
+        lines.append(
+            f"Throughput: {msg_counter / elapsed_s:.1f} msgs/s,"
+            f" {total_bytes / elapsed_s / 1e6:.2f} MB/s"
+            f" ({total_bytes} bytes in {elapsed_s:.1f} s)"
+        )
+    lines += [
         "-" * 78,
-        f"{'type_name':40} {'version':>9} {'ok':>8} {'degraded':>9} {'failed':>7}",
+        f"{'type_name':40} {'version':>9} {'ok':>8} {'degraded':>9} {'failed':>7}"
+        f" {'db_failed':>9}",
         "-" * 78,
     ]
     degraded = []
     for (type_name, version), c in sorted(summary.items()):
         lines.append(
             f"{type_name:40} {version:>9} {c.ok:>8} {c.degraded:>9} {c.failed:>7}"
+            f" {c.db_failed:>9}"
         )
         if c.degraded:
             degraded.append((type_name, version, c.degraded))
@@ -197,15 +372,61 @@ def log_run_summary(
         )
         for type_name, version, n in degraded:
             lines.append(f"  - {type_name} v{version} ({n} messages)")
+        lines.append(
+            f"{indexed_degraded} of {sum(n for *_, n in degraded)} degraded decodes"
+            " were known types at unknown versions."
+        )
     else:
         lines.append("No degraded versions — every accepted type decoded cleanly.")
     lines.append("=" * 78)
+    if trusted_decode:
+        lines += _trusted_decode_lines(trusted_verified, trusted_disagreements or {})
+    if stage_times is not None and stage_times.keys():
+        lines += _stage_timing_lines(stage_times)
     logger.info("\n".join(lines))
 
 
-def main(argv=None):
-    # argv=None -> sys.argv[1:] (unchanged CLI behavior); tests pass an explicit
-    # list so pytest's own args never leak into this parser.
+def _trusted_decode_lines(
+    verified: int, disagreements: Counter[tuple[str, str]]
+) -> list[str]:
+    lines = [f"Trusted decode: {verified} messages verified by a full decode."]
+    if disagreements:
+        lines.append(
+            f"{disagreements.total()} disagreed (fully validating would have"
+            " rejected or decoded them differently):"
+        )
+        for (type_name, version), n in sorted(disagreements.items()):
+            lines.append(f"  - {type_name} v{version} ({n} messages)")
+    else:
+        lines.append("No disagreements.")
+    lines.append("=" * 78)
+    return lines
+
+
+def _stage_timing_lines(stage_times: StageTimes) -> list[str]:
+    lines = [
+        "STAGE TIMINGS (download is summed over concurrent downloads)",
+        "  ".join(
+            f"{stage} {stage_times.stage_total_s(stage):.1f}s" for stage in STAGES
+        ),
+        "-" * 78,
+        f"{'type_name':32} {'version':>9} {'stage':>8} {'n':>8}"
+        f" {'p50 ms':>6} {'p95 ms':>6} {'p99 ms':>6}",
+        "-" * 78,
+    ]
+    order = {stage: i for i, stage in enumerate(STAGES)}
+    for key in sorted(stage_times.keys(), key=lambda k: (k[1], k[2], order[k[0]])):
+        stage, type_name, version = key
+        p50, p95, p99 = (1000 * s for s in stage_times.percentiles(key))
+        lines.append(
+            f"{type_name or '(all)':32} {version:>9} {stage:>8}"
+            f" {stage_times.count(key):>8} {p50:>6.1f} {p95:>6.1f} {p99:>6.1f}"
+        )
+    lines.append("=" * 78)
+    return lines
+
+
+def _build_parser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser(
         description="Import messages from S3 into the database"
     )
@@ -226,6 +447,62 @@ def main(argv=None):
     parser.add_argument(
         "--message-path", type=str, help="S3 key path of a single message to process"
     )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=DEFAULT_MAX_MESSAGES,
+        help="Number of decoded messages persisted per transaction",
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=DEFAULT_DOWNLOAD_CONCURRENCY,
+        help="Number of S3 downloads in flight at once",
+    )
+    parser.add_argument(
+        "--source",
+        type=Path,
+        help="Read from a local eventstore mirror (directory or tar archive) instead of S3",
+    )
+    parser.add_argument(
+        "--manifest-dir",
+        type=Path,
+        default=DEFAULT_MANIFEST_DIR,
+        help="Directory for cached per-day S3 listings",
+    )
+    parser.add_argument(
+        "--no-manifest-cache",
+        action="store_true",
+        help="List S3 on every run instead of using cached listings",
+    )
+    parser.add_argument(
+        "--object-cache-dir",
+        type=Path,
+        help="Keep downloaded S3 objects in this directory and read them from"
+        " there on later runs",
+    )
+    parser.add_argument(
+        "--object-cache-mb",
+        type=int,
+        default=DEFAULT_MAX_BYTES // 1024**2,
+        help="Size cap of --object-cache-dir; least recently used objects are"
+        " evicted past it",
+    )
+    parser.add_argument(
+        "--checkpoint",
+        type=Path,
+        help="File recording date-range progress after each committed batch",
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Continue the same date-range run after its --checkpoint",
+    )
+    parser.add_argument(
+        "--skip-past",
+        type=str,
+        help="S3 key to resume a date-range import after",
+    )
     parser.add_argument("--start", type=_parse_date, help="Start date (YYYY-MM-DD)")
     parser.add_argument("--end", type=_parse_date, help="End date (YYYY-MM-DD)")
     parser.add_argument(
@@ -233,11 +510,36 @@ def main(argv=None):
         type=str,
         help="When importing a date range, a comma-separated list of message types to import -- or, when preceded with '~', a list of message types to skip",
     )
-    args = parser.parse_args(argv)
+    parser.add_argument(
+        "--skip-imported",
+        action="store_true",
+        help="Before downloading, skip messages whose row is already in the"
+        " database (types keyed by persist time and a deterministic id only)",
+    )
+    parser.add_argument(
+        "--trusted-decode",
+        action="store_true",
+        help="Skip the model validators (axioms) when decoding, for re-imports"
+        " of objects that were validated once already",
+    )
+    parser.add_argument(
+        "--verify-fraction",
+        type=float,
+        default=DEFAULT_VERIFY_FRACTION,
+        help="With --trusted-decode, the random fraction of messages also fully"
+        " validated; disagreements are counted in the run summary",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Worker processes for a date-range import, each taking the sources"
+        " (from_alias) of one shard",
+    )
+    return parser
 
-    if args.message_path is None and (args.start is None or args.end is None):
-        parser.error("--start and --end are required unless --message-path is provided")
 
+def _setup_logger(verbose: bool) -> logging.Logger:
     logger = logging.getLogger(__name__)
     logger.setLevel(logging.DEBUG)
 
@@ -249,23 +551,127 @@ def main(argv=None):
     logger.addHandler(stderr_handler)
 
     stdout_handler = logging.StreamHandler(sys.stdout)
-    stdout_handler.setLevel("DEBUG" if args.verbose else "INFO")
+    stdout_handler.setLevel("DEBUG" if verbose else "INFO")
     stdout_handler.setFormatter(
         logging.Formatter("%(asctime)s | %(levelname)s | %(message)s")
     )
     logger.addHandler(stdout_handler)
+    return logger
 
+
+@dataclass
+class RunResult:
+    """What one import run (or one shard of it) reports for the summary."""
+
+    summary: dict[tuple[str, str], VersionCounts] = field(
+        default_factory=lambda: defaultdict(VersionCounts)
+    )
+    msg_counter: int = 0
+    indexed_degraded: int = 0
+    total_bytes: int = 0
+    already_imported: int = 0
+    stage_times: StageTimes = field(default_factory=StageTimes)
+    trusted_verified: int = 0
+    trusted_disagreements: Counter[tuple[str, str]] = field(default_factory=Counter)
+
+    def merge(self, other: "RunResult") -> None:
+        for key, counts in other.summary.items():
+            mine = self.summary[key]
+            mine.ok += counts.ok
+            mine.degraded += counts.degraded
+            mine.failed += counts.failed
+            mine.db_failed += counts.db_failed
+        self.msg_counter += other.msg_counter
+        self.indexed_degraded += other.indexed_degraded
+        self.total_bytes += other.total_bytes
+        self.already_imported += other.already_imported
+        self.stage_times.merge(other.stage_times)
+        self.trusted_verified += other.trusted_verified
+        self.trusted_disagreements.update(other.trusted_disagreements)
+
+
+def skip_already_imported(
+    msg_infos: Iterable[S3MessageInfo],
+    msg_persistor: SemaMessagePersistor,
+    result: RunResult,
+) -> Iterable[S3MessageInfo]:
+    """Drop messages whose ``messages`` row already exists, one query batch
+    per day, before anything is downloaded. Only persist-time-keyed types
+    (:meth:`SemaMessagePersistor.persist_time_keyed_types`) can be checked
+    this way; every other message passes through."""
+    keyed_types = msg_persistor.persist_time_keyed_types()
+    for _, day_infos in itertools.groupby(msg_infos, key=lambda m: m.day):
+        day_infos = list(day_infos)
+        ids = {
+            m.key_str: default_message_id(m.from_alias, m.msg_type_name, m.persist_time)
+            for m in day_infos
+            if m.msg_type_name in keyed_types
+        }
+        persisted = msg_persistor.persisted_ids([
+            (m.persist_time, ids[m.key_str]) for m in day_infos if m.key_str in ids
+        ])
+        for m in day_infos:
+            if ids.get(m.key_str) in persisted:
+                result.already_imported += 1
+            else:
+                yield m
+
+
+def _shard_path(path: Path, shard: tuple[int, int] | None) -> Path:
+    if shard is None:
+        return path
+    i, n = shard
+    return path.with_name(f"{path.stem}.shard{i}of{n}{path.suffix}")
+
+
+def checkpoint_workers(path: Path) -> set[int]:
+    """The --workers of every run with a checkpoint file at ``path``."""
+    found = {1} if path.exists() else set()
+    shard_name = re.compile(
+        rf"{re.escape(path.stem)}\.shard\d+of(\d+){re.escape(path.suffix)}"
+    )
+    if path.parent.is_dir():
+        for sibling in path.parent.iterdir():
+            if match := shard_name.fullmatch(sibling.name):
+                found.add(int(match.group(1)))
+    return found
+
+
+def import_messages(
+    args: argparse.Namespace,
+    parser: argparse.ArgumentParser,
+    logger,
+    shard: tuple[int, int] | None = None,
+    listing_dir: Path | None = None,
+) -> RunResult:
+    """The import loop: select, download, decode and persist. With
+    ``shard=(i, n)`` only sources whose from_alias hashes to shard i take
+    part, so every source is imported, in order, by exactly one shard.
+    ``listing_dir`` holds manifests of every day of the run, just listed by
+    the parent; the days are read from them instead of listed again."""
+    workers = shard[1] if shard is not None else 1
+    checkpoint_path = (
+        _shard_path(args.checkpoint, shard) if args.checkpoint is not None else None
+    )
     settings = Settings(
         service_alias="gjk.s3import",
         _env_file=dotenv.find_dotenv(),  # type: ignore
     )
 
-    codec = SemaCodec()
+    source = source_for(args.source) if args.source is not None else None
+    # A local source is already on disk; caching it would only copy it.
+    object_cache = (
+        ObjectCache(args.object_cache_dir, args.object_cache_mb * 1024**2)
+        if args.object_cache_dir is not None and source is None
+        else None
+    )
+    codec = JournalCodec()
     msg_persistor = SemaMessagePersistor(settings, codec, logger, db_echo=args.db_echo)
 
     if args.message_path is not None:
+        msg_types = msg_persistor.all_known_message_types()
         importer = S3MessageImporter(
-            settings, msg_persistor.all_known_message_types(), logger
+            settings, msg_types, logger, source=source, object_cache=object_cache
         )
         msg_infos: Iterable[S3MessageInfo] = [S3MessageInfo(args.message_path)]
     else:
@@ -283,22 +689,120 @@ def main(argv=None):
         else:
             msg_types = msg_persistor.all_known_message_types()
 
-        importer = S3MessageImporter(settings, msg_types, logger)
+        if listing_dir is not None:
+            manifest_dir = listing_dir
+        elif args.no_manifest_cache or source is not None:
+            # A local listing is as cheap as reading its manifest.
+            manifest_dir = None
+        else:
+            manifest_dir = args.manifest_dir
+        importer = S3MessageImporter(
+            settings,
+            msg_types,
+            logger,
+            manifest_dir=manifest_dir,
+            source=source,
+            object_cache=object_cache,
+        )
+        importer.prelisted = listing_dir is not None
         logger.info(
             f"Importing the following message types from {args.start.strftime('%Y-%m-%d')} through {args.end.strftime('%Y-%m-%d')}: "
             + "".join(map(lambda t: f"\n  {t}", sorted(msg_types)))
         )
+        run_start, run_end = (
+            args.start.strftime("%Y-%m-%d"),
+            args.end.strftime("%Y-%m-%d"),
+        )
+        skip_past = args.skip_past
+        if args.resume:
+            checkpoint = load_checkpoint(checkpoint_path)
+            if checkpoint is None:
+                logger.info(f"No checkpoint at {checkpoint_path}; starting fresh")
+            elif not checkpoint.same_run(run_start, run_end, msg_types):
+                parser.error(f"{checkpoint_path} is from a different import run")
+            elif checkpoint.workers != workers:
+                parser.error(
+                    f"{checkpoint_path} is from a run with --workers"
+                    f" {checkpoint.workers}"
+                )
+            else:
+                skip_past = checkpoint.key
+                logger.info(f"Resuming after {checkpoint.key}")
         msg_infos = importer.find_messages_in_date_range(
             start=args.start,
             end=args.end,
+            skip_past=skip_past,
+        )
+        if shard is not None:
+            i, n = shard
+            msg_infos = (m for m in msg_infos if shard_for(m.from_alias, n) == i)
+
+    def _save_progress(msg_info: S3MessageInfo) -> None:
+        # Called once every message up to msg_info is committed or skipped.
+        if checkpoint_path is None or args.message_path is not None or args.dry_run:
+            return
+        save_checkpoint(
+            checkpoint_path,
+            ImportCheckpoint(
+                start=run_start,
+                end=run_end,
+                message_types=sorted(msg_types),
+                day=msg_info.day,
+                persist_ms=msg_info.persist_ms,
+                key=msg_info.key_str,
+                workers=workers,
+            ),
         )
 
-    summary: dict[tuple[str, str], VersionCounts] = defaultdict(VersionCounts)
+    # Only the imported types' modules get loaded.
+    codec.limit_to(msg_types)
+    result = RunResult()
+    summary = result.summary
+    stage_times = result.stage_times
+    importer.stage_times = stage_times
+    msg_persistor.stage_times = stage_times
+    if args.skip_imported:
+        msg_infos = skip_already_imported(msg_infos, msg_persistor, result)
+
+    # ok, db_failed and the checkpoint all come from the flush: the batcher
+    # reports each message that failed on its own, then the whole batch.
+    failed_in_flush: set[int] = set()
+
+    def _on_persist_failed(msg: PendingMessage, e: Exception) -> None:
+        summary[(msg.payload.type_name, str(msg.payload.version))].db_failed += 1
+        failed_in_flush.add(id(msg))
+        if args.abort_on_error:
+            raise e
+
+    def _on_flushed(batch: list[PendingMessage]) -> None:
+        for msg in batch:
+            if id(msg) not in failed_in_flush:
+                summary[(msg.payload.type_name, str(msg.payload.version))].ok += 1
+        failed_in_flush.clear()
+        _save_progress(batch[-1].ack_handle)
+
+    batcher = MessageBatcher(
+        msg_persistor,
+        logger,
+        max_messages=args.batch_size,
+        on_flushed=_on_flushed,
+        on_failed=_on_persist_failed,
+    )
     gb_counter = 0
     byte_counter = 0
+    total_bytes = 0
     msg_counter = 0
-    msg_text = "(not yet downloaded)"
-    for msg_info in msg_infos:
+    msg_bytes = b"(not yet downloaded)"
+
+    def _timed_download(msg_info: S3MessageInfo) -> tuple[tuple[bytes, int], float]:
+        started = time.perf_counter()
+        downloaded = importer.download_message(msg_info)
+        return downloaded, time.perf_counter() - started
+
+    downloads = prefetch(_timed_download, msg_infos, args.concurrency)
+    last_info: S3MessageInfo | None = None
+    for msg_info, download in downloads:
+        last_info = msg_info
         msg_counter += 1
         if byte_counter > 1000000000:
             byte_counter = 0
@@ -312,40 +816,207 @@ def main(argv=None):
                 f"Completed {msg_counter} messages ({byte_counter}B) thru {msg_info.persist_time.isoformat()}"
             )
 
+        # Stage durations are recorded under the decoded (type, version), or
+        # under PARSE_FAIL if the message never got that far.
+        stage_key = (msg_info.msg_type_name, PARSE_FAIL)
+        stage_s: dict[str, float] = {}
         try:
-            (msg_bytes, msg_length) = importer.download_message(msg_info)
+            (msg_bytes, msg_length), stage_s["download"] = download.result()
             byte_counter += msg_length
-            msg_text = msg_bytes.decode("utf-8")
-            msg_dict = json.loads(msg_text)
-            sema_obj = codec.from_dict(
-                msg_dict["Payload"], auto_upgrade=False, mode="degraded"
+            total_bytes += msg_length
+            started = time.perf_counter()
+            sema_obj = codec.from_bytes(
+                msg_bytes,
+                auto_upgrade=False,
+                mode="degraded",
+                wrapped=True,
+                trusted=args.trusted_decode,
             )
+            if (
+                args.trusted_decode
+                and isinstance(sema_obj, SemaType)
+                and random.random() < args.verify_fraction
+            ):
+                sema_obj = _verify_trusted(
+                    codec, msg_info, msg_bytes, sema_obj, result, logger
+                )
+            stage_s["decode"] = time.perf_counter() - started
+            stage_key = (sema_obj.type_name, str(sema_obj.version))
             if isinstance(sema_obj, SemaType):
-                summary[(sema_obj.type_name, str(sema_obj.version))].ok += 1
                 logger.debug(
                     f"Successfully parsed {sema_obj.type_name} (v{sema_obj.version}) from {msg_info.key_str} (persisted at {msg_info.persist_time.isoformat()})"
                 )
-                if not args.dry_run:
-                    msg_persistor.persist_message(
-                        msg_info.from_alias, msg_info.persist_time, sema_obj
+                if args.dry_run:
+                    summary[(sema_obj.type_name, str(sema_obj.version))].ok += 1
+                else:
+                    # Counted ok by _on_flushed once committed.
+                    batcher.add(
+                        PendingMessage(
+                            msg_info.from_alias,
+                            msg_info.persist_time,
+                            sema_obj,
+                            ack_handle=msg_info,
+                        )
                     )
             else:
                 summary[(sema_obj.type_name, str(sema_obj.version))].degraded += 1
                 logger.warning(
                     f"Parsed into degraded SEMA type {sema_obj.type_name} (v{sema_obj.version}) from {msg_info.key_str}"
                 )
-                logger.debug(msg_text)
+                logger.debug(msg_bytes.decode("utf-8", "replace"))
 
         except Exception as e:
             summary[(msg_info.msg_type_name, PARSE_FAIL)].failed += 1
             logger.error(f"Parsing failure for {msg_info.key_str}: {repr(e)}")
             logger.exception(e)
-            logger.debug(msg_text)
+            logger.debug(msg_bytes.decode("utf-8", "replace"))
             if args.abort_on_error:
                 raise
             continue
+        finally:
+            for stage, seconds in stage_s.items():
+                stage_times.record(stage, *stage_key, seconds)
+
+        # Outside the per-message try: a failed persist is accounted (and,
+        # with --abort-on-error, raised) by _on_persist_failed.
+        if batcher.full:
+            batcher.flush()
+
+    batcher.flush()
+    if last_info is not None:
+        _save_progress(last_info)
+    if object_cache is not None:
+        logger.info(
+            f"Object cache: {object_cache.hits} hits, {object_cache.misses} misses,"
+            f" {object_cache.total_bytes / 1e6:.1f} MB on disk"
+        )
+    result.msg_counter = msg_counter
+    result.indexed_degraded = sum(codec.indexed_degraded.values())
+    result.total_bytes = total_bytes
+    return result
+
+
+def _verify_trusted(
+    codec: JournalCodec,
+    msg_info: S3MessageInfo,
+    msg_bytes: bytes,
+    trusted_obj: SemaType,
+    result: RunResult,
+    logger,
+) -> SemaType:
+    """The full decode of ``msg_bytes``, compared against its trusted decode.
+    On a disagreement the full decode wins: it is returned, or it raises."""
+    result.trusted_verified += 1
+    key = (trusted_obj.type_name, str(trusted_obj.version))
+    try:
+        full_obj = codec.from_bytes(
+            msg_bytes, auto_upgrade=False, mode="degraded", wrapped=True
+        )
+    except Exception:
+        result.trusted_disagreements[key] += 1
+        logger.warning(f"Trusted decode accepted {msg_info.key_str}; a full one raised")
+        raise
+    if full_obj != trusted_obj:
+        result.trusted_disagreements[key] += 1
+        logger.warning(
+            f"Trusted and full decodes of {msg_info.key_str} differ; keeping the full one"
+        )
+    return full_obj
+
+
+def _import_shard(
+    argv: list[str], shard: int, workers: int, listing_dir: Path | None
+) -> RunResult:
+    """A worker process: the whole run, restricted to one shard."""
+    parser = _build_parser()
+    args = parser.parse_args(argv)
+    logger = _setup_logger(args.verbose)
+    result = import_messages(
+        args, parser, logger, shard=(shard, workers), listing_dir=listing_dir
+    )
+    # The defaultdict's factory does not pickle back to the parent.
+    result.summary = dict(result.summary)
+    return result
+
+
+def _list_for_shards(args: argparse.Namespace, logger, listing_dir: Path) -> None:
+    settings = Settings(
+        service_alias="gjk.s3import",
+        _env_file=dotenv.find_dotenv(),  # type: ignore
+    )
+    importer = S3MessageImporter(settings, set(), logger, manifest_dir=listing_dir)
+    started = time.perf_counter()
+    n = importer.list_date_range(args.start, args.end)
+    logger.info(
+        f"Listed {n} keys for the shards in {time.perf_counter() - started:.1f} s"
+    )
+
+
+def main(argv=None):
+    # argv=None -> sys.argv[1:] (unchanged CLI behavior); tests pass an explicit
+    # list so pytest's own args never leak into this parser.
+    argv = sys.argv[1:] if argv is None else argv
+    parser = _build_parser()
+    args = parser.parse_args(argv)
+
+    if args.message_path is None and (args.start is None or args.end is None):
+        parser.error("--start and --end are required unless --message-path is provided")
+    if args.resume and args.checkpoint is None:
+        parser.error("--resume requires --checkpoint")
+    if args.workers < 1 or (args.workers > 1 and args.message_path is not None):
+        parser.error("--workers must be >= 1, and 1 with --message-path")
+    if not 0 <= args.verify_fraction <= 1:
+        parser.error("--verify-fraction must be between 0 and 1")
+    if args.resume:
+        # Checkpoints are per shard: another --workers would silently start
+        # over.
+        found = checkpoint_workers(args.checkpoint)
+        if found and args.workers not in found:
+            parser.error(
+                f"{args.checkpoint} is from a run with --workers"
+                f" {', '.join(map(str, sorted(found)))}; resume with the same"
+            )
 
-    log_run_summary(logger, summary, msg_counter)
+    logger = _setup_logger(args.verbose)
+    started = time.monotonic()
+    if args.workers == 1:
+        result = import_messages(args, parser, logger)
+    else:
+        # Decode is CPU-bound, so shards run in processes, each with its own
+        # codec, persistor and download pool. Spawned, not forked: the parent
+        # may already hold threads and connections.
+        result = RunResult()
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            # Listed once, here: the shards read the manifests rather than
+            # each list every day and write the same manifests at once.
+            listing_dir = None
+            if args.source is None:
+                listing_dir = (
+                    Path(tmp_dir) if args.no_manifest_cache else args.manifest_dir
+                )
+                _list_for_shards(args, logger, listing_dir)
+            with ProcessPoolExecutor(
+                max_workers=args.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            ) as pool:
+                n = args.workers
+                for shard_result in pool.map(
+                    _import_shard, [argv] * n, range(n), [n] * n, [listing_dir] * n
+                ):
+                    result.merge(shard_result)
+    log_run_summary(
+        logger,
+        result.summary,
+        result.msg_counter,
+        result.indexed_degraded,
+        total_bytes=result.total_bytes,
+        elapsed_s=time.monotonic() - started,
+        already_imported=result.already_imported,
+        stage_times=result.stage_times,
+        trusted_decode=args.trusted_decode,
+        trusted_verified=result.trusted_verified,
+        trusted_disagreements=result.trusted_disagreements,
+    )
 
 
 if __name__ == "__main__":
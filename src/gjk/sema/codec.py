@@ -225,4 +225,11 @@ def get_old_versions() -> dict[str, dict[str | None, type[SemaType]]]:
     return registry
 
 
-default_codec = SemaCodec()
+def __getattr__(name: str):
+    # Building default_codec imports every type module; do it on first use,
+    # not on every import of gjk.sema.
+    if name == "default_codec":
+        global default_codec
+        default_codec = SemaCodec()
+        return default_codec
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
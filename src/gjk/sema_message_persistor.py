@@ -1,11 +1,15 @@
+import json
 import uuid
+from collections.abc import Sequence
 from contextlib import contextmanager
 from datetime import UTC, datetime
+from time import perf_counter
+from typing import Any
 
 from gw_data.db.models import MessageSql
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, select, tuple_
 from sqlalchemy.dialects.postgresql import insert
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
 
 from gjk.config import Settings
 from gjk.flo_params_house0_persistor import FloParamsHouse0Persistor
@@ -13,10 +17,14 @@ from gjk.layout_lite_persistor import LayoutLitePersistor
 from gjk.message_persistence_info import (
     MESSAGE_ID_NAMESPACE,
     MessagePersistenceInfo,
+    PendingMessage,
     default_message_id,
 )
+from gjk.reading_channel_registry import ReadingChannelRegistry
+from gjk.readings_writer import deferred_readings
 from gjk.report_event_persistor import ReportEventPersistor
 from gjk.sema import SemaCodec, SemaType
+from gjk.stage_timing import StageTimes
 from gjk.weather_bundle_persistor import WeatherBundlePersistor
 from gjk.weather_forecast_persistor import WeatherForecastPersistor
 
@@ -25,6 +33,18 @@ from gjk.weather_forecast_persistor import WeatherForecastPersistor
 __all__ = ["MESSAGE_ID_NAMESPACE", "SemaMessagePersistor"]
 
 
+class StoredJson(str):
+    """JSON text for a JSON column, bound as-is (see :func:`json_serializer`)."""
+
+
+def json_serializer(value: Any) -> str:
+    """The engine's JSON encoder: ``json.dumps``, except for text that is
+    already JSON."""
+    if isinstance(value, StoredJson):
+        return value
+    return json.dumps(value)
+
+
 class SemaMessagePersistor:
     MSG_CREATED_AT_FIELDS_MS = {
         "glitch": "created_ms",
@@ -75,23 +95,35 @@ class SemaMessagePersistor:
         "power.watts",
     ]
 
+    # Set by the S3 importer to time the persist and db_ops stages.
+    stage_times: StageTimes | None = None
+
     def __init__(
         self, settings: Settings, codec: SemaCodec, logger, db_echo: bool = False
     ):
         self.settings = settings
         self.codec = codec
-        engine = create_engine(settings.db_url.get_secret_value(), echo=db_echo)
+        engine = create_engine(
+            settings.db_url.get_secret_value(),
+            echo=db_echo,
+            json_serializer=json_serializer,
+        )
         self.Session = sessionmaker(bind=engine)
         self.logger = logger
+        # Shared by every custom persistor: one cached channel map per
+        # terminal asset instead of a reading_channels query per message.
+        self.channel_registry = ReadingChannelRegistry(
+            ttl_s=settings.channel_cache_ttl_s
+        )
 
         self.custom_persistor_lookup = {
             x.target_message_type: x
             for x in [
-                LayoutLitePersistor(logger),
-                ReportEventPersistor(logger),
-                FloParamsHouse0Persistor(logger),
-                WeatherForecastPersistor(logger),
-                WeatherBundlePersistor(logger),
+                LayoutLitePersistor(logger, self.channel_registry),
+                ReportEventPersistor(logger, self.channel_registry),
+                FloParamsHouse0Persistor(logger, self.channel_registry),
+                WeatherForecastPersistor(logger, self.channel_registry),
+                WeatherBundlePersistor(logger, self.channel_registry),
             ]
         }
 
@@ -104,6 +136,9 @@ class SemaMessagePersistor:
             session.commit()  # Commit if everything went well
         except Exception:
             session.rollback()  # Rollback in case of an error
+            # Channels cached during the failed transaction may never have
+            # been committed.
+            self.channel_registry.clear()
             raise  # Re-raise the exception after rollback
         finally:
             session.close()  # Always close the session
@@ -119,9 +154,41 @@ class SemaMessagePersistor:
             )
         }
 
+    def persist_time_keyed_types(self) -> set[str]:
+        """Types whose ``messages`` row is keyed purely by where they came
+        from: timestamp = persist time and id = :func:`default_message_id`.
+        Their key is known from the S3 object name alone, before download."""
+        return (
+            set(self.BASIC_MSG_TYPES)
+            - set(self.MSG_ID_FIELDS)
+            - set(self.MSG_CREATED_AT_FIELDS_MS)
+            - set(self.MSG_CREATED_AT_FIELDS_S)
+            - set(self.custom_persistor_lookup)
+        )
+
+    def persisted_ids(
+        self, candidates: Sequence[tuple[datetime, str]], chunk_size: int = 1000
+    ) -> set[str]:
+        """The ids among ``candidates`` ((timestamp, id) pairs) that already
+        have a ``messages`` row, looked up on the primary key in chunks."""
+        found: set[str] = set()
+        with self.get_db() as db:
+            for i in range(0, len(candidates), chunk_size):
+                keys = [
+                    (timestamp, uuid.UUID(id))
+                    for timestamp, id in candidates[i : i + chunk_size]
+                ]
+                rows = db.execute(
+                    select(MessageSql.id).where(
+                        tuple_(MessageSql.timestamp, MessageSql.id).in_(keys)
+                    )
+                )
+                found.update(str(id) for id in rows.scalars())
+        return found
+
     def persist_message_default(
         self, from_alias: str, payload: SemaType, time_received: datetime
-    ):
+    ) -> MessagePersistenceInfo:
         id = None
         id_field = self.MSG_ID_FIELDS.get(payload.type_name)
         if id_field:
@@ -154,13 +221,9 @@ class SemaMessagePersistor:
 
         return MessagePersistenceInfo(id=id, created_at=created_at)
 
-    def persist_message(
+    def resolve_persistence_info(
         self, from_alias: str, time_received: datetime, payload: SemaType
-    ):
-        self.logger.debug(
-            f"persisting message of type {payload.type_name}:{payload.version} from {from_alias} at {time_received.isoformat()}"
-        )
-
+    ) -> MessagePersistenceInfo:
         custom_persistor = self.custom_persistor_lookup.get(payload.type_name, None)
         custom_fn = (
             getattr(custom_persistor, f"persist_v{payload.version}", None)
@@ -168,32 +231,117 @@ class SemaMessagePersistor:
             else None
         )
         if custom_fn is not None:
-            persistence_info = custom_fn(from_alias, time_received, payload)
-        else:
-            persistence_info = self.persist_message_default(
-                from_alias, payload, time_received
-            )
+            return custom_fn(from_alias, time_received, payload)
+        return self.persist_message_default(from_alias, payload, time_received)
+
+    @staticmethod
+    def message_row(
+        from_alias: str,
+        time_received: datetime,
+        payload: SemaType,
+        persistence_info: MessagePersistenceInfo,
+    ) -> dict:
+        """The ``messages`` row for one payload, as insert parameters.
+
+        The payload is stored as ``payload.to_bytes()``: the same JSON as
+        ``json.dumps(payload.to_dict())``, written by pydantic-core in one
+        pass rather than built as Python objects and encoded again."""
+        return {
+            "id": uuid.UUID(persistence_info.id),
+            "timestamp": (
+                persistence_info.created_at
+                if persistence_info.created_at
+                else time_received
+            ),
+            "created_at": persistence_info.created_at,
+            "persisted_at": time_received,
+            "from_alias": from_alias,
+            "message_type_name": payload.type_name,
+            "payload": StoredJson(payload.to_bytes().decode()),
+        }
+
+    def persist_message(
+        self, from_alias: str, time_received: datetime, payload: SemaType
+    ):
         with self.get_db() as db:
-            msg = MessageSql(
-                id=uuid.UUID(persistence_info.id),
-                timestamp=(
-                    persistence_info.created_at
-                    if persistence_info.created_at
-                    else time_received
-                ),
-                created_at=persistence_info.created_at,
-                persisted_at=time_received,
-                from_alias=from_alias,
-                message_type_name=payload.type_name,
-                payload=payload.to_dict(),
-            )
+            self.write_message(db, from_alias, time_received, payload)
+
+    def write_message(
+        self, db: Session, from_alias: str, time_received: datetime, payload: SemaType
+    ):
+        """Write one message (and its custom persistor's additional rows) into
+        an open session; the caller owns the transaction."""
+        self.write_messages(db, [PendingMessage(from_alias, time_received, payload)])
 
-            stmt = insert(MessageSql).on_conflict_do_nothing(
-                index_elements=["timestamp", "id"]
+    def persist_messages(self, batch: Sequence[PendingMessage]) -> None:
+        """Persist a batch of messages in one transaction.
+
+        All-or-nothing: on failure the transaction is rolled back and the
+        exception propagates (callers such as
+        :class:`gjk.message_batcher.MessageBatcher` then retry per message).
+        """
+        if len(batch) == 0:
+            return
+        started = perf_counter()
+        with self.get_db() as db:
+            db_ops_s = self.write_messages(db, batch)
+        if self.stage_times is not None:
+            share = (perf_counter() - started - db_ops_s) / len(batch)
+            for msg in batch:
+                self.stage_times.record(
+                    "persist", msg.payload.type_name, str(msg.payload.version), share
+                )
+
+    def write_messages(self, db: Session, batch: Sequence[PendingMessage]) -> float:
+        """Write a batch into an open session with one ``messages`` insert,
+        then run every custom persistor's ``additional_db_operations`` with
+        their readings merged into one insert (see
+        :func:`gjk.readings_writer.deferred_readings`). Returns the seconds
+        spent on the additional operations."""
+        infos = []
+        rows = []
+        for msg in batch:
+            self.logger.debug(
+                f"persisting message of type {msg.payload.type_name}:{msg.payload.version} from {msg.from_alias} at {msg.time_received.isoformat()}"
+            )
+            info = self.resolve_persistence_info(
+                msg.from_alias, msg.time_received, msg.payload
             )
-            db.execute(stmt, [msg.__dict__])
+            infos.append(info)
+            rows.append(
+                self.message_row(msg.from_alias, msg.time_received, msg.payload, info)
+            )
+
+        # A list of parameter sets is sent as multi-row VALUES (SQLAlchemy's
+        # insertmanyvalues, paged under the bind-parameter limit).
+        stmt = insert(MessageSql).on_conflict_do_nothing(
+            index_elements=["timestamp", "id"]
+        )
+        db.execute(stmt, rows)
 
-            # TODO determine if the insert actually inserted anything so we can warn on a duplicate message
+        # TODO determine if the insert actually inserted anything so we can warn on a duplicate message
 
-            if persistence_info.additional_db_operations is not None:
-                persistence_info.additional_db_operations(db)
+        ops = [
+            (msg.payload, info.additional_db_operations)
+            for msg, info in zip(batch, infos)
+            if info.additional_db_operations is not None
+        ]
+        op_s = []
+        started = perf_counter()
+        with deferred_readings(db):
+            for _, operations in ops:
+                op_started = perf_counter()
+                operations(db)
+                op_s.append(perf_counter() - op_started)
+        db_ops_s = perf_counter() - started
+        if self.stage_times is not None and ops:
+            # The deferred readings insert ran once, on leaving the block.
+            readings_share = (db_ops_s - sum(op_s)) / len(ops)
+            for (payload, _), s in zip(ops, op_s):
+                self.stage_times.record(
+                    "db_ops",
+                    payload.type_name,
+                    str(payload.version),
+                    s + readings_share,
+                )
+        return db_ops_s
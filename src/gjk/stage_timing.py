@@ -0,0 +1,100 @@
+"""Per-stage durations of an import run, by (type_name, version).
+
+A slow backfill is S3-bound, CPU-bound or Postgres-bound, and the stage
+totals tell which: ``download`` is the S3 fetch (summed over the download
+threads, so it can exceed wall time), ``decode`` is CPU, ``persist`` and
+``db_ops`` are Postgres.
+
+- ``list``: one S3 listing (or manifest read) of a day, under type ``""``;
+- ``download``, ``decode`` (bytes to SemaType, JSON parsing included):
+  one message each;
+- ``persist``: a message's share of its batch's ``messages`` insert and
+  commit;
+- ``db_ops``: a message's ``additional_db_operations``, plus its share of
+  the batch's deferred readings insert.
+
+Durations go into log-spaced buckets (eight per doubling, so a percentile
+is within about 9%) rather than a list per message, so a month-long import
+holds a few hundred counters per key, and shards merge by adding them.
+"""
+
+import math
+import threading
+from collections import Counter, defaultdict
+
+STAGES = ("list", "download", "decode", "persist", "db_ops")
+
+_BUCKETS_PER_DOUBLING = 8
+_SMALLEST_S = 1e-6
+
+
+def _bucket(seconds: float) -> int:
+    if seconds <= _SMALLEST_S:
+        return 0
+    return math.ceil(math.log2(seconds / _SMALLEST_S) * _BUCKETS_PER_DOUBLING)
+
+
+def _bucket_upper_s(bucket: int) -> float:
+    return _SMALLEST_S * 2 ** (bucket / _BUCKETS_PER_DOUBLING)
+
+
+StageKey = tuple[str, str, str]  # (stage, type_name, version)
+
+
+class StageTimes:
+    def __init__(self):
+        self._buckets: defaultdict[StageKey, Counter[int]] = defaultdict(Counter)
+        self._total_s: Counter[StageKey] = Counter()
+        self._lock = threading.Lock()
+
+    def __getstate__(self):
+        # Shards send theirs back to the parent; the lock stays behind.
+        return (dict(self._buckets), self._total_s)
+
+    def __setstate__(self, state):
+        self.__init__()
+        buckets, self._total_s = state
+        self._buckets.update(buckets)
+
+    def record(self, stage: str, type_name: str, version: str, seconds: float) -> None:
+        key = (stage, type_name, version)
+        with self._lock:
+            self._buckets[key][_bucket(seconds)] += 1
+            self._total_s[key] += seconds
+
+    def merge(self, other: "StageTimes") -> None:
+        with self._lock:
+            for key, buckets in other._buckets.items():
+                self._buckets[key].update(buckets)
+            self._total_s.update(other._total_s)
+
+    def keys(self) -> list[StageKey]:
+        return sorted(self._buckets)
+
+    def count(self, key: StageKey) -> int:
+        return self._buckets[key].total() if key in self._buckets else 0
+
+    def total_s(self, key: StageKey) -> float:
+        return self._total_s[key]
+
+    def stage_total_s(self, stage: str) -> float:
+        return sum(s for (st, *_), s in self._total_s.items() if st == stage)
+
+    def percentiles(
+        self, key: StageKey, qs: tuple[float, ...] = (0.5, 0.95, 0.99)
+    ) -> tuple[float, ...]:
+        """Upper bounds, in seconds, of the buckets holding each quantile."""
+        buckets = sorted(self._buckets.get(key, {}).items())
+        n = sum(count for _, count in buckets)
+        if n == 0:
+            return tuple(0.0 for _ in qs)
+        out = []
+        for q in qs:
+            rank = max(1, math.ceil(q * n))
+            seen = 0
+            for bucket, count in buckets:
+                seen += count
+                if seen >= rank:
+                    out.append(_bucket_upper_s(bucket))
+                    break
+        return tuple(out)
@@ -0,0 +1,69 @@
+"""Cached upgrade chains for old-version decodes.
+
+``SemaType.to_latest`` re-derives the path to the latest version on every
+call: it looks the type up in the registry, parses both version strings,
+and checks the hop count against a loop bound before each ``upgrade()``.
+None of that depends on the message.
+
+:func:`upgrade_plan` works out the chain once per (old class, latest class)
+and keeps the ``upgrade`` functions it is made of, so a message only runs
+the hops. Every hop is the generated ``upgrade()`` itself and builds its
+model in full, so every version's validators, defaults and extra-field
+checks run exactly as they do under ``to_latest``.
+
+If a chain cannot be worked out, the plan is None and callers fall back to
+``to_latest``.
+"""
+
+import functools
+import typing
+from collections.abc import Callable
+from dataclasses import dataclass
+
+from gjk.sema import SemaType
+
+Upgrader = Callable[[SemaType], SemaType]
+
+
+@dataclass(frozen=True)
+class UpgradePlan:
+    # Each old class's upgrade(), in chain order.
+    steps: tuple[Upgrader, ...]
+
+    @property
+    def validations(self) -> int:
+        """Models built per message, after the old-version decode."""
+        return len(self.steps)
+
+    def run(self, instance: SemaType) -> SemaType:
+        current = instance
+        for upgrade in self.steps:
+            current = upgrade(current)
+        return current
+
+
+def _next_class(cls: type[SemaType]) -> type[SemaType] | None:
+    try:
+        nxt = typing.get_type_hints(cls.upgrade).get("return")
+    except Exception:
+        return None
+    return nxt if isinstance(nxt, type) and issubclass(nxt, SemaType) else None
+
+
+@functools.cache
+def upgrade_plan(
+    old_cls: type[SemaType], latest_cls: type[SemaType]
+) -> UpgradePlan | None:
+    """The chain of ``upgrade()`` calls from ``old_cls`` to ``latest_cls``, or
+    None if the chain of ``upgrade()`` return types does not lead there."""
+    steps: list[Upgrader] = []
+    cls = old_cls
+    # to_latest's loop bound: one hop per version.
+    max_hops = int(latest_cls.version_value()) - int(old_cls.version_value())
+    while cls is not latest_cls:
+        nxt = _next_class(cls)
+        if nxt is None or len(steps) >= max_hops:
+            return None
+        steps.append(cls.upgrade)
+        cls = nxt
+    return UpgradePlan(tuple(steps))
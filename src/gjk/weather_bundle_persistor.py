@@ -26,6 +26,7 @@ from sqlalchemy.orm import Session
 
 from gjk.message_persistence_info import MessagePersistenceInfo
 from gjk.pseudo_channels import PseudoChannel
+from gjk.reading_channel_registry import ReadingChannelRegistry
 from gjk.sema.enums import Gw1Unit
 from gjk.sema.types import GwWeatherChannelGt, GwWeatherForecastBundleGt
 
@@ -37,8 +38,9 @@ def flat_channel_name(name: str) -> str:
 
 
 class WeatherBundlePersistor:
-    def __init__(self, logger):
+    def __init__(self, logger, channel_registry: ReadingChannelRegistry | None = None):
         self.logger = logger
+        self.channel_registry = channel_registry or ReadingChannelRegistry()
         self.target_message_type = GwWeatherForecastBundleGt.type_name_value()
 
     def persist_v000(
@@ -71,15 +73,8 @@ class WeatherBundlePersistor:
         An existing row that disagrees with the record is logged, never
         silently mutated (that disagreement is a human conversation)."""
         name = flat_channel_name(record.name)
-        existing = (
-            db
-            .query(ReadingChannelSql)
-            .filter(
-                ReadingChannelSql.deactivated_date.is_(None),
-                ReadingChannelSql.terminal_asset_alias == from_alias,
-                ReadingChannelSql.name == name,
-            )
-            .first()
+        existing = self.channel_registry.channels(db, from_alias, names=[name]).get(
+            name
         )
         if existing is not None:
             if (
@@ -105,6 +100,7 @@ class WeatherBundlePersistor:
                 channel_type=PseudoChannel.CHANNEL_TYPE,
             )
         )
+        self.channel_registry.invalidate(from_alias)
         self.logger.info(
             f"created observed-series reading channel {name} ({from_alias})"
         )
@@ -0,0 +1,268 @@
+"""Tests for JournalCodec, gjk's SemaCodec subclass.
+
+Every vendored sema sample must decode to exactly what SemaCodec produces;
+the PascalCase contract (and its error) must be unchanged.
+"""
+
+import json
+import logging
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from gjk.journal_codec import (
+    JournalCodec,
+    MissingPayloadError,
+    json_decodable,
+    recursively_pascal,
+    sema_lookup,
+)
+from gjk.sema import SemaCodec, SemaError, SemaType
+from gjk.sema.base import DegradedSemaType
+from gjk.sema.base import recursively_pascal as sema_recursively_pascal
+
+SAMPLES = sorted(
+    (Path(__file__).parent.parent / "src" / "gjk" / "sema" / "samples").glob("*.json")
+)
+
+
+@pytest.fixture(scope="module")
+def codecs() -> tuple[SemaCodec, JournalCodec]:
+    return SemaCodec(), JournalCodec()
+
+
+@pytest.mark.parametrize("path", SAMPLES, ids=lambda p: p.stem)
+@pytest.mark.parametrize("auto_upgrade", [True, False])
+def test_samples_decode_like_sema_codec(codecs, path, auto_upgrade):
+    sema, journal = codecs
+    data = json.loads(path.read_text())
+    try:
+        expected = sema.from_dict(data, auto_upgrade=auto_upgrade)
+    except Exception as e:
+        with pytest.raises(type(e)):
+            journal.from_dict(data, auto_upgrade=auto_upgrade)
+        return
+    got = journal.from_dict(data, auto_upgrade=auto_upgrade)
+    assert type(got) is type(expected)
+    assert got == expected
+
+
+def test_nested_snake_case_key_is_rejected(codecs):
+    _, journal = codecs
+    data = json.loads((SAMPLES[0].parent / "report.event.json").read_text())
+    data["Report"]["ChannelReadingList"][0]["value_list"] = [1]
+    with pytest.raises(ValueError, match="PascalCase"):
+        journal.from_dict(data)
+
+
+@pytest.mark.parametrize(
+    "d",
+    [
+        {"Foo": [{"BarBaz": 1}, {"bar_baz": 2}]},
+        {"Foo": {"9lives": 1, "_private": 2}},
+        {"Foo": [[{"Ok": 1}], [{"notOk": 1}]]},
+        {"FooBar": "value_with_snake"},
+    ],
+)
+def test_recursively_pascal_agrees_with_sema(d):
+    assert recursively_pascal(d) == sema_recursively_pascal(d)
+
+
+def test_unknown_version_still_degrades(codecs):
+    _, journal = codecs
+    data = json.loads((SAMPLES[0].parent / "report.event.json").read_text())
+    data["Version"] = "999"
+    decoded = journal.from_dict(data, mode="degraded")
+    assert isinstance(decoded, DegradedSemaType)
+    assert not isinstance(decoded, SemaType)
+
+
+def test_every_indexed_type_version_resolves():
+    journal = JournalCodec()
+    for type_name, entry in sema_lookup().items():
+        assert journal.registry[type_name].version_value() == entry["latest_version"]
+        for version in journal.old_versions[type_name]:
+            old = journal.old_versions[type_name][version]
+            assert (old.type_name_value(), old.version_value()) == (
+                type_name,
+                version,
+            )
+
+
+def test_importing_the_codec_loads_no_type_modules():
+    # A fresh interpreter: this one has long since loaded them all.
+    loaded = subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            "import sys, gjk.journal_codec\n"
+            "print(sum(m.startswith('gjk.sema.types') for m in sys.modules))",
+        ],
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+    assert loaded.strip() == "0"
+
+
+def test_capture_limits_which_types_resolve():
+    journal = JournalCodec(capture=["report.event"])
+    assert list(journal.registry) == ["report.event"]
+    # Nothing is imported until the first decode.
+    assert journal.registry._loaded == {}
+
+    report = json.loads((SAMPLES[0].parent / "report.event.json").read_text())
+    assert journal.from_dict(report).type_name == "report.event"
+    assert list(journal.registry._loaded) == ["report.event"]
+
+    other = json.loads((SAMPLES[0].parent / "layout.lite.012.json").read_text())
+    with pytest.raises(ValueError, match="Unknown type"):
+        journal.from_dict(other)
+    assert not isinstance(journal.from_dict(other, mode="degraded"), SemaType)
+
+
+def test_degraded_split_matches_sema_and_is_counted(codecs, caplog):
+    sema, _ = codecs
+    journal = JournalCodec()
+    data = json.loads((SAMPLES[0].parent / "report.event.json").read_text())
+    data["Version"] = "999"
+    data["NotAField"] = 1
+
+    expected = sema.from_dict(data, mode="degraded")
+    with caplog.at_level(logging.WARNING, logger="gjk.journal_codec"):
+        got = [journal.from_dict(data, mode="degraded") for _ in range(3)]
+
+    assert got[0].known_fields == expected.known_fields
+    assert got[0].unknown_fields == expected.unknown_fields == {"NotAField": 1}
+    assert journal.indexed_degraded == {("report.event", "999"): 3}
+    assert [r.name for r in caplog.records].count("gjk.journal_codec") == 1
+
+
+def _bytes(data: dict, wrapped: bool) -> bytes:
+    return json.dumps({"Header": {}, "Payload": data} if wrapped else data).encode()
+
+
+@pytest.mark.parametrize("path", SAMPLES, ids=lambda p: p.stem)
+@pytest.mark.parametrize("auto_upgrade", [True, False])
+@pytest.mark.parametrize("wrapped", [True, False], ids=["wrapped", "bare"])
+def test_from_bytes_decodes_like_from_dict(codecs, path, auto_upgrade, wrapped):
+    sema, journal = codecs
+    data = json.loads(path.read_text())
+    body = _bytes(data, wrapped)
+    try:
+        expected = sema.from_dict(data, auto_upgrade=auto_upgrade)
+    except Exception as e:
+        with pytest.raises(type(e)):
+            journal.from_bytes(body, auto_upgrade=auto_upgrade, wrapped=wrapped)
+        return
+    got = journal.from_bytes(body, auto_upgrade=auto_upgrade, wrapped=wrapped)
+    assert type(got) is type(expected)
+    assert got == expected
+
+
+@pytest.mark.parametrize("path", SAMPLES, ids=lambda p: p.stem)
+def test_every_sample_class_takes_the_bytes_path(codecs, path):
+    _, journal = codecs
+    data = json.loads(path.read_text())
+    cls = journal.registry[data["TypeName"]]
+    if cls.version_value() != data.get("Version"):
+        cls = journal.old_versions[data["TypeName"]][data.get("Version")]
+    assert json_decodable(cls)
+
+
+def _set(path: list, value):
+    def edit(data):
+        *parents, last = path
+        for key in parents:
+            data = data[key]
+        data[last] = value
+
+    return edit
+
+
+@pytest.mark.parametrize(
+    ("sample", "edit"),
+    [
+        # A field by name instead of alias (pydantic's populate_by_name).
+        ("report.event.003", lambda d: d.update(message_id=d.pop("MessageId"))),
+        ("report.event.003", _set(["Report", "ChannelReadingList", 0, "x_y"], 1)),
+        # An extra key of an extra="allow" model.
+        ("spaceheat.node.gt.301", _set(["not_pascal"], 1)),
+        # A key inside a free-form dict field.
+        ("derived.channel.gt.001", _set(["Parameters", "EnergyModel", "bad_key"], 1)),
+    ],
+    ids=["field-name", "nested", "extra", "free-form"],
+)
+def test_from_bytes_keeps_the_pascal_case_contract(codecs, sample, edit):
+    _, journal = codecs
+    data = json.loads((SAMPLES[0].parent / f"{sample}.json").read_text())
+    edit(data)
+    with pytest.raises(ValueError, match="PascalCase"):
+        journal.from_dict(data)
+    with pytest.raises(ValueError, match="PascalCase"):
+        journal.from_bytes(_bytes(data, wrapped=True), wrapped=True)
+
+
+def test_from_bytes_degrades_unknown_versions_and_rejects_bad_json():
+    journal = JournalCodec()
+    data = json.loads((SAMPLES[0].parent / "report.event.003.json").read_text())
+    data["Version"] = "999"
+    decoded = journal.from_bytes(_bytes(data, True), mode="degraded", wrapped=True)
+    assert isinstance(decoded, DegradedSemaType)
+    assert journal.indexed_degraded == {("report.event", "999"): 1}
+
+    with pytest.raises(ValueError, match="Invalid JSON"):
+        journal.from_bytes(b"not-json")
+    # An envelope without a Payload is not a message.
+    data["Version"] = "003"
+    with pytest.raises(MissingPayloadError):
+        journal.from_bytes(_bytes(data, False), wrapped=True)
+    with pytest.raises(MissingPayloadError):
+        journal.from_bytes(b"[1, 2]", wrapped=True)
+
+
+@pytest.mark.parametrize("path", SAMPLES, ids=lambda p: p.stem)
+@pytest.mark.parametrize("wrapped", [True, False], ids=["wrapped", "bare"])
+def test_trusted_from_bytes_decodes_like_the_full_decode(codecs, path, wrapped):
+    _, journal = codecs
+    body = _bytes(json.loads(path.read_text()), wrapped)
+    full = journal.from_bytes(body, auto_upgrade=False, wrapped=wrapped)
+    got = journal.from_bytes(body, auto_upgrade=False, wrapped=wrapped, trusted=True)
+    assert type(got) is type(full)
+    assert got == full
+
+
+@pytest.mark.parametrize(
+    ("sample", "edit", "field"),
+    [
+        # LayoutLite axiom 3, on the root model.
+        (
+            "layout.lite.012",
+            lambda d: d["CriticalZoneList"].append("nowhere"),
+            ["MessageCreatedMs"],
+        ),
+        # ReportEvent axiom 3, which checks the nested Report.
+        (
+            "report.event.003",
+            _set(["Src"], "some.other.alias"),
+            ["Report", "MessageCreatedMs"],
+        ),
+    ],
+    ids=["layout-lite", "report-event"],
+)
+def test_trusted_from_bytes_skips_axioms_only(codecs, sample, edit, field):
+    _, journal = codecs
+    data = json.loads((SAMPLES[0].parent / f"{sample}.json").read_text())
+    edit(data)
+    body = _bytes(data, wrapped=True)
+    with pytest.raises(SemaError, match="Axiom"):
+        journal.from_bytes(body, wrapped=True)
+    trusted = journal.from_bytes(body, wrapped=True, trusted=True)
+    assert trusted.type_name == data["TypeName"]
+
+    # Field validators still run.
+    _set(field, -1)(data)
+    with pytest.raises(SemaError, match="MessageCreatedMs"):
+        journal.from_bytes(_bytes(data, wrapped=True), wrapped=True, trusted=True)
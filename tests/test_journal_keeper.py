@@ -7,7 +7,9 @@ from unittest.mock import MagicMock
 
 import pytest
 
+from gjk.ingest_pipeline import IngestPipeline
 from gjk.journal_keeper import JournalKeeper
+from gjk.message_batcher import MessageBatcher
 from gwbase.actor_base import ActorBase
 
 
@@ -29,6 +31,12 @@ def _make_bare_jk() -> JournalKeeper:
     jk.codec = MagicMock()
     jk.persistor = MagicMock()
     jk.logger = MagicMock()
+    jk.pipeline = IngestPipeline(
+        decode=jk._decode_delivery,
+        batchers=[MessageBatcher(jk.persistor, jk.logger)],
+        logger=jk.logger,
+    )
+    jk._inflight_ack = None
     # The capture set the queue-wide `#` bind narrows against at dispatch.
     jk._known_types = frozenset({
         "weather.forecast",
@@ -39,17 +47,28 @@ def _make_bare_jk() -> JournalKeeper:
     return jk
 
 
+def _flushed_writes(jk: JournalKeeper) -> list[tuple]:
+    """Drain the pipeline; return (None, from_alias, time_received, payload)
+    for every message it persisted."""
+    jk.pipeline.drain()
+    return [
+        (None, m.from_alias, m.time_received, m.payload)
+        for c in jk.persistor.persist_messages.call_args_list
+        for m in c.args[0]
+    ]
+
+
 def test_dispatch_message_malformed_json_does_not_raise() -> None:
     """Bad JSON gets logged and swallowed; the live actor must keep running."""
     jk = _make_bare_jk()
     envelope = MagicMock(from_alias="test.alias", type_name="weather.forecast")
     jk.dispatch_message(envelope=envelope, body=b"not-json")
-    jk.persistor.persist_message.assert_not_called()
+    assert _flushed_writes(jk) == []
     jk.logger.error.assert_called()
 
 
 def test_dispatch_message_routes_sema_to_persistor() -> None:
-    """A well-formed Payload reaches persistor.persist_message."""
+    """A well-formed Payload reaches the persistor via the batcher."""
     from gjk.sema import SemaType
 
     jk = _make_bare_jk()
@@ -64,10 +83,10 @@ def test_dispatch_message_routes_sema_to_persistor() -> None:
     }).encode()
     jk.dispatch_message(envelope=envelope, body=body)
 
-    jk.persistor.persist_message.assert_called_once()
-    args, _ = jk.persistor.persist_message.call_args
-    assert args[0] == "test.alias"
-    assert args[2] is sema_obj
+    writes = _flushed_writes(jk)
+    assert len(writes) == 1
+    assert writes[0][1] == "test.alias"
+    assert writes[0][3] is sema_obj
 
 
 def test_dispatch_message_outside_capture_set_drops_before_decode() -> None:
@@ -77,7 +96,7 @@ def test_dispatch_message_outside_capture_set_drops_before_decode() -> None:
     envelope = MagicMock(from_alias="test.alias", type_name="gridworks.ping")
     jk.dispatch_message(envelope=envelope, body=b"irrelevant")
     jk.codec.from_dict.assert_not_called()
-    jk.persistor.persist_message.assert_not_called()
+    assert _flushed_writes(jk) == []
 
 
 def test_persist_body_gates_decodable_but_uncaptured_types() -> None:
@@ -96,7 +115,7 @@ def test_persist_body_gates_decodable_but_uncaptured_types() -> None:
     body = json.dumps({"Payload": {"TypeName": "bid", "Version": "000"}}).encode()
     jk._persist_body(from_alias="test.alias", body=body)
 
-    jk.persistor.persist_message.assert_not_called()
+    assert _flushed_writes(jk) == []
 
 
 def test_dispatch_message_degraded_type_not_persisted() -> None:
@@ -111,10 +130,35 @@ def test_dispatch_message_degraded_type_not_persisted() -> None:
     body = json.dumps({"Payload": {"TypeName": "unknown.thing"}}).encode()
     jk.dispatch_message(envelope=envelope, body=body)
 
-    jk.persistor.persist_message.assert_not_called()
+    assert _flushed_writes(jk) == []
     jk.logger.warning.assert_called()
 
 
+def test_journal_codec_decodes_bodies_without_a_dict() -> None:
+    """With a JournalCodec the body goes through from_bytes: a captured type
+    persists, an uncaptured one is dropped without a degraded warning."""
+    from pathlib import Path
+
+    from gjk.journal_codec import JournalCodec
+
+    samples = Path(__file__).parent.parent / "src" / "gjk" / "sema" / "samples"
+    jk = _make_bare_jk()
+    jk._known_types = frozenset({"report.event"})
+    jk.codec = JournalCodec(capture=jk._known_types)
+    report = json.loads((samples / "report.event.003.json").read_text())
+    ack = json.loads((samples / "gw.weather.cmd.ack.000.json").read_text())
+
+    for payload in (ack, report):
+        body = json.dumps({"Header": {}, "Payload": payload}).encode()
+        jk._persist_body(from_alias="test.alias", body=body)
+    # An unwrapped body still decodes whole, as on the dict path.
+    jk._persist_body(from_alias="test.alias", body=json.dumps(report).encode())
+
+    writes = _flushed_writes(jk)
+    assert [w[3] for w in writes] == [JournalCodec().from_dict(report)] * 2
+    jk.logger.warning.assert_not_called()
+
+
 def test_legacy_hack_persists_broadcast_key() -> None:
     """legacy_hack: a pre-gwbase `broadcast.*` key (which gwbase cannot parse)
     is persisted anyway, with from_alias taken from the wrapped body's
@@ -135,10 +179,10 @@ def test_legacy_hack_persists_broadcast_key() -> None:
         routing_key="broadcast.flo-next-hour-plans", body=body, error=ValueError("x")
     )
 
-    jk.persistor.persist_message.assert_called_once()
-    args, _ = jk.persistor.persist_message.call_args
-    assert args[0] == "hw1.isone.me.versant.keene.beech.ltn"
-    assert args[2] is sema_obj
+    writes = _flushed_writes(jk)
+    assert len(writes) == 1
+    assert writes[0][1] == "hw1.isone.me.versant.keene.beech.ltn"
+    assert writes[0][3] is sema_obj
 
 
 def test_legacy_hack_src_falls_back_when_header_missing() -> None:
@@ -156,8 +200,9 @@ def test_legacy_hack_src_falls_back_when_header_missing() -> None:
         routing_key="broadcast.glitch", body=body, error=ValueError("x")
     )
 
-    jk.persistor.persist_message.assert_called_once()
-    assert jk.persistor.persist_message.call_args[0][0] == "unknown.broadcast.src"
+    writes = _flushed_writes(jk)
+    assert len(writes) == 1
+    assert writes[0][1] == "unknown.broadcast.src"
 
 
 @pytest.mark.skipif(
@@ -171,4 +216,87 @@ def test_legacy_hack_falls_back_for_non_broadcast() -> None:
     jk.on_routing_key_parse_error(
         routing_key="rj.garbled.key", body=b"{}", error=ValueError("x")
     )
-    jk.persistor.persist_message.assert_not_called()
+    assert _flushed_writes(jk) == []
+
+
+def test_on_message_acks_only_after_batch_commit(monkeypatch) -> None:
+    """A captured delivery is not acked on receipt — its ack is scheduled on
+    the consumer ioloop once the batch holding it has committed. A dropped
+    delivery (outside the capture set) is acked straight away."""
+    from gjk.sema import SemaType
+
+    jk = _make_bare_jk()
+    jk.pipeline.batchers[0].on_flushed = jk._ack_flushed
+    jk.pipeline.on_dropped = jk._ack_dropped
+    jk._single_channel = MagicMock(is_open=True)
+    jk._consume_connection = MagicMock()
+    jk.acknowledge_message = MagicMock()
+    # Run the marshaled ack callback inline.
+    jk._consume_connection.ioloop.add_callback_threadsafe.side_effect = lambda cb: cb()
+    sema_obj = MagicMock(spec=SemaType)
+    sema_obj.type_name = "weather.forecast"
+    sema_obj.version = "000"
+    jk.codec.from_dict.return_value = sema_obj
+
+    def _deliver(routing_key: str, tag: int) -> None:
+        jk.on_message(
+            None,
+            MagicMock(routing_key=routing_key, delivery_tag=tag),
+            None,
+            json.dumps({"Payload": {"TypeName": "weather.forecast"}}).encode(),
+        )
+
+    envelopes = {
+        "captured": MagicMock(from_alias="a.b", type_name="weather.forecast"),
+        "dropped": MagicMock(from_alias="a.b", type_name="gridworks.ping"),
+    }
+    monkeypatch.setattr("gjk.journal_keeper.parse_routing_key", envelopes.__getitem__)
+    _deliver("captured", 1)
+    _deliver("dropped", 2)
+
+    jk.acknowledge_message.assert_called_once_with(2)
+    jk._single_channel.basic_ack.assert_not_called()
+
+    jk.pipeline.drain()
+    jk._single_channel.basic_ack.assert_called_once_with(1)
+
+
+def test_acks_from_a_closed_channel_are_not_replayed_on_its_successor() -> None:
+    jk = _make_bare_jk()
+    old_channel = MagicMock(is_open=False)
+    jk._single_channel = MagicMock(is_open=True)
+    jk._consume_connection = MagicMock()
+    jk._consume_connection.ioloop.add_callback_threadsafe.side_effect = lambda cb: cb()
+    jk._ack_flushed([MagicMock(ack_handle=(old_channel, 7))])
+    jk._single_channel.basic_ack.assert_not_called()
+    old_channel.basic_ack.assert_not_called()
+
+
+def test_a_full_pipeline_nacks_and_pauses_consumption_until_it_drains() -> None:
+    """The consumer never blocks on a full decode queue: the delivery goes
+    back to the broker and the consumer is cancelled, then re-registered
+    once the pipeline has room."""
+    jk = _make_bare_jk()
+    channel = MagicMock(is_open=True)
+    jk._single_channel = channel
+    jk._consume_connection = MagicMock()
+    jk._consume_connection.ioloop.add_callback_threadsafe.side_effect = lambda cb: cb()
+    jk._consuming = True
+    jk._closing_consumer = False
+    jk._consumer_tag = "ctag-1"
+    jk.queue_name = "gjk-queue"
+    jk.pipeline.submit = MagicMock(return_value=False)
+    jk.pipeline.on_resume = jk._schedule_resume
+
+    jk._inflight_ack = (channel, 9)
+    jk._persist_body(from_alias="a.b", body=b"{}")
+
+    channel.basic_nack.assert_called_once_with(9, requeue=True)
+    channel.basic_cancel.assert_called_once_with("ctag-1")
+    assert not jk._consuming
+    assert jk._inflight_ack is None
+
+    channel.basic_consume.return_value = "ctag-2"
+    jk.pipeline.on_resume()
+    channel.basic_consume.assert_called_once_with("gjk-queue", jk.on_message)
+    assert jk._consuming and jk._consumer_tag == "ctag-2"
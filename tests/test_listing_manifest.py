@@ -0,0 +1,90 @@
+"""Tests for cached per-day S3 listing manifests. Hermetic: a fake S3 client
+and tmp_path."""
+
+import logging
+from datetime import UTC, datetime, timedelta
+
+from gjk.listing_manifest import (
+    DayManifest,
+    ManifestRow,
+    day_is_settled,
+    load_manifest,
+    manifest_path,
+    save_manifest,
+)
+from gjk.message_source import S3Source
+from gjk.s3_message_importer import S3MessageImporter
+
+PAST = datetime(2026, 5, 23)
+KEY = "hw1__1/eventstore/20260523/beech-report.event-1779500000000-ear.json"
+
+
+class _CountingS3:
+    def __init__(self, keys):
+        self.keys = keys
+        self.list_calls = 0
+
+    def get_paginator(self, _name):
+        return self
+
+    def paginate(self, **_kwargs):
+        self.list_calls += 1
+        return iter([{"Contents": [{"Key": k} for k in self.keys]}])
+
+
+def _importer(tmp_path, keys):
+    imp = S3MessageImporter.__new__(S3MessageImporter)
+    imp.source = S3Source("gwdev", client=_CountingS3(keys))
+    imp.aws_bucket_name = "gwdev"
+    imp.world_instance_name = "hw1__1"
+    imp.msg_types = {"report.event"}
+    imp.logger = logging.getLogger("test_listing_manifest")
+    imp.manifest_dir = tmp_path
+    return imp
+
+
+def test_settled_day_is_listed_once(tmp_path):
+    imp = _importer(tmp_path, [KEY, "hw1__1/eventstore/20260523/not-a-key"])
+    first = list(imp.find_messages_on_date(PAST))
+    second = list(imp.find_messages_on_date(PAST))
+
+    assert imp.source.client.list_calls == 1
+    assert [m.key_str for m in second] == [m.key_str for m in first] == [KEY]
+    assert second[0].persist_time == first[0].persist_time
+    manifest = load_manifest(manifest_path(tmp_path, "hw1__1", PAST))
+    assert manifest.complete and len(manifest.rows) == 1
+
+
+def test_unsettled_day_is_relisted_and_picks_up_new_keys(tmp_path):
+    today = datetime.now(UTC)
+    prefix = f"hw1__1/eventstore/{today.strftime('%Y%m%d')}"
+    old_key = f"{prefix}/oak-report.event-1779500000000-ear.json"
+    new_key = f"{prefix}/beech-report.event-1779500000001-ear.json"
+    imp = _importer(tmp_path, [old_key])
+    assert len(list(imp.find_messages_on_date(today))) == 1
+
+    imp.source.client.keys = [new_key, old_key]  # sorts before the last listed key
+    assert {m.key_str for m in imp.find_messages_on_date(today)} == {
+        old_key,
+        new_key,
+    }
+    assert imp.source.client.list_calls == 2
+    assert not load_manifest(manifest_path(tmp_path, "hw1__1", today)).complete
+
+
+def test_day_settles_an_hour_after_midnight():
+    day = datetime(2026, 5, 23)
+    midnight = datetime(2026, 5, 24, tzinfo=UTC)
+    assert not day_is_settled(day, now=midnight + timedelta(minutes=59))
+    assert day_is_settled(day, now=midnight + timedelta(hours=1))
+
+
+def test_manifest_roundtrip_and_corrupt_file(tmp_path):
+    path = tmp_path / "day.manifest.gz"
+    manifest = DayManifest(True, [ManifestRow(KEY, "beech", "report.event", 1, "ear")])
+    save_manifest(path, manifest)
+    assert load_manifest(path) == manifest
+
+    path.write_bytes(b"not gzip")
+    assert load_manifest(path) is None
+    assert load_manifest(tmp_path / "missing.manifest.gz") is None
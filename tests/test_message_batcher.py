@@ -0,0 +1,155 @@
+"""Tests for the live-path micro-batcher (MessageBatcher).
+
+Hermetic — the persistor is a MagicMock, so these cover batching policy
+(size / age limits), the one-``persist_messages``-per-batch contract, the
+per-message retry when a batch fails, and the flush/failure callbacks. No DB.
+"""
+
+import logging
+import threading
+from datetime import UTC, datetime
+from unittest.mock import MagicMock
+
+import pytest
+
+from gjk.message_batcher import MessageBatcher
+from gjk.message_persistence_info import PendingMessage
+
+LOG = logging.getLogger("test_message_batcher")
+T = datetime(2026, 5, 23, tzinfo=UTC)
+
+
+def _persistor(fail_batches: bool = False) -> MagicMock:
+    persistor = MagicMock()
+    if fail_batches:
+        persistor.persist_messages.side_effect = RuntimeError("db down")
+    return persistor
+
+
+def _batches(persistor: MagicMock) -> list[list[str]]:
+    return [
+        [m.from_alias for m in c.args[0]]
+        for c in persistor.persist_messages.call_args_list
+    ]
+
+
+def _msg(i: int) -> PendingMessage:
+    payload = MagicMock(type_name="power.watts")
+    return PendingMessage(f"alias.{i}", T, payload, ack_handle=i)
+
+
+def test_flush_writes_the_whole_batch_in_one_transaction():
+    persistor = _persistor()
+    batcher = MessageBatcher(persistor, LOG, max_messages=10)
+    for i in range(3):
+        batcher.add(_msg(i))
+
+    assert batcher.flush() == 3
+    assert _batches(persistor) == [["alias.0", "alias.1", "alias.2"]]
+    assert len(batcher) == 0
+
+
+def test_flush_splits_at_max_messages():
+    persistor = _persistor()
+    batcher = MessageBatcher(persistor, LOG, max_messages=2)
+    for i in range(5):
+        batcher.add(_msg(i))
+
+    assert batcher.flush() == 5
+    assert [len(b) for b in _batches(persistor)] == [2, 2, 1]
+
+
+def test_on_flushed_receives_batch_after_commit():
+    flushed: list[list[PendingMessage]] = []
+    batcher = MessageBatcher(_persistor(), LOG, on_flushed=flushed.append)
+    batcher.add(_msg(0))
+    batcher.add(_msg(1))
+    batcher.flush()
+
+    assert [[m.ack_handle for m in b] for b in flushed] == [[0, 1]]
+
+
+def test_failed_batch_is_retried_per_message_and_still_flushed():
+    persistor = _persistor(fail_batches=True)
+    persistor.persist_message.side_effect = [None, RuntimeError("bad row"), None]
+    flushed: list[list[PendingMessage]] = []
+    batcher = MessageBatcher(persistor, LOG, on_flushed=flushed.append)
+    for i in range(3):
+        batcher.add(_msg(i))
+
+    batcher.flush()
+
+    assert persistor.persist_message.call_count == 3
+    # The batch is handed back even though one message failed: the live path
+    # logs and drops a failed persist, exactly as it did per message.
+    assert len(flushed) == 1 and len(flushed[0]) == 3
+
+
+def test_on_failed_can_abort_the_flush():
+    persistor = _persistor(fail_batches=True)
+    persistor.persist_message.side_effect = RuntimeError("bad row")
+
+    def _abort(msg, e):
+        raise e
+
+    batcher = MessageBatcher(persistor, LOG, on_failed=_abort)
+    batcher.add(_msg(0))
+    batcher.add(_msg(1))
+
+    with pytest.raises(RuntimeError, match="bad row"):
+        batcher.flush()
+    assert persistor.persist_message.call_count == 1
+
+
+def test_flush_when_due_waits_for_age_limit():
+    persistor = _persistor()
+    batcher = MessageBatcher(persistor, LOG, max_messages=100, max_age_s=0.05)
+    batcher.add(_msg(0))
+
+    assert batcher.flush_when_due(timeout=1.0) == 1
+    assert len(_batches(persistor)) == 1
+
+
+def test_flush_when_due_returns_early_when_batch_fills():
+    persistor = _persistor()
+    batcher = MessageBatcher(persistor, LOG, max_messages=2, max_age_s=60)
+    batcher.add(_msg(0))
+    threading.Timer(0.05, lambda: batcher.add(_msg(1))).start()
+
+    assert batcher.flush_when_due(timeout=5.0) == 2
+
+
+def test_flush_when_due_times_out_on_young_partial_batch():
+    batcher = MessageBatcher(_persistor(), LOG, max_messages=100, max_age_s=60)
+    batcher.add(_msg(0))
+
+    assert batcher.flush_when_due(timeout=0.05) == 0
+    assert len(batcher) == 1
+
+
+def test_wake_releases_a_waiting_flusher():
+    batcher = MessageBatcher(_persistor(), LOG, max_age_s=60)
+    threading.Timer(0.05, batcher.wake).start()
+
+    assert batcher.flush_when_due(timeout=30.0) == 0
+
+
+def test_add_blocks_at_max_pending_until_a_flush():
+    persistor = _persistor()
+    batcher = MessageBatcher(persistor, LOG, max_messages=2, max_pending=2)
+    batcher.add(_msg(0))
+    batcher.add(_msg(1))
+
+    added = threading.Event()
+
+    def _producer():
+        batcher.add(_msg(2))
+        added.set()
+
+    t = threading.Thread(target=_producer, daemon=True)
+    t.start()
+    assert not added.wait(0.1)
+    batcher.flush()
+    assert added.wait(1.0)
+    t.join()
+    assert len(batcher) == 1
@@ -0,0 +1,87 @@
+"""Tests for the importer's message sources and a local-mirror import run.
+
+Hermetic: eventstore trees are built under tmp_path; no AWS, no DB.
+"""
+
+import json
+import tarfile
+from pathlib import Path
+
+import pytest
+
+import gjk.s3_message_importer as imp_mod
+from gjk.message_source import DirectorySource, TarSource, source_for
+
+SAMPLES = Path(__file__).parent.parent / "src" / "gjk" / "sema" / "samples"
+DAY = "hw1__1/eventstore/20260523"
+KEYS = [
+    f"{DAY}/beech-report.event-1779494400000-ear.json",
+    f"{DAY}/oak-report.event-1779494400001-ear.json",
+    "hw1__1/eventstore/20260524/beech-report.event-1779580800000-ear.json",
+]
+
+
+def _mirror(root: Path) -> Path:
+    body = json.dumps({
+        "Payload": json.loads((SAMPLES / "report.event.json").read_text())
+    })
+    for key in KEYS:
+        (root / key).parent.mkdir(parents=True, exist_ok=True)
+        (root / key).write_text(body)
+    return root
+
+
+@pytest.fixture(params=["dir", "tar.gz"])
+def source(request, tmp_path):
+    root = _mirror(tmp_path / "mirror")
+    if request.param == "dir":
+        return DirectorySource(root)
+    archive = tmp_path / "eventstore.tar.gz"
+    with tarfile.open(archive, "w:gz") as tar:
+        for key in KEYS:
+            tar.add(root / key, arcname=key)
+    return TarSource(archive)
+
+
+def test_list_keys_by_prefix(source):
+    assert list(source.list_keys(DAY)) == KEYS[:2]
+    assert list(source.list_keys("hw1__1/eventstore/2026052")) == KEYS
+    assert list(source.list_keys("hw1__1/eventstore/20300101")) == []
+
+
+def test_read_returns_body_and_length(source):
+    body, length = source.read(KEYS[0])
+    assert length == len(body)
+    assert json.loads(body)["Payload"]["TypeName"] == "report.event"
+
+
+def test_source_for_picks_directory_or_archive(tmp_path):
+    assert isinstance(source_for(_mirror(tmp_path)), DirectorySource)
+
+
+class _RecordingPersistor:
+    def __init__(self, *_a, **_k):
+        self.persisted = []
+
+    def all_known_message_types(self):
+        return {"report.event"}
+
+    def persist_messages(self, batch):
+        self.persisted += [(m.from_alias, m.payload.type_name) for m in batch]
+
+
+def test_import_from_local_mirror(monkeypatch, tmp_path):
+    persistor = _RecordingPersistor()
+    monkeypatch.setattr(imp_mod, "Settings", lambda **_k: object())
+    monkeypatch.setattr(imp_mod, "SemaMessagePersistor", lambda *_a, **_k: persistor)
+
+    imp_mod.main(
+        ["--start", "2026-05-23", "--end", "2026-05-24"]
+        + ["--source", str(_mirror(tmp_path))]
+    )
+
+    assert persistor.persisted == [
+        ("beech", "report.event"),
+        ("oak", "report.event"),
+        ("beech", "report.event"),
+    ]
@@ -0,0 +1,106 @@
+"""Tests for the local object cache the S3 importer reads through.
+
+Hermetic: the cache lives under tmp_path and S3 is a fake client.
+"""
+
+import io
+import os
+
+from gjk.message_source import S3Source
+from gjk.object_cache import CachedSource, ObjectCache
+
+KEY = "hw1__1/eventstore/20260523/beech-report.event-1779494400000-ear.json"
+
+
+class _CountingS3:
+    """get_object and a one-page listing over an in-memory bucket."""
+
+    def __init__(self, objects: dict[str, tuple[bytes, str]]):
+        self.objects = objects
+        self.gets = 0
+
+    def get_object(self, Bucket, Key):
+        self.gets += 1
+        body, etag = self.objects[Key]
+        return {"Body": io.BytesIO(body), "ContentLength": len(body), "ETag": etag}
+
+    def get_paginator(self, _name):
+        objects = self.objects
+
+        class _Paginator:
+            def paginate(self, **_kwargs):
+                yield {
+                    "Contents": [
+                        {"Key": key, "ETag": etag} for key, (_, etag) in objects.items()
+                    ]
+                }
+
+        return _Paginator()
+
+
+def test_second_read_is_served_from_disk(tmp_path):
+    s3 = _CountingS3({KEY: (b'{"Payload": {}}', '"e1"')})
+    source = CachedSource(
+        S3Source("gwdev", client=s3, etags=True), ObjectCache(tmp_path)
+    )
+    assert source.read(KEY) == (b'{"Payload": {}}', 15)
+    assert source.read(KEY) == (b'{"Payload": {}}', 15)
+    assert s3.gets == 1
+
+    # A later run (a new cache over the same directory) needs no download.
+    again = CachedSource(
+        S3Source("gwdev", client=s3, etags=True), ObjectCache(tmp_path)
+    )
+    assert again.read(KEY)[0] == b'{"Payload": {}}'
+    assert s3.gets == 1
+    assert (again.cache.hits, again.cache.misses) == (1, 0)
+
+
+def test_changed_etag_is_a_miss(tmp_path):
+    s3 = _CountingS3({KEY: (b"old", '"e1"')})
+    CachedSource(S3Source("gwdev", client=s3, etags=True), ObjectCache(tmp_path)).read(
+        KEY
+    )
+
+    s3.objects[KEY] = (b"new", '"e2"')
+    s3_source = S3Source("gwdev", client=s3, etags=True)
+    list(s3_source.list_keys("hw1__1/eventstore/20260523"))  # learns "e2"
+    assert CachedSource(s3_source, ObjectCache(tmp_path)).read(KEY)[0] == b"new"
+    assert s3.gets == 2
+
+
+def test_least_recently_used_entries_are_evicted_past_the_cap(tmp_path):
+    cache = ObjectCache(tmp_path, max_bytes=10**6)
+    for name in "abc":
+        cache.put(name, None, os.urandom(1000))  # incompressible
+    entry_size = cache.total_bytes // 3
+    assert cache.get("a") is not None  # "b" is now the oldest
+
+    cache.max_bytes = 3 * entry_size
+    cache.put("d", None, os.urandom(1000))
+    assert cache.get("b") is None
+    assert all(cache.get(name) is not None for name in "acd")
+    assert cache.total_bytes <= cache.max_bytes
+
+    # The tally is rebuilt from disk by the next run.
+    assert ObjectCache(tmp_path).total_bytes == cache.total_bytes
+
+
+def test_etags_are_kept_only_for_a_cache_and_only_until_used(tmp_path):
+    keys = [f"{KEY[:-5]}{i}.json" for i in range(3)]
+    s3 = _CountingS3({key: (b"{}", f'"e{i}"') for i, key in enumerate(keys)})
+    untracked = S3Source("gwdev", client=s3)
+    list(untracked.list_keys("hw1__1/eventstore/20260523"))
+    untracked.read(keys[0])
+    assert untracked.pop_etag(keys[0]) is None
+
+    source = S3Source("gwdev", client=s3, etags=True)
+    list(source.list_keys("hw1__1/eventstore/20260523"))
+    CachedSource(source, ObjectCache(tmp_path)).read(keys[0])
+    assert source.pop_etag(keys[0]) is None  # used up by the read
+    # Keys never read are dropped once two newer listings have started.
+    s3.objects = {}
+    list(source.list_keys("hw1__1/eventstore/20260524"))
+    assert source.pop_etag(keys[1]) == '"e1"'
+    list(source.list_keys("hw1__1/eventstore/20260525"))
+    assert source.pop_etag(keys[2]) is None
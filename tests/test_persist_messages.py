@@ -0,0 +1,203 @@
+"""Tests for the bulk ``SemaMessagePersistor.persist_messages`` path.
+
+Hermetic — the session is a MagicMock (with a real ``info`` dict, which is
+where ``deferred_readings`` buffers rows). Covers: one ``messages`` insert
+for the whole batch, and every custom persistor's readings merged into one
+``readings`` insert issued after all ``additional_db_operations`` ran, and
+the stored payload JSON against ``to_dict()`` for every sema sample.
+"""
+
+import json
+import logging
+import uuid
+from contextlib import contextmanager
+from datetime import UTC, datetime
+from pathlib import Path
+from unittest.mock import MagicMock
+
+import pytest
+
+from gjk.journal_codec import JournalCodec
+from gjk.message_persistence_info import (
+    MessagePersistenceInfo,
+    PendingMessage,
+    default_message_id,
+)
+from gjk.reading_batch import ReadingBatch
+from gjk.readings_writer import insert_readings
+from gjk.sema.base import UpgradeRequiresContext
+from gjk.sema_message_persistor import (
+    SemaMessagePersistor,
+    StoredJson,
+    json_serializer,
+)
+from gjk.stage_timing import StageTimes
+
+FROM_ALIAS = "hw1.isone.me.versant.keene.beech.scada"
+T = datetime(2026, 5, 23, tzinfo=UTC)
+SAMPLES = sorted(
+    (Path(__file__).parent.parent / "src" / "gjk" / "sema" / "samples").glob("*.json")
+)
+
+
+def _table(stmt) -> str:
+    return stmt.table.name
+
+
+class _ReadingsPersistor:
+    """A custom persistor whose additional op writes one reading."""
+
+    target_message_type = "weather.forecast"
+
+    def persist_v000(self, from_alias, time_received, payload):
+        def _op(db):
+            readings = ReadingBatch()
+            readings.append(payload.channel, payload.channel, 0, 1)
+            insert_readings(db, readings)
+
+        return MessagePersistenceInfo(
+            id=default_message_id(from_alias, payload.type_name, time_received),
+            created_at=None,
+            additional_db_operations=_op,
+        )
+
+
+def _persistor_and_db():
+    p = SemaMessagePersistor.__new__(SemaMessagePersistor)
+    p.logger = logging.getLogger("test_persist_messages")
+    p.custom_persistor_lookup = {"weather.forecast": _ReadingsPersistor()}
+    db = MagicMock()
+    db.info = {}
+
+    @contextmanager
+    def _fake_db():
+        yield db
+
+    p.get_db = _fake_db
+    return p, db
+
+
+def _payload(type_name: str, channel: uuid.UUID | None = None):
+    payload = MagicMock(version="000", channel=channel)
+    payload.type_name = type_name
+    payload.to_dict.return_value = {"TypeName": type_name}
+    payload.to_bytes.return_value = json.dumps({"TypeName": type_name}).encode()
+    return payload
+
+
+def test_batch_issues_one_messages_insert_and_one_readings_insert():
+    p, db = _persistor_and_db()
+    c1, c2 = uuid.uuid4(), uuid.uuid4()
+    batch = [
+        PendingMessage(FROM_ALIAS, T, _payload("weather.forecast", c1)),
+        PendingMessage(FROM_ALIAS, T, _payload("power.watts")),
+        PendingMessage(
+            FROM_ALIAS,
+            datetime(2026, 5, 23, 0, 0, 1, tzinfo=UTC),
+            _payload("weather.forecast", c2),
+        ),
+    ]
+
+    p.persist_messages(batch)
+
+    calls = db.execute.call_args_list
+    assert [_table(c.args[0]) for c in calls] == ["messages", "readings"]
+    message_rows = calls[0].args[1]
+    assert [r["message_type_name"] for r in message_rows] == [
+        "weather.forecast",
+        "power.watts",
+        "weather.forecast",
+    ]
+    assert all("_sa_instance_state" not in r for r in message_rows)
+    assert [r["channel_id"] for r in calls[1].args[1]] == [c1, c2]
+    # The buffer is gone once the batch is written.
+    assert db.info == {}
+
+
+def test_batch_without_readings_skips_readings_insert():
+    p, db = _persistor_and_db()
+    p.persist_messages([PendingMessage(FROM_ALIAS, T, _payload("power.watts"))])
+
+    assert [_table(c.args[0]) for c in db.execute.call_args_list] == ["messages"]
+
+
+def test_batch_times_persist_for_all_and_db_ops_for_custom_types():
+    p, _db = _persistor_and_db()
+    p.stage_times = StageTimes()
+    p.persist_messages([
+        PendingMessage(FROM_ALIAS, T, _payload("weather.forecast", uuid.uuid4())),
+        PendingMessage(FROM_ALIAS, T, _payload("power.watts")),
+    ])
+
+    assert p.stage_times.keys() == [
+        ("db_ops", "weather.forecast", "000"),
+        ("persist", "power.watts", "000"),
+        ("persist", "weather.forecast", "000"),
+    ]
+
+
+def test_payload_is_bound_as_the_models_own_json():
+    p, db = _persistor_and_db()
+    p.persist_messages([PendingMessage(FROM_ALIAS, T, _payload("power.watts"))])
+
+    (row,) = db.execute.call_args.args[1]
+    assert isinstance(row["payload"], StoredJson)
+    assert json_serializer(row["payload"]) == '{"TypeName": "power.watts"}'
+    assert json_serializer({"A": 1}) == '{"A": 1}'
+
+
+@pytest.mark.parametrize("path", SAMPLES, ids=lambda p: p.stem)
+@pytest.mark.parametrize("auto_upgrade", [False, True])
+def test_stored_payload_is_the_json_of_to_dict(path, auto_upgrade):
+    # What the persist path used to store was json.dumps(payload.to_dict());
+    # the one-pass JSON must be the same document (cf. gjk.sema.roundtrip).
+    data = json.loads(path.read_text())
+    try:
+        payload = JournalCodec().from_dict(data, auto_upgrade=auto_upgrade)
+    except UpgradeRequiresContext:
+        pytest.skip("upgrade needs context")
+    info = MessagePersistenceInfo(id=str(uuid.uuid4()), created_at=None)
+    row = SemaMessagePersistor.message_row(FROM_ALIAS, T, payload, info)
+
+    stored = json.loads(json_serializer(row["payload"]))
+    assert stored == json.loads(json.dumps(payload.to_dict()))
+    if not auto_upgrade:
+        assert stored == data
+
+
+def test_empty_batch_opens_no_transaction():
+    p, db = _persistor_and_db()
+    p.get_db = MagicMock()
+    p.persist_messages([])
+    p.get_db.assert_not_called()
+
+
+def test_insert_readings_outside_a_batch_executes_immediately():
+    db = MagicMock()
+    db.info = {}
+    readings = ReadingBatch()
+    readings.append(uuid.uuid4(), uuid.uuid4(), 0, 1)
+    insert_readings(db, readings)
+    assert db.execute.call_count == 1
+
+
+def test_persist_time_keyed_types_are_default_path_types_only():
+    p, _ = _persistor_and_db()
+    keyed = p.persist_time_keyed_types()
+    assert "power.watts" in keyed
+    # A natural id, a created-at timestamp, or a custom persistor: the row
+    # key is not knowable from the S3 object name.
+    assert not keyed & {"scada.params", "glitch", "weather.forecast"}
+
+
+def test_persisted_ids_queries_the_primary_key_in_chunks():
+    p, db = _persistor_and_db()
+    ids = [str(uuid.uuid4()) for _ in range(5)]
+    db.execute.return_value.scalars.return_value = [uuid.UUID(ids[0])]
+
+    found = p.persisted_ids([(T, id) for id in ids], chunk_size=2)
+
+    assert found == {ids[0]}
+    assert db.execute.call_count == 3
+    (stmt,), _ = db.execute.call_args
+    assert "messages.timestamp, gridworks.messages.id) IN" in str(stmt)
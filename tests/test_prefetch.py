@@ -0,0 +1,54 @@
+"""Tests for the ordered prefetch used by the S3 importer's downloads."""
+
+import random
+import threading
+import time
+
+import pytest
+
+from gjk.prefetch import prefetch
+
+
+def test_results_come_back_in_input_order():
+    def fetch(i):
+        time.sleep(random.uniform(0, 0.005))
+        return i * i
+
+    out = [(i, f.result()) for i, f in prefetch(fetch, range(50), workers=8)]
+    assert out == [(i, i * i) for i in range(50)]
+
+
+def test_failed_fetch_raises_only_for_its_item():
+    def fetch(i):
+        if i == 2:
+            raise RuntimeError("boom")
+        return i
+
+    results = []
+    for i, f in prefetch(fetch, range(5), workers=3):
+        try:
+            results.append(f.result())
+        except RuntimeError:
+            results.append(None)
+    assert results == [0, 1, None, 3, 4]
+
+
+def test_fetching_runs_at_most_window_ahead():
+    lock = threading.Lock()
+    started: list[int] = []
+
+    def fetch(i):
+        with lock:
+            started.append(i)
+        return i
+
+    for i, f in prefetch(fetch, range(20), workers=2, window=4):
+        f.result()
+        with lock:
+            # Item i was just consumed: at most i + window items submitted.
+            assert len(started) <= i + 4
+
+
+def test_window_smaller_than_workers_is_rejected():
+    with pytest.raises(ValueError):
+        list(prefetch(lambda i: i, range(3), workers=4, window=2))
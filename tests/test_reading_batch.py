@@ -0,0 +1,183 @@
+"""Tests for the columnar ReadingBatch and the persistors that build it.
+
+Hermetic — the report.event check decodes the vendored sema sample and
+resolves channel ids through a stub registry; nothing touches a database.
+"""
+
+import json
+import logging
+import uuid
+from datetime import UTC, datetime
+from pathlib import Path
+from unittest.mock import MagicMock
+
+import pytest
+
+from gjk.reading_batch import Reading, ReadingBatch, first_occurrences
+from gjk.report_event_persistor import ReportEventPersistor, enum_ordinals
+from gjk.sema import SemaCodec
+from gjk.sema.enums import Gw1LeafAllyAllTanksState
+
+SAMPLES = Path(__file__).parent.parent / "src" / "gjk" / "sema" / "samples"
+
+C1, C2, M = uuid.uuid4(), uuid.uuid4(), uuid.uuid4()
+
+
+def test_ids_are_interned_once():
+    batch = ReadingBatch()
+    batch.extend_channel(C1, M, [1, 2, 3], [10, 20, 30])
+    batch.append(C2, M, 1, 5)
+
+    assert batch.ids == [C1, M, C2]
+    assert list(batch) == [
+        Reading(C1, M, 1, 10),
+        Reading(C1, M, 2, 20),
+        Reading(C1, M, 3, 30),
+        Reading(C2, M, 1, 5),
+    ]
+
+
+def test_extend_channel_rejects_ragged_input():
+    batch = ReadingBatch()
+    with pytest.raises(ValueError):
+        batch.extend_channel(C1, M, [1, 2], [10])
+    assert len(batch) == 0
+
+
+def test_dedupe_keeps_first_occurrence_per_channel_and_timestamp():
+    batch = ReadingBatch()
+    batch.extend_channel(C1, M, [1, 2, 1], [10, 20, 99])
+    batch.append(C2, M, 1, 7)
+
+    assert batch.dedupe() == 1
+    assert [(r.timestamp_ms, r.value) for r in batch] == [(1, 10), (2, 20), (1, 7)]
+
+
+def test_first_occurrences_keeps_first_value_and_order():
+    ts, vals = [3, 1, 3, 2, 1], [30, 10, 99, 20, 98]
+    assert first_occurrences(ts, vals) == ([3, 1, 2], [30, 10, 20])
+
+    unique = [1, 2, 3]
+    assert first_occurrences(unique, vals[:3])[0] is unique
+    with pytest.raises(ValueError):
+        first_occurrences([1, 2], [1])
+
+
+def test_extend_remaps_ids_from_other_batch():
+    a, b = ReadingBatch(), ReadingBatch()
+    a.append(C1, M, 1, 1)
+    b.append(C2, M, 2, 2)
+    b.append(C1, M, 3, 3)
+    a.extend(b)
+
+    assert a.ids == [C1, M, C2]
+    assert [r.channel_id for r in a] == [C1, C2, C1]
+
+
+def test_params_are_readings_columns():
+    batch = ReadingBatch()
+    batch.append(C1, M, 1_779_926_400_685, 42)
+    assert batch.params() == [
+        {
+            "channel_id": C1,
+            "message_id": M,
+            "timestamp": datetime(2026, 5, 28, 0, 0, 0, 685000, tzinfo=UTC),
+            "value": 42,
+        }
+    ]
+
+
+def _persist(monkeypatch, report, ids, p=None) -> ReadingBatch:
+    p = p or ReportEventPersistor(logging.getLogger("test_reading_batch"))
+    p.channel_registry = MagicMock()
+    p.channel_registry.channel_ids.return_value = ids
+    written: list[ReadingBatch] = []
+    monkeypatch.setattr(
+        "gjk.report_event_persistor.insert_readings",
+        lambda db, batch: written.append(batch),
+    )
+    p.persist_readings(MagicMock(), report.src, report)
+    (batch,) = written
+    return batch
+
+
+def test_report_event_sample_builds_expected_rows(monkeypatch):
+    report = SemaCodec().from_file(SAMPLES / "report.event.json")
+    ids = {
+        "primary-flow": uuid.uuid4(),
+        "hp-lwt": uuid.uuid4(),
+        "ltn-all-tanks-state": uuid.uuid4(),
+    }
+
+    batch = _persist(monkeypatch, report, ids)
+
+    message_id = uuid.UUID(report.message_id)
+    assert list(batch) == [
+        Reading(ids["primary-flow"], message_id, 1774915200601, 0),
+        Reading(ids["hp-lwt"], message_id, 1774915200601, 14720),
+        Reading(
+            ids["ltn-all-tanks-state"],
+            message_id,
+            1774915252787,
+            Gw1LeafAllyAllTanksState.values().index("HpOffStoreDischarge"),
+        ),
+    ]
+
+
+def test_zone_heat_calls_follow_whitewire_readings(monkeypatch):
+    data = json.loads((SAMPLES / "report.event.json").read_text())
+    t = 1774915200601
+    data["Report"]["ChannelReadingList"] = [
+        {
+            "TypeName": "channel.readings",
+            "Version": "002",
+            "ChannelName": name,
+            "ValueList": [0, 150, 100, 7],
+            "ScadaReadTimeUnixMsList": [t, t + 1, t + 2, t + 1],
+        }
+        for name in ("zone1-whitewire-pwr", "zone2-whitewire-pwr")
+    ]
+    data["Report"]["StateList"] = []
+    report = SemaCodec().from_dict(data)
+    ids = {
+        "zone1-whitewire-pwr": uuid.uuid4(),
+        "zone1-heat-call": uuid.uuid4(),
+        # zone2 has no heat-call channel, so it derives nothing
+        "zone2-whitewire-pwr": uuid.uuid4(),
+    }
+    p = ReportEventPersistor(logging.getLogger("test_reading_batch"))
+
+    batch = _persist(monkeypatch, report, ids, p)
+
+    # beech's whitewire threshold is 100
+    heat_call = [
+        (r.timestamp_ms, r.value)
+        for r in batch
+        if r.channel_id == ids["zone1-heat-call"]
+    ]
+    assert heat_call == [(t, 0), (t + 1, 1), (t + 2, 0)]
+    assert len(batch) == 3 + 3 + 3
+
+    # The whitewire -> heat-call map is derived once per channel map.
+    cached = p.heat_call_channel_ids("hw1.isone.me.versant.keene.beech.ta", ids)
+    assert cached == {ids["zone1-whitewire-pwr"]: ids["zone1-heat-call"]}
+    assert p.heat_call_channel_ids("hw1.isone.me.versant.keene.beech.ta", ids) is (
+        cached
+    )
+
+
+def test_enum_ordinals_match_values_index():
+    table = enum_ordinals(Gw1LeafAllyAllTanksState)
+    values = Gw1LeafAllyAllTanksState.values()
+    assert table == {v: values.index(v) for v in values}
+    assert enum_ordinals(Gw1LeafAllyAllTanksState) is table
+
+
+def test_unknown_enum_value_is_hashed_and_logged_once(caplog):
+    p = ReportEventPersistor(logging.getLogger("test_reading_batch"))
+    with caplog.at_level(logging.WARNING):
+        first = p.get_sema_enum_value(Gw1LeafAllyAllTanksState, "NotAState")
+        second = p.get_sema_enum_value(Gw1LeafAllyAllTanksState, "NotAState")
+
+    assert first == second
+    assert len([r for r in caplog.records if "NotAState" in r.message]) == 1
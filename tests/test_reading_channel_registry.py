@@ -0,0 +1,136 @@
+"""Tests for the shared per-terminal-asset ReadingChannelRegistry.
+
+Hermetic — the session is a MagicMock whose ``query(...).filter(...).all()``
+returns fake channel rows, so these count SELECTs: one per asset until the
+entry is invalidated, reloaded on a late miss, or expires.
+"""
+
+import logging
+import uuid
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+from gjk.layout_lite_persistor import LayoutLitePersistor
+from gjk.pseudo_channels import PseudoChannel, get_pseudo_channels
+from gjk.reading_channel_registry import ReadingChannelRegistry
+
+TA = "hw1.isone.me.versant.keene.beech.ta"
+
+
+def _row(name: str):
+    return SimpleNamespace(
+        id=uuid.uuid4(),
+        name=name,
+        unit="WattHours",
+        unit_type="gw1.unit",
+        channel_type="gjk.pseudo",
+    )
+
+
+def _db(*names: str) -> MagicMock:
+    db = MagicMock()
+    db.query.return_value.filter.return_value.all.return_value = [
+        _row(n) for n in names
+    ]
+    return db
+
+
+def _selects(db: MagicMock) -> int:
+    return db.query.return_value.filter.return_value.all.call_count
+
+
+def test_second_lookup_is_served_from_cache():
+    db = _db("hp-idu-pwr", "hp-odu-pwr")
+    registry = ReadingChannelRegistry()
+
+    first = registry.channel_ids(db, TA)
+    second = registry.channel_ids(db, TA, names=["hp-idu-pwr"])
+
+    assert set(first) == {"hp-idu-pwr", "hp-odu-pwr"}
+    assert second is first
+    assert _selects(db) == 1
+
+
+def test_channels_carry_unit_facts():
+    db = _db("forecast-oat")
+    ch = ReadingChannelRegistry().channels(db, TA)["forecast-oat"]
+    assert (ch.unit, ch.unit_type, ch.channel_type) == (
+        "WattHours",
+        "gw1.unit",
+        "gjk.pseudo",
+    )
+
+
+def test_invalidate_forces_reload():
+    db = _db("hp-idu-pwr")
+    registry = ReadingChannelRegistry()
+    registry.channel_ids(db, TA)
+    registry.invalidate(TA)
+    registry.channel_ids(db, TA)
+    assert _selects(db) == 2
+
+
+def test_unknown_name_reloads_only_after_miss_refresh_interval():
+    db = _db("hp-idu-pwr")
+    registry = ReadingChannelRegistry(miss_refresh_s=3600)
+    registry.channel_ids(db, TA)
+    registry.channel_ids(db, TA, names=["new-channel"])
+    assert _selects(db) == 1
+
+    registry.miss_refresh_s = 0
+    registry.channel_ids(db, TA, names=["new-channel"])
+    assert _selects(db) == 2
+
+
+def test_entries_expire_after_ttl():
+    db = _db("hp-idu-pwr")
+    registry = ReadingChannelRegistry(ttl_s=0)
+    registry.channel_ids(db, TA)
+    registry.channel_ids(db, TA)
+    assert _selects(db) == 2
+
+
+def test_layout_sync_invalidates_the_assets_entry():
+    db = _db()
+    registry = ReadingChannelRegistry()
+    registry.channel_ids(db, TA)
+
+    layout = SimpleNamespace(
+        data_channels=[], derived_channels=[], message_created_ms=1779926400685
+    )
+    LayoutLitePersistor.ReadingChannelSyncProcess(
+        logging.getLogger("test_reading_channel_registry"), db, layout, TA, registry
+    ).execute()
+    # The sync created the registered pseudo-channels, so the cached (empty)
+    # map is stale and the next lookup re-reads the table.
+    assert db.add.called
+    registry.channel_ids(db, TA)
+    assert _selects(db) == 3  # initial load, the sync's own read, the reload
+
+
+def test_unchanged_layout_sync_keeps_the_assets_entry():
+    layout = SimpleNamespace(
+        data_channels=[], derived_channels=[], message_created_ms=1779926400685
+    )
+    # The table already holds exactly the layout's channels.
+    db = MagicMock()
+    db.query.return_value.filter.return_value.all.return_value = [
+        SimpleNamespace(
+            id=uuid.uuid4(),
+            name=pc.name,
+            unit=pc.unit,
+            unit_type=pc.unit_type,
+            channel_type=PseudoChannel.CHANNEL_TYPE,
+            deactivated_date=None,
+        )
+        for pc in get_pseudo_channels(layout)
+    ]
+    registry = ReadingChannelRegistry()
+    registry.channel_ids(db, TA)
+
+    LayoutLitePersistor.ReadingChannelSyncProcess(
+        logging.getLogger("test_reading_channel_registry"), db, layout, TA, registry
+    ).execute()
+    assert not db.add.called
+    registry.channel_ids(db, TA)
+    assert _selects(db) == 2  # initial load and the sync's own read only
@@ -0,0 +1,96 @@
+"""Tests for the COPY staging path in ``gjk.readings_writer``.
+
+Hermetic — the session is a MagicMock whose bind reports the psycopg2
+driver and whose raw connection hands out a recording cursor, so these check
+the SQL issued and the COPY payload without a database.
+"""
+
+import uuid
+from datetime import UTC, datetime, timedelta
+from unittest.mock import MagicMock
+
+from sqlalchemy.dialects import postgresql
+
+from gjk.reading_batch import ReadingBatch
+from gjk.readings_writer import COPY_MIN_ROWS, insert_readings
+
+T0 = datetime(2026, 5, 23, tzinfo=UTC)
+T0_MS = int(T0.timestamp() * 1000)
+
+
+class _Cursor:
+    def __init__(self):
+        self.sql: list[str] = []
+        self.copied = ""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, sql):
+        self.sql.append(sql)
+
+    def copy_expert(self, sql, buf):
+        self.sql.append(sql)
+        self.copied = buf.read()
+
+
+def _psycopg2_db() -> tuple[MagicMock, _Cursor]:
+    cur = _Cursor()
+    db = MagicMock()
+    db.info = {}
+    db.get_bind.return_value.dialect.driver = "psycopg2"
+    connection = db.connection.return_value
+    connection.dialect = postgresql.psycopg2.dialect()
+    connection.connection.driver_connection.cursor.return_value = cur
+    return db, cur
+
+
+def _rows(n: int, channel_id: uuid.UUID) -> ReadingBatch:
+    batch = ReadingBatch()
+    for i in range(n):
+        batch.append(channel_id, uuid.UUID(int=i), T0_MS + 1000 * i, i)
+    return batch
+
+
+def test_large_write_streams_through_staging_table():
+    db, cur = _psycopg2_db()
+    channel_id = uuid.uuid4()
+    insert_readings(db, _rows(COPY_MIN_ROWS, channel_id))
+
+    db.execute.assert_not_called()
+    assert cur.sql[0].startswith("CREATE TEMP TABLE IF NOT EXISTS")
+    assert "LIKE gridworks.readings" in cur.sql[0]
+    assert cur.sql[2].startswith("COPY ")
+    assert cur.sql[3].startswith("INSERT INTO gridworks.readings")
+    assert cur.sql[3].endswith("ON CONFLICT (timestamp, channel_id) DO NOTHING")
+
+    lines = cur.copied.splitlines()
+    assert len(lines) == COPY_MIN_ROWS
+    assert lines[1].split("\t") == [
+        str(channel_id),
+        str(uuid.UUID(int=1)),
+        (T0 + timedelta(seconds=1)).isoformat(),
+        "1",
+    ]
+
+
+def test_copy_payload_keeps_first_of_duplicate_keys():
+    db, cur = _psycopg2_db()
+    channel_id = uuid.uuid4()
+    rows = _rows(COPY_MIN_ROWS, channel_id)
+    rows.append(channel_id, uuid.UUID(int=0), T0_MS, 999)
+    insert_readings(db, rows)
+
+    lines = cur.copied.splitlines()
+    assert len(lines) == COPY_MIN_ROWS
+    assert lines[0].endswith("\t0")
+
+
+def test_small_write_keeps_executemany_insert():
+    db, cur = _psycopg2_db()
+    insert_readings(db, _rows(COPY_MIN_ROWS - 1, uuid.uuid4()))
+    assert db.execute.call_count == 1
+    assert cur.sql == []
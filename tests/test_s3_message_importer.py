@@ -5,13 +5,31 @@ Hermetic — no AWS, no DB. Covers:
      date folder) instead of raising KeyError.
   B. main()'s per-message loop continues past a failing message instead of
      aborting the whole run.
+  C. --message-types selection.
+  D. decoded messages persist through persist_messages in --batch-size
+     batches; a failed persist is counted once, under its version.
+  E. concurrent downloads from a directory-backed S3 stand-in still
+     persist in listing order.
+  F. checkpoints and resuming after a key.
+  G. --skip-imported drops persisted messages before any download.
+  H. per-stage timings by (type_name, version) in the run summary.
+  I. --trusted-decode verifies a sample and reports disagreements.
 """
 
+import io
+import json
 import logging
+import random
+import time
 from datetime import UTC, datetime
+from unittest.mock import MagicMock
+
+import pytest
 
 import gjk.s3_message_importer as imp_mod
+from gjk.message_source import S3Source
 from gjk.s3_message_importer import S3MessageImporter
+from gjk.sema import SemaType
 
 LOG = logging.getLogger("test_s3_message_importer")
 
@@ -36,11 +54,12 @@ def _importer(pages, msg_types):
     """Build an importer with a fake S3 client, bypassing __init__/boto3."""
     imp = S3MessageImporter.__new__(S3MessageImporter)
     imp.settings = None
-    imp.s3 = _FakeS3(pages)
+    imp.source = S3Source("gwdev", client=_FakeS3(pages))
     imp.aws_bucket_name = "gwdev"
     imp.world_instance_name = "hw1__1"
     imp.msg_types = msg_types
     imp.logger = LOG
+    imp.manifest_dir = None
     return imp
 
 
@@ -78,7 +97,7 @@ class _FakeImporter:
     def __init__(self, *_a, **_k):
         self.download_calls = 0
 
-    def find_messages_in_date_range(self, start, end):  # noqa: ARG002
+    def find_messages_in_date_range(self, start, end, skip_past=None):  # noqa: ARG002
         return [_FakeInfo("k1"), _FakeInfo("k2")]
 
     def download_message(self, _info):
@@ -100,7 +119,7 @@ class _FakePersistor:
 def test_main_continues_past_failed_message(monkeypatch):
     fake_importer = _FakeImporter()
     monkeypatch.setattr(imp_mod, "Settings", lambda **_k: object())
-    monkeypatch.setattr(imp_mod, "SemaCodec", lambda *_a, **_k: object())
+    monkeypatch.setattr(imp_mod, "JournalCodec", _FakeCodec)
     monkeypatch.setattr(imp_mod, "SemaMessagePersistor", _FakePersistor)
     monkeypatch.setattr(imp_mod, "S3MessageImporter", lambda *_a, **_k: fake_importer)
 
@@ -126,14 +145,14 @@ def _run_main_capturing_msg_types(monkeypatch, argv):
     was constructed with (the type-selection outcome under test)."""
     captured = {}
 
-    def _fake_importer_factory(_settings, msg_types, _logger):
+    def _fake_importer_factory(_settings, msg_types, _logger, **_k):
         captured["msg_types"] = msg_types
         fake = _FakeImporter()
-        fake.find_messages_in_date_range = lambda start, end: []  # noqa: ARG005
+        fake.find_messages_in_date_range = lambda start, end, skip_past: []  # noqa: ARG005
         return fake
 
     monkeypatch.setattr(imp_mod, "Settings", lambda **_k: object())
-    monkeypatch.setattr(imp_mod, "SemaCodec", lambda *_a, **_k: object())
+    monkeypatch.setattr(imp_mod, "JournalCodec", _FakeCodec)
     monkeypatch.setattr(
         imp_mod, "SemaMessagePersistor", lambda *_a, **_k: _KnownTypesPersistor()
     )
@@ -165,3 +184,344 @@ def test_message_types_include_list_strips_whitespace(monkeypatch):
         ],
     )
     assert msg_types == {"report.event", "layout.lite"}
+
+
+# --- D: decoded messages persist in batches --------------------------------
+
+
+class _OkImporter(_FakeImporter):
+    def find_messages_in_date_range(self, start, end, skip_past=None):  # noqa: ARG002
+        return [_FakeInfo(f"k{i}") for i in range(3)]
+
+    def download_message(self, _info):
+        self.download_calls += 1
+        body = b'{"Payload": {"TypeName": "power.watts"}}'
+        return (body, len(body))
+
+
+class _FakeCodec:
+    indexed_degraded: dict = {}
+
+    def limit_to(self, _capture):
+        pass
+
+    def from_bytes(self, *_a, **_k):
+        obj = MagicMock(spec=SemaType)
+        obj.type_name = "power.watts"
+        obj.version = "000"
+        return obj
+
+
+class _BatchRecordingPersistor(_FakePersistor):
+    def __init__(self, *_a, **_k):
+        self.batches = []
+
+    def persist_messages(self, batch):
+        self.batches.append([m.from_alias for m in batch])
+
+
+def test_main_persists_in_batches_of_batch_size(monkeypatch):
+    persistor = _BatchRecordingPersistor()
+    monkeypatch.setattr(imp_mod, "Settings", lambda **_k: object())
+    monkeypatch.setattr(imp_mod, "JournalCodec", _FakeCodec)
+    monkeypatch.setattr(imp_mod, "SemaMessagePersistor", lambda *_a, **_k: persistor)
+    monkeypatch.setattr(imp_mod, "S3MessageImporter", _OkImporter)
+
+    imp_mod.main(["--start", "2026-05-23", "--end", "2026-05-24", "--batch-size", "2"])
+
+    assert [len(b) for b in persistor.batches] == [2, 1]
+
+
+def test_run_summary_reports_indexed_degraded_decodes(caplog):
+    summary = {
+        ("report.event", "999"): imp_mod.VersionCounts(degraded=2),
+        ("mystery.type", "000"): imp_mod.VersionCounts(degraded=1),
+    }
+    logger = logging.getLogger("test_run_summary")
+    with caplog.at_level(logging.INFO, logger="test_run_summary"):
+        imp_mod.log_run_summary(logger, summary, 3, indexed_degraded=2)
+    assert "2 of 3 degraded decodes were known types" in caplog.text
+
+
+class _FailingPersistor(_BatchRecordingPersistor):
+    """Fails every batch, and the retry of the second message of each."""
+
+    def persist_messages(self, batch):
+        self.retries = 0
+        raise RuntimeError("db down")
+
+    def persist_message(self, *_a, **_k):
+        self.retries += 1
+        if self.retries == 2:
+            raise RuntimeError("db down")
+
+
+def test_persist_failures_are_counted_once_under_their_version(monkeypatch, caplog):
+    monkeypatch.setattr(imp_mod, "Settings", lambda **_k: object())
+    monkeypatch.setattr(imp_mod, "JournalCodec", _FakeCodec)
+    monkeypatch.setattr(
+        imp_mod, "SemaMessagePersistor", lambda *_a, **_k: _FailingPersistor()
+    )
+    monkeypatch.setattr(imp_mod, "S3MessageImporter", _OkImporter)
+
+    with caplog.at_level(logging.INFO, logger=imp_mod.__name__):
+        imp_mod.main(["--start", "2026-05-23", "--end", "2026-05-24"])
+
+    rows = [line.split() for line in caplog.text.splitlines()]
+    # ok (committed), degraded, failed (decode), db_failed
+    assert ["power.watts", "000", "2", "0", "0", "1"] in rows
+    assert imp_mod.PARSE_FAIL not in caplog.text
+
+
+# --- E: concurrent downloads keep listing order ----------------------------
+
+
+class _DirectoryS3(_FakeS3):
+    """list_objects_v2 / get_object over files in a directory, with a random
+    delay per GET so downloads complete out of order."""
+
+    def __init__(self, root):
+        self.root = root
+        keys = sorted(p.name for p in root.iterdir())
+        super().__init__([
+            {"Contents": [{"Key": f"hw1__1/eventstore/20260523/{k}"} for k in keys]}
+        ])
+
+    def get_object(self, Bucket, Key):  # noqa: N803, ARG002
+        time.sleep(random.uniform(0, 0.01))
+        body = (self.root / Key.rsplit("/", 1)[-1]).read_bytes()
+        return {"Body": io.BytesIO(body), "ContentLength": len(body)}
+
+
+def test_concurrent_downloads_persist_in_listing_order(monkeypatch, tmp_path):
+    ms = 1779494400000
+    for i in range(20):
+        (tmp_path / f"a{i:02d}-power.watts-{ms + i}-ear.json").write_text(
+            '{"Payload": {"TypeName": "power.watts"}}'
+        )
+    importer = _importer(pages=None, msg_types={"power.watts"})
+    importer.source = S3Source("gwdev", client=_DirectoryS3(tmp_path))
+    persistor = _BatchRecordingPersistor()
+    monkeypatch.setattr(imp_mod, "Settings", lambda **_k: object())
+    monkeypatch.setattr(imp_mod, "JournalCodec", _FakeCodec)
+    monkeypatch.setattr(imp_mod, "SemaMessagePersistor", lambda *_a, **_k: persistor)
+    monkeypatch.setattr(imp_mod, "S3MessageImporter", lambda *_a, **_k: importer)
+
+    imp_mod.main(["--start", "2026-05-23", "--end", "2026-05-23", "--concurrency", "6"])
+
+    persisted = [alias for batch in persistor.batches for alias in batch]
+    assert persisted == [f"a{i:02d}" for i in range(20)]
+
+
+def test_run_summary_reports_throughput(caplog):
+    logger = logging.getLogger("test_run_summary")
+    with caplog.at_level(logging.INFO, logger="test_run_summary"):
+        imp_mod.log_run_summary(logger, {}, 100, total_bytes=4_000_000, elapsed_s=2.0)
+    assert "50.0 msgs/s, 2.00 MB/s" in caplog.text
+
+
+# --- F: checkpoints and resume ---------------------------------------------
+
+
+def _write_day(root, n, ms=1779494400000):
+    for i in range(n):
+        (root / f"a{i:02d}-power.watts-{ms + i}-ear.json").write_text(
+            '{"Payload": {"TypeName": "power.watts"}}'
+        )
+
+
+def _patch_main(monkeypatch, importer, persistor):
+    monkeypatch.setattr(imp_mod, "Settings", lambda **_k: object())
+    monkeypatch.setattr(imp_mod, "JournalCodec", _FakeCodec)
+    monkeypatch.setattr(imp_mod, "SemaMessagePersistor", lambda *_a, **_k: persistor)
+    monkeypatch.setattr(imp_mod, "S3MessageImporter", lambda *_a, **_k: importer)
+
+
+def test_resume_continues_after_last_committed_batch(monkeypatch, tmp_path):
+    day = tmp_path / "day"
+    day.mkdir()
+    _write_day(day, 20)
+    importer = _importer(pages=None, msg_types={"power.watts"})
+    importer.source = S3Source("gwdev", client=_DirectoryS3(day))
+    checkpoint = tmp_path / "checkpoint.json"
+    argv = [
+        "--start",
+        "2026-05-23",
+        "--end",
+        "2026-05-23",
+        "--batch-size",
+        "5",
+        "--checkpoint",
+        str(checkpoint),
+        "--abort-on-error",
+    ]
+
+    # The run dies on a12: batches a00-a04 and a05-a09 had committed.
+    get_object = importer.source.client.get_object
+
+    def failing_get_object(Bucket, Key):  # noqa: N803
+        if "a12-" in Key:
+            raise RuntimeError("connection reset")
+        return get_object(Bucket, Key)
+
+    importer.source.client.get_object = failing_get_object
+    first = _BatchRecordingPersistor()
+    _patch_main(monkeypatch, importer, first)
+    with pytest.raises(RuntimeError):
+        imp_mod.main(argv)
+    assert "a09-" in json.loads(checkpoint.read_text())["key"]
+
+    importer.source.client.get_object = get_object
+    second = _BatchRecordingPersistor()
+    _patch_main(monkeypatch, importer, second)
+    imp_mod.main(argv + ["--resume"])
+
+    resumed = [alias for batch in second.batches for alias in batch]
+    assert resumed == [f"a{i:02d}" for i in range(10, 20)]
+    assert "a19-" in json.loads(checkpoint.read_text())["key"]
+
+
+def test_resume_rejects_checkpoint_from_another_run(monkeypatch, tmp_path):
+    checkpoint = tmp_path / "checkpoint.json"
+    checkpoint.write_text(
+        json.dumps({
+            "start": "2026-01-01",
+            "end": "2026-01-02",
+            "message_types": ["power.watts"],
+            "day": "20260101",
+            "persist_ms": 0,
+            "key": "hw1__1/eventstore/20260101/a-power.watts-0-ear.json",
+        })
+    )
+    importer = _importer(pages=[{}], msg_types={"power.watts"})
+    _patch_main(monkeypatch, importer, _BatchRecordingPersistor())
+    with pytest.raises(SystemExit):
+        imp_mod.main(
+            ["--start", "2026-05-23", "--end", "2026-05-23"]
+            + ["--checkpoint", str(checkpoint), "--resume"]
+        )
+
+
+def test_skip_past_bisects_listing_in_both_directions():
+    prefix = "hw1__1/eventstore/20260523"
+    # Two messages share a persist time; the key breaks the tie.
+    keys = [
+        f"{prefix}/b-power.watts-1000-ear.json",
+        f"{prefix}/a-power.watts-1000-ear.json",
+        f"{prefix}/c-power.watts-2000-ear.json",
+        f"{prefix}/d-power.watts-500-ear.json",
+    ]
+    imp = _importer(pages=[{"Contents": [{"Key": k} for k in keys]}], msg_types=set())
+    imp.msg_types = {"power.watts"}
+    dt = datetime(2026, 5, 23)
+
+    def aliases(sort):
+        return [
+            m.from_alias
+            for m in imp.find_messages_on_date(dt, skip_past=keys[1], sort=sort)
+        ]
+
+    assert aliases("asc") == ["b", "c"]
+    assert aliases("desc") == ["d"]
+
+
+# --- G: skip already-imported messages before download ---------------------
+
+
+class _HalfImportedPersistor(_BatchRecordingPersistor):
+    """power.watts is persist-time keyed; even-numbered sources are in."""
+
+    def all_known_message_types(self):
+        return {"power.watts"}
+
+    def persist_time_keyed_types(self):
+        return {"power.watts"}
+
+    def persisted_ids(self, candidates):
+        self.queries = getattr(self, "queries", 0) + 1
+        return {
+            id
+            for ts, id in candidates
+            for i in range(0, 20, 2)
+            if id == imp_mod.default_message_id(f"a{i:02d}", "power.watts", ts)
+        }
+
+
+def test_skip_imported_never_downloads_persisted_messages(monkeypatch, tmp_path):
+    _write_day(tmp_path, 20)
+    importer = _importer(pages=None, msg_types={"power.watts"})
+    importer.source = S3Source("gwdev", client=_DirectoryS3(tmp_path))
+    downloaded = []
+    read = importer.source.read
+    importer.source.read = lambda key: downloaded.append(key) or read(key)
+    persistor = _HalfImportedPersistor()
+    _patch_main(monkeypatch, importer, persistor)
+
+    imp_mod.main(["--start", "2026-05-23", "--end", "2026-05-23", "--skip-imported"])
+
+    assert persistor.queries == 1  # one lookup for the day
+    persisted = [alias for batch in persistor.batches for alias in batch]
+    assert persisted == [f"a{i:02d}" for i in range(1, 20, 2)]
+    assert len(downloaded) == 10
+
+
+# --- H: per-stage timings in the run summary -------------------------------
+
+
+def test_run_summary_times_each_stage_by_type_and_version(
+    monkeypatch, tmp_path, caplog
+):
+    _write_day(tmp_path, 5)
+    importer = _importer(pages=None, msg_types={"power.watts"})
+    importer.source = S3Source("gwdev", client=_DirectoryS3(tmp_path))
+    _patch_main(monkeypatch, importer, _BatchRecordingPersistor())
+
+    with caplog.at_level(logging.INFO, logger=imp_mod.__name__):
+        imp_mod.main(["--start", "2026-05-23", "--end", "2026-05-23"])
+
+    rows = [line.split() for line in caplog.text.splitlines()]
+    # (all) has no version: list is timed per day, not per message.
+    assert ["(all)", "list", "1"] in [row[:3] for row in rows]
+    stages = {tuple(row[:4]) for row in rows if row[:2] == ["power.watts", "000"]}
+    assert {
+        ("power.watts", "000", stage, "5") for stage in ("download", "decode")
+    } <= stages
+
+
+# --- I: trusted decode with sampled verification ---------------------------
+
+
+class _LaxCodec(_FakeCodec):
+    """Trusted decodes succeed; full decodes find every message invalid."""
+
+    def from_bytes(self, *_a, trusted=False, **_k):
+        if not trusted:
+            raise ValueError("Axiom 1 failed")
+        return super().from_bytes()
+
+
+def test_trusted_decode_reports_disagreements_of_verified_messages(
+    monkeypatch, tmp_path, caplog
+):
+    _write_day(tmp_path, 5)
+    importer = _importer(pages=None, msg_types={"power.watts"})
+    importer.source = S3Source("gwdev", client=_DirectoryS3(tmp_path))
+    persistor = _BatchRecordingPersistor()
+    _patch_main(monkeypatch, importer, persistor)
+    monkeypatch.setattr(imp_mod, "JournalCodec", _LaxCodec)
+
+    argv = ["--start", "2026-05-23", "--end", "2026-05-23", "--trusted-decode"]
+    with caplog.at_level(logging.INFO, logger=imp_mod.__name__):
+        imp_mod.main([*argv, "--verify-fraction", "0"])
+    assert "Trusted decode: 0 messages verified" in caplog.text
+    assert "No disagreements." in caplog.text
+    assert len(persistor.batches[0]) == 5
+
+    persistor.batches.clear()
+    caplog.clear()
+    with caplog.at_level(logging.INFO, logger=imp_mod.__name__):
+        imp_mod.main([*argv, "--verify-fraction", "1"])
+    assert "Trusted decode: 5 messages verified" in caplog.text
+    assert "  - power.watts v000 (5 messages)" in caplog.text
+    # The full decode wins: the messages failed and none was persisted.
+    assert persistor.batches == []
@@ -0,0 +1,165 @@
+"""Tests for --workers: sharding the import by from_alias, listing once for
+all shards, per-shard checkpoints, and merging the shards' run summaries.
+Hermetic: a local eventstore mirror or a fake S3 client, no AWS, no DB."""
+
+import json
+import logging
+from datetime import UTC, datetime
+from pathlib import Path
+
+import pytest
+
+import gjk.s3_message_importer as imp_mod
+from gjk.import_checkpoint import ImportCheckpoint, save_checkpoint
+from gjk.message_source import S3Source
+from gjk.s3_message_importer import RunResult, S3MessageImporter, VersionCounts
+
+SAMPLES = Path(__file__).parent.parent / "src" / "gjk" / "sema" / "samples"
+ALIASES = ["beech", "oak", "elm", "fir", "ash"]
+DAY_MS = 1779494400000
+
+
+def _mirror(root: Path) -> Path:
+    body = json.dumps({
+        "Payload": json.loads((SAMPLES / "report.event.json").read_text())
+    })
+    day = root / "hw1__1" / "eventstore" / "20260523"
+    day.mkdir(parents=True)
+    for i in range(30):
+        alias = ALIASES[i % len(ALIASES)]
+        (day / f"{alias}-report.event-{DAY_MS + i}-ear.json").write_text(body)
+    return root
+
+
+class _RecordingPersistor:
+    def __init__(self, *_a, **_k):
+        self.persisted = []
+
+    def all_known_message_types(self):
+        return {"report.event"}
+
+    def persist_messages(self, batch):
+        self.persisted += [(m.from_alias, m.time_received) for m in batch]
+
+
+def test_merge_adds_counts():
+    a = RunResult(msg_counter=2, total_bytes=10)
+    a.summary[("report.event", "003")] = VersionCounts(ok=1, degraded=1)
+    b = RunResult(msg_counter=3, indexed_degraded=1, total_bytes=5)
+    b.summary.update({
+        ("report.event", "003"): VersionCounts(ok=2),
+        ("bid", "000"): VersionCounts(failed=1),
+    })
+    a.merge(b)
+    assert a.summary == {
+        ("report.event", "003"): VersionCounts(ok=3, degraded=1),
+        ("bid", "000"): VersionCounts(failed=1),
+    }
+    assert (a.msg_counter, a.indexed_degraded, a.total_bytes) == (5, 1, 15)
+
+
+def test_shards_partition_sources_and_keep_their_order(monkeypatch, tmp_path):
+    mirror = _mirror(tmp_path / "mirror")
+    monkeypatch.setattr(imp_mod, "Settings", lambda **_k: object())
+    parser = imp_mod._build_parser()
+    argv = ["--start", "2026-05-23", "--end", "2026-05-23", "--source", str(mirror)]
+    logger = logging.getLogger("test_sharded_import")
+
+    def run(shard):
+        persistor = _RecordingPersistor()
+        monkeypatch.setattr(
+            imp_mod, "SemaMessagePersistor", lambda *_a, **_k: persistor
+        )
+        imp_mod.import_messages(parser.parse_args(argv), parser, logger, shard)
+        return persistor.persisted
+
+    full = run(None)
+    shards = [run((i, 3)) for i in range(3)]
+
+    assert sorted(m for shard in shards for m in shard) == sorted(full)
+    for shard in shards:
+        # Each source lives in one shard, in the same order as unsharded.
+        for alias in {a for a, _ in shard}:
+            assert [m for m in shard if m[0] == alias] == [
+                m for m in full if m[0] == alias
+            ]
+            assert sum(alias in {a for a, _ in other} for other in shards) == 1
+
+
+def test_sharded_checkpoints_get_their_own_files():
+    path = Path("/tmp/run.json")
+    assert imp_mod._shard_path(path, None) == path
+    assert imp_mod._shard_path(path, (1, 4)) == Path("/tmp/run.shard1of4.json")
+
+
+def test_resuming_with_another_worker_count_is_rejected(tmp_path):
+    checkpoint = tmp_path / "run.json"
+    save_checkpoint(
+        checkpoint.with_name("run.shard1of4.json"),
+        ImportCheckpoint("2026-05-23", "2026-05-23", [], "20260523", 0, "k", 4),
+    )
+    assert imp_mod.checkpoint_workers(checkpoint) == {4}
+    argv = ["--start", "2026-05-23", "--end", "2026-05-23", "--resume"]
+    for workers in ("1", "2"):
+        with pytest.raises(SystemExit):
+            imp_mod.main([*argv, "--checkpoint", str(checkpoint), "--workers", workers])
+
+
+class _CountingS3:
+    def __init__(self, keys):
+        self.keys = keys
+        self.list_calls = 0
+
+    def get_paginator(self, _name):
+        return self
+
+    def paginate(self, **_kwargs):
+        self.list_calls += 1
+        return iter([{"Contents": [{"Key": k} for k in self.keys]}])
+
+
+def test_shards_read_the_parents_listing(tmp_path):
+    # Today, so a manifest alone would not be trusted without --workers.
+    today = datetime.now(UTC).replace(tzinfo=None)
+    prefix = f"hw1__1/eventstore/{today.strftime('%Y%m%d')}"
+    keys = [
+        f"{prefix}/{alias}-report.event-{DAY_MS + i}-ear.json"
+        for i, alias in enumerate(ALIASES)
+    ]
+    s3 = _CountingS3(keys)
+    logger = logging.getLogger("test_sharded_import")
+
+    def importer():
+        return S3MessageImporter(
+            object(),
+            {"report.event"},
+            logger,
+            manifest_dir=tmp_path,
+            source=S3Source("gwdev", client=s3),
+        )
+
+    assert importer().list_date_range(today, today) == len(keys)
+    found = []
+    for _ in range(3):
+        shard_importer = importer()
+        shard_importer.prelisted = True
+        found += [m.key_str for m in shard_importer.find_messages_on_date(today)]
+    assert s3.list_calls == 1
+    assert found == keys * 3
+
+
+def test_workers_merge_into_one_summary(tmp_path, caplog):
+    mirror = _mirror(tmp_path / "mirror")
+    with caplog.at_level(logging.INFO, logger=imp_mod.__name__):
+        imp_mod.main(
+            ["--start", "2026-05-23", "--end", "2026-05-23", "--dry-run"]
+            + ["--source", str(mirror), "--workers", "2"]
+        )
+    # Both shards' counts land in one table row.
+    assert "RUN SUMMARY (messages processed: 30)" in caplog.text
+    assert f"{'report.event':40} {'002':>9} {30:>8}" in caplog.text
+
+
+def test_workers_with_message_path_is_rejected():
+    with pytest.raises(SystemExit):
+        imp_mod.main(["--message-path", "k", "--workers", "2"])
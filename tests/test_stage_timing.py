@@ -0,0 +1,33 @@
+"""Tests for the importer's per-stage duration histograms."""
+
+import pickle
+
+import pytest
+
+from gjk.stage_timing import StageTimes
+
+KEY = ("decode", "report.event", "002")
+
+
+def test_percentiles_are_within_a_bucket_of_exact():
+    times = StageTimes()
+    for ms in range(1, 101):
+        times.record(*KEY, ms / 1000)
+    p50, p95, p99 = times.percentiles(KEY)
+    assert p50 == pytest.approx(0.050, rel=0.1)
+    assert p95 == pytest.approx(0.095, rel=0.1)
+    assert p99 == pytest.approx(0.099, rel=0.1)
+    assert times.count(KEY) == 100
+    assert times.total_s(KEY) == pytest.approx(5.05)
+
+
+def test_shard_results_merge_after_pickling():
+    parent, shard = StageTimes(), StageTimes()
+    parent.record(*KEY, 0.001)
+    shard.record(*KEY, 0.001)
+    shard.record("persist", "report.event", "002", 0.5)
+
+    parent.merge(pickle.loads(pickle.dumps(shard)))
+    assert parent.count(KEY) == 2
+    assert parent.stage_total_s("persist") == pytest.approx(0.5)
+    assert parent.keys() == [KEY, ("persist", "report.event", "002")]
@@ -0,0 +1,67 @@
+"""Tests for cached old-version upgrade plans."""
+
+import json
+from pathlib import Path
+
+import pytest
+
+from gjk.journal_codec import JournalCodec
+from gjk.upgrade_plan import upgrade_plan
+
+SAMPLES = Path(__file__).parent.parent / "src" / "gjk" / "sema" / "samples"
+
+
+@pytest.fixture(scope="module")
+def codec() -> JournalCodec:
+    return JournalCodec()
+
+
+def _old_version_samples() -> list[str]:
+    codec = JournalCodec()
+    stems = []
+    for path in sorted(SAMPLES.glob("*.json")):
+        data = json.loads(path.read_text())
+        if data.get("Version") in codec.old_versions.get(data["TypeName"], {}):
+            stems.append(path.stem)
+    return stems
+
+
+def _plan(codec, type_name, version):
+    return upgrade_plan(
+        codec.old_versions[type_name][version], codec.registry[type_name]
+    )
+
+
+def test_every_old_version_has_a_plan(codec):
+    for type_name, versions in codec.old_versions.items():
+        for version in versions:
+            assert _plan(codec, type_name, version) is not None, (type_name, version)
+
+
+def test_every_hop_builds_its_model(codec):
+    plan = _plan(codec, "flo.params.house0", "003")
+    assert plan.validations == 4
+    assert plan.steps[0] == codec.old_versions["flo.params.house0"]["003"].upgrade
+
+
+@pytest.mark.parametrize("sample", _old_version_samples())
+def test_plan_matches_to_latest(codec, sample):
+    data = json.loads((SAMPLES / f"{sample}.json").read_text())
+    old = codec.from_dict(data, auto_upgrade=False)
+    plan = upgrade_plan(type(old), codec.registry[old.type_name])
+    assert plan.run(old) == old.to_latest(codec.registry)
+
+
+def test_plan_rejects_what_to_latest_rejects(codec):
+    # Valid at 300; the latest version's axioms require the hierarchy name.
+    data = json.loads((SAMPLES / "spaceheat.node.gt.300.json").read_text())
+    del data["ActorHierarchyName"]
+    old = codec.from_dict(data, auto_upgrade=False)
+    with pytest.raises(ValueError, match="Axiom 2") as to_latest:
+        old.to_latest(codec.registry)
+    plan = upgrade_plan(type(old), codec.registry[old.type_name])
+    with pytest.raises(ValueError, match="Axiom 2") as planned:
+        plan.run(old)
+    assert str(planned.value) == str(to_latest.value)
+    with pytest.raises(ValueError, match="Axiom 2"):
+        codec.from_dict(data)